@@ -0,0 +1,54 @@
+"""
+Mide el tiempo de :meth:`~tinamit.Incertidumbre.Datos.SuperBD.obt_datos_reg` con interpolación para una base de
+datos regional de 5 000 lugares con observaciones anuales sobre 20 años.
+
+Uso: ``python rendimiento_datos.py``
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from tinamit.Incertidumbre.Datos import DatosRegión, SuperBD
+
+
+def crear_datos(archivo, n_lugares=5000, n_años=20, frac_faltan=0.3, semilla=0):
+    rnd = np.random.RandomState(semilla)
+    with open(archivo, 'w', encoding='utf8') as d:
+        d.write('lugar,fecha,a,b\n')
+        for l in range(1, n_lugares + 1):
+            for a in range(2000, 2000 + n_años):
+                vals = ['' if rnd.rand() < frac_faltan else str(rnd.rand()) for _ in range(2)]
+                d.write('{},{}-07-01,{},{}\n'.format(l, a, *vals))
+
+
+def medir(n_lugares=5000, n_años=20):
+    directorio = tempfile.mkdtemp()
+    try:
+        archivo = os.path.join(directorio, 'regional.csv')
+        crear_datos(archivo, n_lugares=n_lugares, n_años=n_años)
+
+        t = time.perf_counter()
+        bd = SuperBD('Rendimiento', bds=DatosRegión('reg', archivo, fecha='fecha', lugar='lugar'))
+        bd.espec_var('a')
+        bd.espec_var('b')
+        bd.obt_datos(['a', 'b'])
+        t_lectura = time.perf_counter() - t
+
+        t = time.perf_counter()
+        res = bd.obt_datos_reg(['a', 'b'])
+        t_interpol = time.perf_counter() - t
+
+    finally:
+        shutil.rmtree(directorio)
+
+    print('{} lugares x {} años ({} filas)'.format(n_lugares, n_años, n_lugares * n_años))
+    print('  Lectura: {:.2f} s'.format(t_lectura))
+    print('  obt_datos_reg(interpolar=True): {:.2f} s ({} filas finales)'.format(t_interpol, len(res)))
+
+
+if __name__ == '__main__':
+    medir()
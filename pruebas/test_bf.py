@@ -0,0 +1,92 @@
+import os
+import unittest
+
+from tinamit.BF import ModeloImpaciente, ReservaDirsTrabajo
+
+
+class Test_ReservaDirsTrabajo(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.reserva = ReservaDirsTrabajo()
+
+    def test_reutilizar_dir(símismo):
+        d = símismo.reserva.pedir()
+        with open(os.path.join(d, 'prueba.txt'), 'w') as a:
+            a.write('¡Hola!')
+        símismo.reserva.devolver(d)
+
+        símismo.assertEqual(d, símismo.reserva.pedir())
+        símismo.assertListEqual(os.listdir(d), [])
+
+    def test_dirs_distintos(símismo):
+        símismo.assertNotEqual(símismo.reserva.pedir(), símismo.reserva.pedir())
+
+    def tearDown(símismo):
+        símismo.reserva.vaciar()
+
+
+class ModeloImpacientePrueba(ModeloImpaciente):
+    """
+    Un modelo impaciente sencillo cuyo "modelo externo" aumenta el nivel de 1 cada año.
+    """
+
+    def __init__(símismo):
+        símismo.n_corridas = 0
+        símismo.ingr = None
+        símismo.egr = None
+        super().__init__()
+
+    def inic_vars(símismo):
+        símismo.variables['Nivel'] = {'val': None, 'unidades': 'm', 'ingreso': True, 'egreso': True, 'dims': (1,)}
+        símismo.tipos_vars['Ingresos'] = ['Nivel']
+        símismo.tipos_vars['Egresos'] = ['Nivel']
+
+    def leer_archivo_vals_inic(símismo):
+        símismo.n_estaciones = 2
+        símismo.dur_estaciones = [6, 6]
+        return {'Nivel': [0]}, (1,)
+
+    def escribir_archivo_ingr(símismo, n_años_simul, dic_ingr):
+        símismo.ingr = (n_años_simul, dic_ingr['Nivel'].copy())
+
+    def avanzar_modelo(símismo):
+        símismo.n_corridas += 1
+        n_años, nivel = símismo.ingr
+        símismo.egr = [{'Nivel': nivel + a + 1} for a in range(n_años)]
+
+    def leer_archivo_egr(símismo, n_años_egr):
+        return símismo.egr[-1]
+
+    def leer_archivo_egr_todos(símismo, n_años_egr):
+        return símismo.egr
+
+    def cerrar_modelo(símismo):
+        pass
+
+
+class Test_ModeloImpaciente(unittest.TestCase):
+
+    def test_simul_en_lote(símismo):
+        mod = ModeloImpacientePrueba()
+        res = mod.simular(tiempo_final=36, vars_interés='Nivel')
+
+        símismo.assertEqual(mod.n_corridas, 1)
+        símismo.assertEqual(res['Nivel'][-1, 0], 3)
+
+    def test_simul_recibe_vals(símismo):
+        mod = ModeloImpacientePrueba()
+        mod.estab_recibe_vals(True)
+        res = mod.simular(tiempo_final=36, vars_interés='Nivel')
+
+        símismo.assertEqual(mod.n_corridas, 3)
+        símismo.assertEqual(res['Nivel'][-1, 0], 3)
+
+    def test_anular_lote_si_cambian_ingresos(símismo):
+        mod = ModeloImpacientePrueba()
+        mod.iniciar_modelo(tiempo_final=36, nombre_corrida='prueba')
+        mod.incrementar(12)
+        mod.cambiar_vals({'Nivel': 10})
+        mod.incrementar(12)
+
+        símismo.assertEqual(mod.n_corridas, 2)
+        símismo.assertEqual(mod.variables['Nivel']['val'][0], 11)
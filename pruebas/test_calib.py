@@ -0,0 +1,242 @@
+import unittest
+from multiprocessing import Pool as Reserva
+
+import numpy as np
+import pandas as pd
+
+from tinamit.EnvolturaMDS.sintaxis import Ecuación
+from tinamit.Geog.Geog import Geografía
+from tinamit.Incertidumbre.ConexDatos import ConexDatos, _CalibradorRegión, _calibrar_región, _camino_jer, \
+    _inic_calibrador, _juntar_calibs
+from tinamit.Incertidumbre.Controles import Control, _compilar_ec
+from tinamit.Incertidumbre.Estadísticas import _muestrear, evaluar_cands, optimizar, optimizar_global, \
+    índices_jerarquía
+
+
+class Test_CalibRegiones(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.args_calib = {
+            'obj_ec': Ecuación('a * x + b', dialecto='tinamït'), 'método': 'optimizar', 'paráms': ['a', 'b'],
+            'líms_paráms': [(None, None), (None, None)], 'binario': False, 'ops_método': {}
+        }
+
+        x = np.arange(10, dtype=float)
+        símismo.tareas = [
+            ('1', {'x': x}, 2 * x + 1, None),
+            ('2', {'x': x}, -x + 3, None),
+            ('3', {'x': x}, np.full(10, np.nan), {'a': {'val': 0}, 'b': {'val': 0}}),
+        ]
+
+    def test_secuencial(símismo):
+        calibrador = _CalibradorRegión(**símismo.args_calib)
+        with símismo.assertWarns(UserWarning):
+            d_calib = _juntar_calibs((calibrador(t) for t in símismo.tareas), n_total=3, var='y')
+
+        símismo.assertAlmostEqual(d_calib['1']['a']['val'], 2, places=3)
+        símismo.assertAlmostEqual(d_calib['2']['b']['val'], 3, places=3)
+
+    def test_paralelo(símismo):
+        calibrador = _CalibradorRegión(**símismo.args_calib)
+        secuencial = [calibrador(t) for t in símismo.tareas]
+
+        with Reserva(2, initializer=_inic_calibrador, initargs=(símismo.args_calib,)) as r:
+            paralelo = list(r.imap(_calibrar_región, símismo.tareas))
+
+        # Mismo orden y mismos resultados que en secuencial
+        símismo.assertListEqual([x[0] for x in paralelo], ['1', '2', '3'])
+        for (_, r_sec, _), (_, r_par, _) in zip(secuencial, paralelo):
+            for p in ['a', 'b']:
+                símismo.assertAlmostEqual(r_sec[p]['val'], r_par[p]['val'])
+
+    def test_error_a_prioris(símismo):
+        calibrador = _CalibradorRegión(**dict(símismo.args_calib, método='método desconocido'))
+        lg, resultado, error = calibrador(símismo.tareas[2])
+
+        símismo.assertIs(resultado, símismo.tareas[2][3])
+        símismo.assertIsNotNone(error)
+
+
+class ModeloVensim(object):
+    """
+    Un modelo falso con una sola ecuación, ``y = a * x + b``.
+    """
+
+    nombre = 'Prueba'
+    constantes = ['a', 'b']
+    variables = {'y': {'parientes': ['x', 'a', 'b'], 'ec': 'a * x + b'}}
+
+
+class GeogPrueba(object):
+    def obt_lugares_en(símismo, escala=None, en=None, por=None):
+        return ['1', '2', '3']
+
+
+class BDPrueba(object):
+    """
+    Una base de datos falsa. Los datos de la región ``3`` no son numéricos, así que su calibración falla.
+    """
+
+    geog = GeogPrueba()
+
+    def obt_datos_reg(símismo, l_vars, lugar, datos=None, fechas=None):
+        x = np.arange(10, dtype=float)
+        if lugar == '3':
+            return pd.DataFrame({'x': ['n/a'] * 10, 'y': x})
+        return pd.DataFrame({'x': x, 'y': 2 * x + int(lugar)})
+
+
+class Test_CalibVar(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.conex = ConexDatos(BDPrueba(), ModeloVensim())
+
+    def test_región_fallida(símismo):
+        with símismo.assertWarns(UserWarning):
+            d_calib = símismo.conex.calib_var(
+                'y', paráms=['a', 'b'], líms_paráms=[(None, None), (None, None)], método='optimizar',
+                regional=True, paralelo=2
+            )
+
+        # La región sin datos válidos ni a prioris no queda en las calibraciones.
+        símismo.assertListEqual(sorted(d_calib), ['1', '2'])
+        símismo.assertListEqual(sorted(símismo.conex.dic_calibs['a']), ['1', '2'])
+        símismo.assertAlmostEqual(símismo.conex.dic_calibs['b']['2']['val'], 2, places=3)
+
+    def test_paralelo_anidado(símismo):
+        with símismo.assertWarns(UserWarning):
+            d_calib = símismo.conex.calib_var(
+                'y', paráms=['a', 'b'], líms_paráms=[(-10, 10), (-10, 10)], método='optimizar global',
+                ops_método={'paralelo': True, 'n_cand': 50, 'semilla': 1}, regional=True, paralelo=2
+            )
+
+        # Las regiones válidas se calibran, sin reserva anidada adentro de la reserva de regiones.
+        for lg in ['1', '2']:
+            símismo.assertAlmostEqual(d_calib[lg]['a']['val'], 2, places=3)
+            símismo.assertAlmostEqual(d_calib[lg]['b']['val'], int(lg), places=3)
+
+
+class Test_Jerarquía(unittest.TestCase):
+
+    def test_índices(símismo):
+        caminos = [('Norte', 'A'), ('Norte', 'B'), ('Sur', 'A'), ('Norte', 'A')]
+        padres = índices_jerarquía(caminos)
+
+        símismo.assertListEqual([x.tolist() for x in padres], [[0, 0], [0, 0, 1], [0, 1, 2, 0]])
+
+    def test_sin_niveles(símismo):
+        padres = índices_jerarquía([(), (), ()])
+
+        símismo.assertListEqual([x.tolist() for x in padres], [[0, 0, 0]])
+
+    def test_camino(símismo):
+        geog = Geografía('Prueba')
+        geog.árbol_geog_inv = {
+            '101': {'Departamento': 'Norte', 'Cuenca': 'A'}, '102': {'Departamento': 'Norte', 'Cuenca': 'B'}
+        }
+
+        símismo.assertTupleEqual(_camino_jer(geog, '101', ['Departamento', 'Cuenca']), ('Norte', 'A'))
+        símismo.assertTupleEqual(_camino_jer(geog, ['101', '102'], ['Departamento']), ('Norte',))
+        with símismo.assertRaises(ValueError):
+            _camino_jer(geog, ['101', '102'], ['Departamento', 'Cuenca'])
+
+
+class Test_Derivadas(unittest.TestCase):
+
+    def test_derivar(símismo):
+        x = {'x': np.linspace(0.1, 2, 5)}
+        p = np.array([0.7, 1.3])
+        ecs = ['a * x + b', 'exp(a * x) / b', 'mín(a * x, b)', 'ln(b * x) - a ^ 2', 'a ^ x', 'abs(a - x) * tanh(b)']
+        for ec in ecs:
+            obj_ec = Ecuación(ec, dialecto='tinamït')
+            f = obj_ec.gen_func_python(['a', 'b'])
+            grad = obj_ec.gen_func_grad(['a', 'b'])
+
+            for í, d in enumerate(grad(p, x)):
+                dp = np.zeros(2)
+                dp[í] = 1e-6
+                np.testing.assert_allclose(
+                    np.broadcast_to(d, x['x'].shape), (f(p + dp, x) - f(p - dp, x)) / 2e-6, atol=1e-5, err_msg=ec
+                )
+
+    def test_optimizar(símismo):
+        x = np.linspace(0, 3, 1000)
+        obj_ec = Ecuación('a * exp(b * x) + c * x', dialecto='tinamït')
+
+        calib = optimizar(obj_ec, ['a', 'b', 'c'], [(None, None)] * 3, {'x': x}, 1.5 * np.exp(-0.8 * x) + 0.3 * x)
+        for p, v in {'a': 1.5, 'b': -0.8, 'c': 0.3}.items():
+            símismo.assertAlmostEqual(calib[p]['val'], v, places=3)
+
+
+class Test_OptimizarGlobal(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.x = np.linspace(0, 10, 500)
+        símismo.y = 2 * np.sin(1.7 * símismo.x) + 0.5
+        símismo.obj_ec = Ecuación('a * sin(b * x) + c', dialecto='tinamït')
+        símismo.líms = [(0, 5), (0, 5), (-2, 2)]
+
+    def test_evaluar_cands(símismo):
+        cands = np.array([[2, 1.7, 0.5], [0, 0, 0.5]])
+        ajustes = evaluar_cands(símismo.obj_ec, ['a', 'b', 'c'], cands, {'x': símismo.x}, símismo.y, tmñ_lote=600)
+
+        símismo.assertAlmostEqual(ajustes[0], 0)
+        símismo.assertAlmostEqual(ajustes[1], np.sqrt(np.mean(np.square(símismo.y - 0.5))))
+
+    def test_muestreo_lhs(símismo):
+        puntos = _muestrear(2, 10, 'lhs', semilla=1)
+
+        # Un punto en cada estrato de cada dimensión
+        for d in range(2):
+            símismo.assertListEqual(sorted(np.floor(puntos[:, d] * 10).astype(int).tolist()), list(range(10)))
+
+    def test_optimizar_global(símismo):
+        for muestreo in ['lhs', 'sobol']:
+            calib = optimizar_global(
+                símismo.obj_ec, ['a', 'b', 'c'], símismo.líms, {'x': símismo.x}, símismo.y, muestreo=muestreo,
+                semilla=1
+            )
+            for p, v in {'a': 2, 'b': 1.7, 'c': 0.5}.items():
+                símismo.assertAlmostEqual(calib[p]['val'], v, places=4)
+
+    def test_paralelo(símismo):
+        args = (símismo.obj_ec, ['a', 'b', 'c'], símismo.líms, {'x': símismo.x}, símismo.y)
+
+        símismo.assertDictEqual(optimizar_global(*args, semilla=1, paralelo=2), optimizar_global(*args, semilla=1))
+
+
+class Test_Controles(unittest.TestCase):
+
+    def test_compilar_ec(símismo):
+        obj_ec, paráms = _compilar_ec('x = y * {p[0]} + p[1] + y2 ** p[0]')
+
+        símismo.assertListEqual(paráms, ['pTinamït0', 'pTinamït1'])
+        símismo.assertSetEqual(obj_ec.variables(), {'y', 'y2', 'pTinamït0', 'pTinamït1'})
+        símismo.assertIs(_compilar_ec('x = y * {p[0]} + p[1] + y2 ** p[0]')[0], obj_ec)
+
+    def test_calibrar(símismo):
+        y = np.linspace(1, 2, 50)
+
+        class Modelo(object):
+            vars = {'x': {}}
+
+            @staticmethod
+            def parientes(var):
+                return ['y']
+
+            @staticmethod
+            def naturalizar_ec(ec):
+                return ec
+
+            exportar_ec = naturalizar_ec
+
+        class BD(object):
+            @staticmethod
+            def pedir_datos(l_vars, **ops):
+                return {'y': y, 'x': 3 * y - 1}
+
+        control = Control(bd=BD(), modelo=Modelo())
+        control._calibrar('x', escala='individual', ec_desparám='x = y * {p[0]} + {p[1]}',
+                          líms=[(-np.inf, np.inf)] * 2)
+
+        np.testing.assert_allclose(control.receta['ecs']['x']['párams'], [3, -1], atol=1e-5)
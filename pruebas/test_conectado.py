@@ -0,0 +1,203 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from tinamit.Conectado import MultiConectado, SuperConectado
+from tinamit.Modelo import Modelo
+
+
+class ModeloSalinidad(Modelo):
+    """
+    Un modelo cuya salinidad queda casi constante, con un salto al paso 10.
+    """
+
+    def inic_vars(símismo):
+        símismo.variables['Salinidad'] = {'val': 1, 'unidades': '', 'ingreso': False, 'egreso': True, 'dims': (1,)}
+
+    def obt_unidad_tiempo(símismo):
+        return 'mes'
+
+    def iniciar_modelo(símismo, tiempo_final, nombre_corrida):
+        símismo.t = 0
+        símismo.cambiar_vals({'Salinidad': 1})
+
+    def cambiar_vals_modelo_interno(símismo, valores):
+        pass
+
+    def incrementar(símismo, paso):
+        símismo.t += paso
+        símismo.variables['Salinidad']['val'] = (2 if símismo.t >= 10 else 1) * (1 + 1e-5 * símismo.t)
+
+    def leer_vals(símismo):
+        pass
+
+    def cerrar_modelo(símismo):
+        pass
+
+
+class ModeloCultivo(Modelo):
+    """
+    Un modelo que recibe la salinidad y cuenta los cambios de valores recibidos.
+    """
+
+    def inic_vars(símismo):
+        símismo.variables['Salinidad'] = {'val': 1, 'unidades': '', 'ingreso': True, 'egreso': False, 'dims': (1,)}
+        símismo.n_cambios = 0
+
+    def obt_unidad_tiempo(símismo):
+        return 'mes'
+
+    def iniciar_modelo(símismo, tiempo_final, nombre_corrida):
+        símismo.n_cambios = 0
+
+    def cambiar_vals_modelo_interno(símismo, valores):
+        símismo.n_cambios += 1
+
+    def incrementar(símismo, paso):
+        pass
+
+    def leer_vals(símismo):
+        pass
+
+    def cerrar_modelo(símismo):
+        pass
+
+
+class Test_IntercambioAdaptivo(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.mod = SuperConectado()
+        símismo.mod.estab_modelo(ModeloSalinidad('sal'))
+        símismo.mod.estab_modelo(ModeloCultivo('cult'))
+        símismo.mod.conectar_vars({'sal': 'Salinidad', 'cult': 'Salinidad'}, modelo_fuente='sal', conv=1)
+        símismo.cultivo = símismo.mod.modelos['cult']
+
+    def test_sin_tolerancia(símismo):
+        símismo.mod.simular(tiempo_final=20)
+
+        símismo.assertEqual(símismo.cultivo.n_cambios, 20)
+        símismo.assertEqual(símismo.mod.info_intercambios['omitidos'], 0)
+
+    def test_omitir(símismo):
+        símismo.mod.estab_intercambios(tol=1e-3, máx_intervalo=4)
+        res = símismo.mod.simular(tiempo_final=20, vars_interés=['cult_Salinidad'])
+        info = símismo.mod.info_intercambios
+
+        símismo.assertEqual(info['intercambios'] + info['omitidos'], 20)
+        símismo.assertEqual(símismo.cultivo.n_cambios, info['intercambios'])
+        símismo.assertGreater(info['omitidos'], 10)
+        símismo.assertGreaterEqual(info['aceleración'], 1)
+
+        # El salto de salinidad se transmite a más tardar después de máx_intervalo pasos.
+        sal = símismo.mod.leer_resultados('cult_Salinidad')
+        símismo.assertGreater(sal[15], 1.5)
+        np.testing.assert_allclose(sal[-1], 2, rtol=1e-3)
+
+    def test_puntos_control(símismo):
+        símismo.mod.estab_intercambios(tol=1e-3, máx_intervalo=8, puntos_control=[10])
+        símismo.mod.simular(tiempo_final=20, vars_interés=['cult_Salinidad'])
+
+        símismo.assertGreater(símismo.mod.leer_resultados('cult_Salinidad')[10], 1.5)
+
+    def test_copiar(símismo):
+        símismo.mod.estab_intercambios(tol=1e-3)
+        copia = pickle.loads(pickle.dumps(símismo.mod))
+
+        símismo.assertDictEqual(copia.ops_intercambio, símismo.mod.ops_intercambio)
+
+
+class ModeloContador(Modelo):
+    """
+    Un modelo cuyo egreso es el tiempo simulado (en sus propias unidades), y que guarda el ingreso que tenía a cada
+    paso.
+    """
+
+    def __init__(símismo, nombre, unidad_tiempo):
+        símismo._unidad_tiempo = unidad_tiempo
+        símismo.ingresos = []
+        super().__init__(nombre=nombre)
+
+    def inic_vars(símismo):
+        símismo.variables['Tiempo'] = {'val': 0, 'unidades': '', 'ingreso': False, 'egreso': True, 'dims': (1,)}
+        símismo.variables['Ingreso'] = {'val': 0, 'unidades': '', 'ingreso': True, 'egreso': False, 'dims': (1,)}
+
+    def obt_unidad_tiempo(símismo):
+        return símismo._unidad_tiempo
+
+    def iniciar_modelo(símismo, tiempo_final, nombre_corrida):
+        símismo.ingresos = []
+        símismo.cambiar_vals({'Tiempo': 0, 'Ingreso': 0})
+
+    def cambiar_vals_modelo_interno(símismo, valores):
+        pass
+
+    def incrementar(símismo, paso):
+        símismo.ingresos.append(símismo.variables['Ingreso']['val'])
+        símismo.variables['Tiempo']['val'] += paso
+
+    def leer_vals(símismo):
+        pass
+
+    def cerrar_modelo(símismo):
+        pass
+
+    def __getinitargs__(símismo):
+        return símismo.nombre, símismo._unidad_tiempo
+
+
+class Test_MultiConectado(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.mod = MultiConectado()
+        símismo.mod.estab_modelo(ModeloContador('mensual', 'mes'))
+        símismo.mod.estab_modelo(ModeloContador('anual', 'año'))
+        símismo.mod.estab_modelo(ModeloContador('trimestral', 'mes'), paso=3)
+
+        símismo.mod.conectar_vars('Tiempo', 'mensual', 'Ingreso', 'anual', conv=1)
+        símismo.mod.conectar_vars('Tiempo', 'anual', 'Ingreso', 'trimestral', conv=1)
+        símismo.mod.conectar_vars('Tiempo', 'trimestral', 'Ingreso', 'mensual', conv=1)
+
+    def test_pasos(símismo):
+        símismo.assertEqual(símismo.mod.unidad_tiempo, 'mes')
+        símismo.assertDictEqual(símismo.mod.factor_tiempo, {'mensual': 1, 'anual': 12, 'trimestral': 1})
+        símismo.assertEqual(símismo.mod.paso_macro, 12)
+
+    def test_simular(símismo):
+        símismo.mod.simular(tiempo_final=24, paso=1, vars_interés=['mensual_Tiempo', 'anual_Tiempo'])
+        modelos = símismo.mod.modelos
+
+        símismo.assertListEqual([len(modelos[m].ingresos) for m in modelos], [24, 2, 8])
+
+        # Cada modelo recibe los egresos de su fuente al fin de cada paso de esta.
+        símismo.assertListEqual(modelos['anual'].ingresos, [0, 12])
+        símismo.assertListEqual(modelos['trimestral'].ingresos, [0] * 4 + [1] * 4)
+        símismo.assertListEqual(modelos['mensual'].ingresos, np.repeat(np.arange(0, 24, 3), 3).tolist())
+
+        # El modelo anual avanza al principio de su paso.
+        anual = símismo.mod.leer_resultados('anual_Tiempo')
+        np.testing.assert_array_equal(anual[[0, 1, 12, 13]].ravel(), [0, 1, 1, 2])
+
+    def test_paralelo_igual(símismo):
+        símismo.mod.simular(tiempo_final=24)
+        paralelo = [m.ingresos for m in símismo.mod.modelos.values()]
+
+        símismo.mod.paralelo = False
+        símismo.mod.simular(tiempo_final=24)
+        símismo.assertListEqual([m.ingresos for m in símismo.mod.modelos.values()], paralelo)
+
+    def test_desconectar(símismo):
+        símismo.mod.quitar_modelo('anual')
+
+        símismo.assertEqual(len(símismo.mod.conexiones), 1)
+        símismo.assertListEqual(símismo.mod.modelos['trimestral'].vars_entrando, [])
+        símismo.assertNotIn('anual_Tiempo', símismo.mod.variables)
+        símismo.assertEqual(símismo.mod.paso_macro, 3)
+
+    def test_copiar(símismo):
+        símismo.mod.estab_conv_tiempo('anual', 6)
+        copia = pickle.loads(pickle.dumps(símismo.mod))
+
+        símismo.assertDictEqual(copia.pasos, símismo.mod.pasos)
+        símismo.assertDictEqual(copia.factor_tiempo, {'mensual': 1, 'anual': 6, 'trimestral': 1})
+        símismo.assertEqual(len(copia.conexiones), 3)
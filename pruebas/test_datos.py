@@ -0,0 +1,264 @@
+import datetime as ft
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from tinamit.Incertidumbre.Datos import BD, BDsql, BDtexto, DatosIndividuales, DatosRegión, SuperBD, \
+    _interpolar_grupos, _interpolar_reg
+from tinamit.Incertidumbre.Números import detectar_lengua, tx_a_núm, tx_a_núm_vec
+
+
+class Test_Números(unittest.TestCase):
+
+    def test_tx_a_núm(símismo):
+        símismo.assertEqual(tx_a_núm('-12'), -12)
+        símismo.assertEqual(tx_a_núm('2,5'), 2.5)
+        símismo.assertEqual(tx_a_núm('-੧.੫'), -1.5)
+
+    def test_detectar_lengua(símismo):
+        símismo.assertEqual(detectar_lengua(['१२', '३']), 'हिंदी')
+        símismo.assertIsNone(detectar_lengua(['abc']))
+
+    def test_tx_a_núm_vec(símismo):
+        np.testing.assert_array_equal(tx_a_núm_vec(['1', '२', '2,5', '३.५', '1e2']), [1, 2, 2.5, 3.5, 100])
+
+    def test_tx_a_núm_vec_error(símismo):
+        with símismo.assertRaises(ValueError):
+            tx_a_núm_vec(['1', 'abc'])
+
+
+class Test_Fechas(unittest.TestCase):
+
+    def test_formato(símismo):
+        # La muestra no permite distinguir entre días y meses, pero la lista entera sí.
+        fechas = ['01/02/2000'] * 100 + ['25/12/2001']
+        símismo.assertEqual(BD._detectar_formato_fecha(fechas), '%d/%m/%Y')
+
+    def test_leer_fechas(símismo):
+        inic, v = BD._leer_fechas(['2000-01-03', '1999-12-31', '2000-03-01'])
+
+        símismo.assertEqual(inic, ft.date(1999, 12, 31))
+        símismo.assertListEqual(v.tolist(), [3, 0, 61])
+
+    def test_fechas_numéricas(símismo):
+        inic, v = BD._leer_fechas(['2000', '2001'])
+
+        símismo.assertIsNone(inic)
+        símismo.assertListEqual(v.tolist(), [2000, 2001])
+
+    def test_error(símismo):
+        with símismo.assertRaises(ValueError):
+            BD._leer_fechas(['2000-01-03', 'ayer'])
+
+
+class Test_Interpolar(unittest.TestCase):
+
+    def test_interpolar_tiempo(símismo):
+        res = pd.DataFrame({
+            'lugar': ['1', '1', '1', '2', '2'],
+            'fecha': pd.to_datetime(['2000-01-01', '2000-01-11', '2000-01-31', '2000-01-01', '2000-01-02']),
+            'a': [0, np.nan, 3, 5, 6],
+            'b': [1, 1, 1, np.nan, 2],
+        })
+        interpol = _interpolar_reg(res, ['a', 'b'])
+
+        símismo.assertListEqual(interpol['a'].tolist(), [0, 1, 3, 6])
+        símismo.assertListEqual(interpol['lugar'].tolist(), ['1', '1', '1', '2'])
+
+    def test_interpolar_grupos(símismo):
+        y = np.array([np.nan, 1, np.nan, 3, 10, np.nan])
+        x = np.array([0, 1, 2, 3, 0, 1], dtype=float)
+        np.testing.assert_array_equal(_interpolar_grupos(y, x, grupos=np.array([0, 0, 0, 0, 1, 1])),
+                                      [1, 1, 2, 3, 10, 10])
+
+
+class Test_BDtexto(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.dir = tempfile.mkdtemp()
+        símismo.archivo = os.path.join(símismo.dir, 'datos.csv')
+        with open(símismo.archivo, 'w', encoding='utf8', newline='') as d:
+            d.write('lugar,a,b\n'
+                    '01,1,2.5\n'
+                    '02,NA,१२\n'
+                    '03,3e2,\n')
+
+        símismo.bd = BDtexto(símismo.archivo)
+
+    def test_n_obs_y_cols(símismo):
+        símismo.assertEqual(símismo.bd.n_obs, 3)
+        símismo.assertListEqual(símismo.bd.obt_nombres_cols(), ['lugar', 'a', 'b'])
+
+    def test_obt_datos(símismo):
+        datos = símismo.bd.obt_datos(['a', 'b'], cód_vacío={'', 'NA'})
+
+        np.testing.assert_array_equal(datos, [[1, np.nan, 300], [2.5, 12, np.nan]])
+
+    def test_obt_datos_tx(símismo):
+        símismo.assertListEqual(símismo.bd.obt_datos_tx('lugar'), ['01', '02', '03'])
+        símismo.assertListEqual(símismo.bd.obt_datos_tx(['lugar', 'b']), [['01', '02', '03'], ['2.5', '१२', '']])
+
+    def test_no_releer(símismo):
+        símismo.bd.obt_datos('b')
+
+        with patch('tinamit.Incertidumbre.Datos.open', side_effect=AssertionError) as abrir:
+            símismo.bd.obt_datos(['a', 'b'], cód_vacío={'', 'NA'})
+        abrir.assert_not_called()
+
+    def tearDown(símismo):
+        shutil.rmtree(símismo.dir)
+
+
+class Test_SuperBD(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.dir = tempfile.mkdtemp()
+
+        arch_reg = os.path.join(símismo.dir, 'regional.csv')
+        with open(arch_reg, 'w', encoding='utf8', newline='') as d:
+            d.write('lugar,fecha,a,b\n'
+                    '1,2000-01-01,1,10\n'
+                    '1,2001-01-01,2,20\n'
+                    '2,2000-01-01,3,\n')
+        arch_ind = os.path.join(símismo.dir, 'individual.csv')
+        with open(arch_ind, 'w', encoding='utf8', newline='') as d:
+            d.write('lugar,fecha,a\n'
+                    '1,2000-01-01,5\n'
+                    '2,2000-01-01,6\n')
+
+        símismo.reg = DatosRegión('reg', arch_reg, fecha='fecha', lugar='lugar')
+        símismo.ind = DatosIndividuales('ind', arch_ind, fecha='fecha', lugar='lugar')
+        símismo.bd = SuperBD('Prueba', bds=[símismo.reg, símismo.ind])
+        símismo.bd.espec_var('a')
+
+    def test_obt_datos(símismo):
+        datos = símismo.bd.obt_datos('a')
+
+        símismo.assertListEqual(datos['regional']['a'].tolist(), [1, 2, 3])
+        símismo.assertListEqual(datos['individual']['a'].tolist(), [5, 6])
+        símismo.assertListEqual(datos['regional']['lugar'].tolist(), ['1', '1', '2'])
+
+    def test_agregar_var_sin_releer(símismo):
+        símismo.bd.obt_datos('a')
+
+        with patch.object(símismo.reg, 'obt_datos', wraps=símismo.reg.obt_datos) as obt_reg, \
+                patch.object(símismo.ind, 'obt_datos', wraps=símismo.ind.obt_datos) as obt_ind:
+            símismo.bd.espec_var('b', bds='reg')
+            datos = símismo.bd.obt_datos(['a', 'b'])
+
+        obt_reg.assert_called_once_with(l_vars=['b'], cód_vacío=[''])
+        obt_ind.assert_not_called()
+        np.testing.assert_array_equal(datos['regional']['b'], [10, 20, np.nan])
+
+    def test_borrar_y_renombrar(símismo):
+        símismo.bd.obt_datos('a')
+        símismo.bd.renombrar_var('a', 'c')
+
+        with patch.object(símismo.reg, 'obt_datos') as obt_reg:
+            datos = símismo.bd.obt_datos('c')
+            símismo.bd.borrar_var('c', bds='ind')
+            símismo.assertIsNone(símismo.bd.obt_datos('c')['individual'])
+        obt_reg.assert_not_called()
+        símismo.assertListEqual(datos['regional']['c'].tolist(), [1, 2, 3])
+
+    def test_obt_datos_reg(símismo):
+        símismo.bd.espec_var('b', bds='reg')
+        datos = símismo.bd.obt_datos_reg(['a', 'b'], lugar=['1', '2'])
+
+        # El lugar "2" no tiene datos para "b", así que no queda nada.
+        símismo.assertListEqual(datos['lugar'].tolist(), ['1', '1'])
+        símismo.assertListEqual(datos['a'].tolist(), [1, 2])
+
+    def tearDown(símismo):
+        shutil.rmtree(símismo.dir)
+
+
+class Test_BDsql(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.dir = tempfile.mkdtemp()
+        símismo.archivo = os.path.join(símismo.dir, 'datos.sqlite')
+
+        con = sqlite3.connect(símismo.archivo)
+        con.execute('CREATE TABLE datos (lugar TEXT, fecha TEXT, a REAL, b TEXT)')
+        con.executemany('INSERT INTO datos VALUES (?, ?, ?, ?)', [
+            ('01', '2000-01-01', 1, '10'),
+            ('01', '2001-01-01', 2, 'NA'),
+            ('02', '2000-01-01', 3, '१२'),
+            ('03', '2000-01-01', None, '40'),
+        ])
+        con.commit()
+        con.close()
+
+        símismo.reg = DatosRegión('reg', símismo.archivo, fecha='fecha', lugar='lugar', cód_vacío='NA')
+
+    def test_obt_datos(símismo):
+        bd = BDsql(símismo.archivo, tmñ_lote=3)
+
+        símismo.assertEqual(bd.n_obs, 4)
+        símismo.assertListEqual(bd.obt_nombres_cols(), ['lugar', 'fecha', 'a', 'b'])
+        np.testing.assert_array_equal(bd.obt_datos(['a', 'b'], cód_vacío={'NA'}),
+                                      [[1, 2, 3, np.nan], [10, np.nan, 12, 40]])
+        símismo.assertListEqual(bd.obt_datos_tx('lugar'), ['01', '01', '02', '03'])
+
+    def test_índices(símismo):
+        def índices():
+            con = sqlite3.connect(símismo.archivo)
+            try:
+                return {x for x, in con.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+            finally:
+                con.close()
+
+        # Abrir los datos no modifica la base de datos; los índices se crean únicamente si se piden.
+        símismo.assertSetEqual(índices(), set())
+
+        DatosRegión('reg', símismo.archivo, fecha='fecha', lugar='lugar', indexar=True)
+        símismo.assertSetEqual(índices(), {'tinamit_datos_fecha', 'tinamit_datos_lugar_código'})
+
+    def test_filtrar(símismo):
+        bd = SuperBD('Prueba', bds=[símismo.reg])
+        bd.espec_var('a')
+        bd.espec_var('b')
+
+        with patch.object(BDsql, 'obt_datos_filtrados', wraps=símismo.reg.bd.obt_datos_filtrados) as obt:
+            datos = bd.obt_datos(['a', 'b'], lugar=['1'], fechas=[ft.date(2001, 1, 1)])['regional']
+
+        # El filtro se hizo en la base de datos misma.
+        símismo.assertDictEqual(obt.call_args[1]['filtros'], {'lugar': ['1'], 'fecha': ['2001-01-01']})
+        símismo.assertListEqual(datos['lugar'].tolist(), ['1'])
+        símismo.assertListEqual(datos['a'].tolist(), [2])
+        símismo.assertTrue(np.isnan(datos['b'].values[0]))
+
+    def test_guardar_datos(símismo):
+        bd = SuperBD('Prueba', bds=[símismo.reg])
+        bd.espec_var('a')
+        archivo = os.path.join(símismo.dir, 'datos.json')
+        bd.guardar_datos(archivo)
+
+        # Los datos de la base de datos filtrable se leen todos para guardarlos.
+        with open(archivo, encoding='UTF-8') as d:
+            dic = json.load(d)
+        np.testing.assert_array_equal(pd.read_json(io.StringIO(dic['reg']))['a'], [1, 2, 3, np.nan])
+        símismo.assertIsNone(dic['ind'])
+
+    def test_script_sql(símismo):
+        archivo = os.path.join(símismo.dir, 'datos.sql')
+        with open(archivo, 'w', encoding='utf8') as d:
+            d.write("CREATE TABLE otra (x REAL, y TEXT);\n"
+                    "INSERT INTO otra VALUES (1.5, 'a');\n"
+                    "INSERT INTO otra VALUES (2, 'b');\n")
+
+        bd = BDsql(archivo)
+        np.testing.assert_array_equal(bd.obt_datos('x'), [1.5, 2])
+        símismo.assertTrue(os.path.isfile(bd.archivo_sqlite))
+
+    def tearDown(símismo):
+        shutil.rmtree(símismo.dir)
@@ -0,0 +1,70 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from tinamit.BF import EnvolturaBF
+from tinamit.Incertidumbre.Emulador import Emulador, _RegresorPolinomial
+
+
+def simular_embalse(nivel, lluvia):
+    """
+    El "modelo lento": un embalse que pierde 10% de su nivel cada mes y recibe la lluvia.
+    """
+    niveles = [nivel]
+    for ll in lluvia[:-1]:
+        niveles.append(0.9 * niveles[-1] + ll)
+    return np.array(niveles)
+
+
+class Test_Emulador(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.variables = {
+            'Nivel': {'val': 0, 'unidades': 'm', 'ingreso': False, 'egreso': True, 'dims': (1,)},
+            'Lluvia': {'val': 0, 'unidades': 'm', 'ingreso': True, 'egreso': False, 'dims': (1,)},
+        }
+
+        aleat = np.random.RandomState(1)
+        lluvias = [aleat.uniform(0, 2, size=13) for _ in range(20)]
+        símismo.datos = {
+            'Nivel': [simular_embalse(aleat.uniform(0, 10), ll) for ll in lluvias],
+            'Lluvia': lluvias
+        }
+
+    def test_polinomio(símismo):
+        x = np.random.RandomState(1).uniform(-1, 3, size=(100, 2))
+        regresor = _RegresorPolinomial(grado=3)
+        regresor.ajustar(x, (x[:, 0] ** 3 - x[:, 0] * x[:, 1])[:, np.newaxis])
+
+        np.testing.assert_allclose(regresor.predecir(np.array([[2, 0.5]])), [[7]])
+
+    def test_entrenar(símismo):
+        emul = Emulador(símismo.variables, unidad_tiempo='mes')
+        validación = emul.entrenar(símismo.datos, grado=1, semilla=1)
+
+        símismo.assertListEqual(list(validación), ['Nivel'])
+        símismo.assertLess(validación['Nivel']['nrmse_trayectoria'], 1e-6)
+
+    def test_en_envoltura(símismo):
+        emul = Emulador(símismo.variables, unidad_tiempo='mes')
+        emul.entrenar(símismo.datos, grado=1)
+
+        # La envoltura BF copia el modelo; el entrenamiento debe quedar.
+        envoltura = EnvolturaBF(emul)
+        envoltura.inic_vals({'Nivel': 5, 'Lluvia': 1})
+        res = envoltura.simular(tiempo_final=6, vars_interés='Nivel')
+
+        np.testing.assert_allclose(res['Nivel'][:, 0], simular_embalse(5, np.ones(7)))
+
+    def test_pickle(símismo):
+        emul = Emulador(símismo.variables, unidad_tiempo='mes')
+        emul.entrenar(símismo.datos, grado=1)
+        copia = pickle.loads(pickle.dumps(emul))
+
+        símismo.assertDictEqual(copia.validación, emul.validación)
+        símismo.assertEqual(copia.unidad_tiempo, 'mes')
+
+    def test_sin_entrenar(símismo):
+        with símismo.assertRaises(ValueError):
+            Emulador(símismo.variables, unidad_tiempo='mes').incrementar(1)
@@ -0,0 +1,149 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import shapefile as sf
+from PIL import Image as Imagen
+
+from tinamit.Geog.Geog import AlmacénFormas, Geografía, _í_colores
+
+
+def crear_forma_regiones(archivo):
+    """
+    Crea un archivo ``.shp`` con 3 regiones cuadradas; la última tiene dos partes.
+    """
+
+    with sf.Writer(archivo, shapeType=sf.POLYGON) as e:
+        e.field('orden', 'N')
+        for í, orden in enumerate([2, 0, 1]):
+            partes = [[[í, 0], [í, 1], [í + 1, 1], [í + 1, 0], [í, 0]]]
+            if í == 2:
+                partes.append([[í, 2], [í, 3], [í + 1, 3], [í + 1, 2], [í, 2]])
+            e.poly(partes)
+            e.record(orden)
+
+
+class Test_DibujarGeog(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.mkdtemp()
+        cls.archivo = os.path.join(cls.dir, 'regiones')
+        crear_forma_regiones(cls.archivo)
+
+    def setUp(símismo):
+        símismo.geog = Geografía('Prueba')
+        símismo.geog.agregar_frm_regiones(símismo.archivo + '.shp', col_orden='orden')
+
+    def test_vértices(símismo):
+        polígonos, í_formas, n_formas = símismo.geog.regiones['Principal']['af'].vértices()
+
+        símismo.assertEqual(n_formas, 3)
+        símismo.assertListEqual(í_formas.tolist(), [0, 1, 2, 2])
+        símismo.assertTrue(all(p.shape == (5, 2) for p in polígonos))
+
+    def test_almacén_formas(símismo):
+        almacén = AlmacénFormas(símismo.archivo, caché=False)
+
+        símismo.assertEqual(almacén.coords.shape, (20, 2))
+        símismo.assertListEqual(almacén.í_partes.tolist(), [0, 5, 10, 15, 20])
+        símismo.assertListEqual(almacén.í_formas.tolist(), [0, 1, 2, 4])
+        símismo.assertListEqual(almacén.obt_col('orden').tolist(), [2, 0, 1])
+
+    def test_caché_formas(símismo):
+        almacén = AlmacénFormas(símismo.archivo)
+        coords = almacén.coords
+        símismo.assertTrue(os.path.isfile(almacén.archivo_caché))
+
+        # La segunda vez, las geometrías se leen del archivo .npz.
+        otro = AlmacénFormas(símismo.archivo)
+        with patch.object(otro, '_leer_shp') as leer:
+            np.testing.assert_array_equal(otro.coords, coords)
+        leer.assert_not_called()
+
+    def test_orden_colores(símismo):
+        d_reg = símismo.geog.regiones['Principal']
+        í_colores = _í_colores(símismo.geog._obt_vértices(d_reg), orden=d_reg['orden_regs'])
+
+        # El primer color va a la forma con el orden más bajo.
+        símismo.assertListEqual(í_colores.tolist(), [2, 0, 1, 1])
+
+    def test_dibujar_serie(símismo):
+        archivos = [os.path.join(símismo.dir, 'mapa {}.png'.format(i)) for i in range(3)]
+        símismo.geog.dibujar_serie(archivos=archivos, valores=np.arange(9).reshape((3, 3)), título='Prueba')
+
+        símismo.assertTrue(all(os.path.isfile(a) for a in archivos))
+
+    def test_dibujar_serie_paralelo(símismo):
+        archivos = [os.path.join(símismo.dir, 'mapa paralelo {}.png'.format(i)) for i in range(4)]
+        símismo.geog.dibujar_serie(archivos=archivos, valores=np.arange(12).reshape((3, 4)), dpi=50, paralelo=2)
+
+        símismo.assertTrue(all(os.path.isfile(a) for a in archivos))
+
+    def test_animación_gif(símismo):
+        archivo = os.path.join(símismo.dir, 'mapa.gif')
+        símismo.geog.dibujar_serie(archivos=archivo, valores=np.arange(12).reshape((3, 4)), formato='gif', dpi=20)
+
+        with Imagen.open(archivo) as img:
+            símismo.assertEqual(img.n_frames, 4)
+
+    def test_sprite(símismo):
+        archivo = os.path.join(símismo.dir, 'mapa sprite.png')
+        símismo.geog.dibujar_serie(archivos=archivo, valores=np.arange(12).reshape((3, 4)), formato='sprite', dpi=20)
+
+        # 4 mapas en una cuadrícula de 2 x 2
+        with Imagen.open(archivo) as img:
+            símismo.assertEqual(img.size, (2 * 6.4 * 20, 2 * 4.8 * 20))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.dir)
+
+
+class Test_JerarquíaGeog(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.mkdtemp()
+        cls.archivo = os.path.join(cls.dir, 'regiones.csv')
+        with open(cls.archivo, 'w', encoding='utf8') as d:
+            d.write('Código,Departamento,Municipio,Cuenca\n'
+                    '1,Norte,,\n'
+                    '2,Sur,,\n'
+                    '101,Norte,Centro,A\n'
+                    '102,Norte,Río,B\n'
+                    '201,Sur,Centro,A\n')
+
+    def setUp(símismo):
+        símismo.geog = Geografía('Prueba')
+        símismo.geog.agregar_info_regiones(
+            símismo.archivo, col_cód='Código', orden_jer=['Departamento', 'Municipio'], grupos='Cuenca'
+        )
+
+    def test_lugares_en_escala(símismo):
+        símismo.assertListEqual(símismo.geog.obt_lugares_en(escala='Departamento'), ['1', '2'])
+        símismo.assertListEqual(símismo.geog.obt_lugares_en(), ['101', '102', '201'])
+
+    def test_lugares_en_región(símismo):
+        símismo.assertListEqual(símismo.geog.obt_lugares_en(en='1'), ['101', '102'])
+        símismo.assertListEqual(símismo.geog.obt_lugares_en(en=['1', '2']), ['101', '102', '201'])
+
+    def test_lugares_en_grupo(símismo):
+        símismo.assertListEqual(símismo.geog.obt_lugares_en(en={'Cuenca': 'A'}), ['101', '201'])
+        símismo.assertListEqual(sorted(símismo.geog.obt_en_grupo('Cuenca', ['A', 'B'])), ['101', '102', '201'])
+
+    def test_por(símismo):
+        símismo.assertDictEqual(
+            símismo.geog.obt_lugares_en(por='Cuenca'), {'Cuenca A': ['101', '201'], 'Cuenca B': ['102']}
+        )
+
+    def test_padres(símismo):
+        símismo.assertEqual(símismo.geog.obt_padre('201'), '2')
+        símismo.assertIsNone(símismo.geog.obt_padre('1'))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.dir)
@@ -0,0 +1,179 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from tinamit.Conectado import Conectado, SuperConectado
+from tinamit.Incertidumbre.Sensibilidad import AnálisisSensib, gen_diseño_morris, gen_diseño_saltelli, \
+    índices_morris, índices_sobol
+from tinamit.Modelo import Modelo
+
+
+class ModeloLineal(Modelo):
+    """
+    Un modelo sencillo cuyo nivel aumenta de ``a + 2 * b`` cada paso.
+    """
+
+    def __init__(símismo, nombre='Lineal'):
+        símismo.n_simuls = 0
+        super().__init__(nombre=nombre)
+
+    def inic_vars(símismo):
+        símismo.variables['a'] = {'val': 0, 'unidades': '', 'ingreso': True, 'egreso': False, 'dims': (1,),
+                                  'líms': (0, 1)}
+        símismo.variables['b'] = {'val': 0, 'unidades': '', 'ingreso': True, 'egreso': False, 'dims': (1,),
+                                  'líms': (0, 1)}
+        símismo.variables['Nivel'] = {'val': 0, 'unidades': '', 'ingreso': False, 'egreso': True, 'dims': (1,),
+                                      'líms': (None, None)}
+
+    def obt_unidad_tiempo(símismo):
+        return 'año'
+
+    def iniciar_modelo(símismo, tiempo_final, nombre_corrida):
+        símismo.n_simuls += 1
+        símismo.cambiar_vals({'a': 0, 'b': 0, **símismo.vals_inic, 'Nivel': 0})
+
+    def cambiar_vals_modelo_interno(símismo, valores):
+        pass
+
+    def incrementar(símismo, paso):
+        símismo.variables['Nivel']['val'] += paso * (símismo.variables['a']['val'] + 2 * símismo.variables['b']['val'])
+
+    def leer_vals(símismo):
+        pass
+
+    def cerrar_modelo(símismo):
+        pass
+
+    def paralelizable(símismo):
+        return True
+
+
+class Test_Diseños(unittest.TestCase):
+
+    def test_sobol_lineal(símismo):
+        n, d = 4096, 3
+        x = gen_diseño_saltelli(n, d, semilla=1)
+        índs = índices_sobol(x @ np.array([1, 2, 0]), n=n, d=d)
+
+        # Varianzas de 1, 4 y 0: S = [0.2, 0.8, 0]
+        np.testing.assert_allclose(índs['S1'], [0.2, 0.8, 0], atol=0.03)
+        np.testing.assert_allclose(índs['ST'], [0.2, 0.8, 0], atol=0.03)
+
+    def test_sobol_ishigami(símismo):
+        n, d = 2 ** 14, 3
+        x = -np.pi + 2 * np.pi * gen_diseño_saltelli(n, d, semilla=1)
+        y = np.sin(x[:, 0]) + 7 * np.sin(x[:, 1]) ** 2 + 0.1 * x[:, 2] ** 4 * np.sin(x[:, 0])
+
+        índs = índices_sobol(np.stack([y, 2 * y], axis=1), n=n, d=d)
+        símismo.assertEqual(índs['S1'].shape, (3, 2))
+        np.testing.assert_allclose(índs['S1'][:, 0], [0.314, 0.442, 0], atol=0.03)
+        np.testing.assert_allclose(índs['ST'][:, 1], [0.558, 0.442, 0.244], atol=0.03)
+
+    def test_morris(símismo):
+        r, d = 20, 3
+        x = gen_diseño_morris(r, d, semilla=1)
+
+        # Cada paso de cada trayectoria cambia un solo parámetro, y todos los puntos quedan en el hipercubo.
+        símismo.assertTrue(np.all((x >= 0) & (x <= 1)))
+        pasos = np.diff(x.reshape((r, d + 1, d)), axis=1)
+        símismo.assertTrue(np.all(np.count_nonzero(pasos, axis=2) == 1))
+
+        índs = índices_morris(x @ np.array([1, -2, 0]), x, d=d)
+        np.testing.assert_allclose(índs['mu'], [1, -2, 0])
+        np.testing.assert_allclose(índs['mu_star'], [1, 2, 0])
+        np.testing.assert_allclose(índs['sigma'], 0, atol=1e-10)
+
+
+class Test_AnálisisSensib(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.dir = tempfile.mkdtemp()
+        símismo.archivo = os.path.join(símismo.dir, 'sensib.npz')
+
+    def test_análisis(símismo):
+        mod = ModeloLineal()
+        análisis = AnálisisSensib(mod, paráms=['a', 'b'], vars_egr='Nivel', n=256, semilla=1)
+        análisis.correr(tiempo_final=3, tmñ_bloque=100, paralelo=False)
+        índs = análisis.calc_índices()['Nivel']
+
+        símismo.assertEqual(mod.n_simuls, 256 * 4)
+        símismo.assertEqual(índs['S1'].shape, (2, 4, 1))
+        np.testing.assert_allclose(índs['ST'][:, -1, 0], [0.2, 0.8], atol=0.05)
+
+    def test_paralelo(símismo):
+        mod = SuperConectado()
+        mod.estab_modelo(ModeloLineal('L1'))
+        mod.estab_modelo(ModeloLineal('L2'))
+        mod.conectar_vars({'L1': 'Nivel', 'L2': 'a'}, modelo_fuente='L1', conv=1)
+
+        índs = {}
+        for paralelo in [True, False]:
+            análisis = AnálisisSensib(mod, paráms=['L1_a', 'L1_b'], vars_egr='L1_Nivel', n=64, semilla=1)
+            análisis.correr(tiempo_final=3, tmñ_bloque=100, paralelo=paralelo)
+            índs[paralelo] = análisis.calc_índices()['L1_Nivel']
+
+        for í, v in índs[False].items():
+            np.testing.assert_allclose(índs[True][í], v)
+
+    def test_conectado(símismo):
+        # Un modelo Conectado lee sus resultados de corridas del modelo DS; los del análisis vienen de la memoria.
+        mod = Conectado()
+        for nombre in ['mds', 'bf']:
+            mod.estab_modelo(ModeloLineal(nombre))
+        mod.mds, mod.bf = mod.modelos['mds'], mod.modelos['bf']
+        mod.conectar(var_mds='a', var_bf='Nivel', mds_fuente=False, conv=1)
+
+        índs = {}
+        for paralelo in [2, False]:
+            análisis = AnálisisSensib(mod, paráms=['mds_b', 'bf_a'], vars_egr='mds_Nivel', n=16, semilla=1)
+            análisis.correr(tiempo_final=3, tmñ_bloque=20, paralelo=paralelo)
+            índs[paralelo] = análisis.calc_índices()['mds_Nivel']
+
+        símismo.assertEqual(índs[False]['S1'].shape, (2, 4, 1))
+        for í, v in índs[False].items():
+            np.testing.assert_allclose(índs[2][í], v)
+
+    def test_retomar(símismo):
+        análisis = AnálisisSensib(ModeloLineal(), paráms=['a', 'b'], vars_egr='Nivel', método='morris', n=10,
+                                  archivo=símismo.archivo, semilla=1)
+        análisis.correr(tiempo_final=2, tmñ_bloque=7, paralelo=False)
+        referencia = análisis.calc_índices()['Nivel']
+
+        # Simular una interrupción después del primer bloque
+        mod = ModeloLineal()
+        interrumpido = AnálisisSensib(mod, paráms=['a', 'b'], vars_egr='Nivel', método='morris', n=10,
+                                      archivo=símismo.archivo, semilla=1)
+        interrumpido.n_hechas = 7
+        interrumpido._guardar()
+
+        retomado = AnálisisSensib(mod, paráms=['a', 'b'], vars_egr='Nivel', método='morris', n=10,
+                                  archivo=símismo.archivo, semilla=1)
+        símismo.assertEqual(retomado.n_hechas, 7)
+        with símismo.assertRaises(ValueError):
+            retomado.calc_índices()
+
+        retomado.correr(tiempo_final=2, tmñ_bloque=7, paralelo=False)
+        símismo.assertEqual(mod.n_simuls, 30 - 7)
+        for í, v in referencia.items():
+            np.testing.assert_allclose(retomado.calc_índices()['Nivel'][í], v)
+
+    def test_otro_diseño(símismo):
+        AnálisisSensib(ModeloLineal(), paráms=['a', 'b'], vars_egr='Nivel', n=8, archivo=símismo.archivo,
+                       semilla=1)._guardar()
+
+        with símismo.assertRaises(ValueError):
+            AnálisisSensib(ModeloLineal(), paráms=['a', 'b'], vars_egr='Nivel', n=8, archivo=símismo.archivo,
+                           semilla=2)
+
+    def test_líms(símismo):
+        with símismo.assertRaises(ValueError):
+            AnálisisSensib(ModeloLineal(), paráms=['a', 'Nivel'], vars_egr='Nivel')
+
+        análisis = AnálisisSensib(ModeloLineal(), paráms=['a', 'b'], vars_egr='Nivel', líms={'b': (2, 3)}, n=8)
+        símismo.assertTrue(np.all(análisis.diseño[:, 1] >= 2))
+
+    def tearDown(símismo):
+        shutil.rmtree(símismo.dir)
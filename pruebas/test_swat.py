@@ -0,0 +1,228 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from tinamit.EnvolturaBF.en.SWAT import SWAT_Wrappper
+from tinamit.EnvolturaBF.en.SWAT.SWAT_Wrappper import ModeloSWAT
+
+
+def crear_proyecto_swat(directorio, n_hru=3):
+    """
+    Crea un proyecto SWAT mínimo (1 subcuenca, `n_hru` HRUs) para las pruebas.
+    """
+
+    def escribir(archivo, texto):
+        with open(os.path.join(directorio, archivo), 'w') as d:
+            d.write(texto)
+
+    escribir('file.cio', 'Proyecto de prueba\n'
+                         '               1   | IPRINT : print code\n'
+                         '               2000   | IYR : beginning year\n'
+                         '               0   | NYSKIP : years to skip\n'
+                         '               1   | IDAF : beginning day\n'
+                         '               1   | IDAL : ending day\n')
+    escribir('basins.bsn', 'Basin data\n'
+                           '            1.000    | SFTMP : Snowfall temperature\n')
+
+    hrus = ''.join('{} --> AGRL/SOIL/0-9999  \n'.format(i + 1) for i in range(n_hru))
+    escribir('HRULandUseSoilsReport.txt',
+             '\n' * 4 +
+             'Number of HRUs: {}\n'.format(n_hru) +
+             'Number of Subbasins: 1\n' +
+             '\n' * 4 +
+             'Watershed 100.0\n' +
+             '\n' * 3 +
+             'LANDUSE:\n  Agricultural Land-Generic --> AGRL  \n\n'
+             'SOILS:\n  SOIL  \n\n'
+             'SLOPE:\n  0-9999  \n'
+             '_____\n'
+             'HRUs\n' + hrus + '_____\n')
+
+    for h in range(n_hru):
+        nombre = '00001{:04d}'.format(h + 1)
+        escribir(nombre + '.mgt', 'mgt\n            77.0    | CN2 : Curve number\n')
+        escribir(nombre + '.hru', 'hru\n            0.95    | ESCO : Soil evaporation compensation factor\n')
+        escribir(nombre + '.gw', 'gw\n            1000.0    | SHALLST : Initial depth of water\n')
+        escribir(nombre + '.sdr', 'sdr\n            20.0    | RE : Effective radius of drains\n')
+        escribir(nombre + '.sep', 'sep\n            0    | ISEP_TYP : Septic system type\n')
+        escribir(nombre + '.sol', 'sol\n Soil pH: 7\n\n')
+
+    escribir('000010000.pnd', 'pnd\n            0.1    | PND_FR : Fraction of subbasin area\n')
+    escribir('000010000.rte', 'rte\n            5.0    | CHW2 : Main channel width\n')
+
+
+class Test_EscribirSWAT(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.dir = tempfile.mkdtemp()
+        crear_proyecto_swat(símismo.dir)
+        símismo.mod = ModeloSWAT(símismo.dir, swat_exe='swat')
+
+    def _contar_escrituras(símismo, valores):
+        escrituras = []
+
+        def abrir(archivo, modo='r', *args, **kwargs):
+            if 'w' in modo:
+                escrituras.append(os.path.split(archivo)[1])
+            return open(archivo, modo, *args, **kwargs)
+
+        with mock.patch.object(SWAT_Wrappper, 'open', abrir, create=True):
+            símismo.mod.cambiar_vals(valores)
+
+        return escrituras
+
+    def test_escribir_solamente_hru_cambiado(símismo):
+        cn2 = símismo.mod.variables['CN2']['val'].copy()
+        cn2[1] = 80
+
+        escrituras = símismo._contar_escrituras({'CN2': cn2})
+        símismo.assertCountEqual(escrituras, ['file.cio', '000010002.mgt'])
+
+        with open(os.path.join(símismo.dir, '000010002.mgt')) as d:
+            símismo.assertIn('80.0', d.read())
+
+    def test_no_reescribir_sin_cambios(símismo):
+        símismo._contar_escrituras({'CN2': símismo.mod.variables['CN2']['val'].copy()})
+        escrituras = símismo._contar_escrituras({'CN2': símismo.mod.variables['CN2']['val'].copy()})
+
+        # Solamente cambian las fechas de simulación
+        símismo.assertListEqual(escrituras, ['file.cio'])
+
+    def test_cambiado_indices(símismo):
+        símismo.assertSetEqual(SWAT_Wrappper.changed_indices(np.array([1., np.nan, 3.]),
+                                                             np.array([1., np.nan, 4.])), {2})
+
+    def tearDown(símismo):
+        shutil.rmtree(símismo.dir)
+
+
+class Test_CopiaProyectoSWAT(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.dir = tempfile.mkdtemp()
+        crear_proyecto_swat(símismo.dir)
+        símismo.mod = ModeloSWAT(símismo.dir, swat_exe='swat')
+        símismo.mod.iniciar_modelo(tiempo_final=1, nombre_corrida='prueba')
+
+    def test_paralelizable(símismo):
+        símismo.assertTrue(símismo.mod.paralelizable())
+
+    def test_corrida_en_copia(símismo):
+        dir_copia = símismo.mod.working_dir
+        símismo.assertNotEqual(dir_copia, símismo.dir)
+        símismo.assertTrue(os.path.samefile(os.path.join(símismo.dir, '000010002.mgt'),
+                                            os.path.join(dir_copia, '000010002.mgt')))
+
+    def test_original_no_cambia(símismo):
+        cn2 = símismo.mod.variables['CN2']['val'].copy()
+        cn2[0] = 80
+        símismo.mod.cambiar_vals({'CN2': cn2})
+
+        with open(os.path.join(símismo.mod.working_dir, '000010001.mgt')) as d:
+            símismo.assertIn('80.0', d.read())
+        with open(os.path.join(símismo.dir, '000010001.mgt')) as d:
+            símismo.assertIn('77.0', d.read())
+
+    def test_cerrar(símismo):
+        dir_copia = símismo.mod.working_dir
+        símismo.mod.cerrar_modelo()
+
+        símismo.assertEqual(símismo.mod.working_dir, símismo.dir)
+        símismo.assertListEqual(os.listdir(dir_copia), [])
+
+    def tearDown(símismo):
+        símismo.mod.cerrar_modelo()
+        símismo.mod.clone_pool.vaciar()
+        SWAT_Wrappper._loaded_projects.clear()
+        shutil.rmtree(símismo.dir)
+
+
+class Test_ProyectoSWAT(unittest.TestCase):
+
+    def setUp(símismo):
+        símismo.dir = tempfile.mkdtemp()
+        crear_proyecto_swat(símismo.dir)
+
+    def test_proyecto_en_memoria(símismo):
+        proyecto = SWAT_Wrappper.load_project(símismo.dir)
+        símismo.assertIs(proyecto, SWAT_Wrappper.load_project(símismo.dir))
+
+    def test_proyecto_en_caché(símismo):
+        proyecto = SWAT_Wrappper.load_project(símismo.dir)
+        SWAT_Wrappper._loaded_projects.clear()
+
+        # El caché se escribe de una vez, sin dejar archivos temporales
+        símismo.assertListEqual(
+            [f for f in os.listdir(símismo.dir) if f.startswith(SWAT_Wrappper.project_cache_file)],
+            [SWAT_Wrappper.project_cache_file]
+        )
+
+        with mock.patch.object(SWAT_Wrappper, 'read_project') as leer:
+            de_caché = SWAT_Wrappper.load_project(símismo.dir)
+            leer.assert_not_called()
+        símismo.assertListEqual(de_caché['params']['CN2'].tolist(), proyecto['params']['CN2'].tolist())
+
+    def test_releer_archivos_modificados(símismo):
+        SWAT_Wrappper.load_project(símismo.dir)
+        with open(os.path.join(símismo.dir, '000010001.mgt'), 'w') as d:
+            d.write('mgt\n            60.00    | CN2 : Curve number\n')
+
+        símismo.assertEqual(SWAT_Wrappper.load_project(símismo.dir)['params']['CN2'][0], 60)
+
+    def test_copia_independiente(símismo):
+        proyecto = SWAT_Wrappper.load_project(símismo.dir)
+        copia = SWAT_Wrappper.clone_project(proyecto)
+        copia['params']['CN2'][0] = 0
+
+        símismo.assertEqual(proyecto['params']['CN2'][0], 77)
+
+    def tearDown(símismo):
+        SWAT_Wrappper._loaded_projects.clear()
+        shutil.rmtree(símismo.dir)
+
+
+class Test_LeerEgresosSWAT(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.mkdtemp()
+
+        # Un archivo output.rch con 3 días y 2 ríos
+        with open(os.path.join(cls.dir, 'output.rch'), 'w') as d:
+            d.write('Encabezado\n' * 9)
+            for día in range(1, 4):
+                for r in range(1, 3):
+                    vals = ' '.join('{:.4E}'.format(100 * r + día + i) for i in range(46))
+                    d.write('REACH {:4d} {:8d} {:5d} {}\n'.format(r, 0, día, vals))
+
+    def test_leer_último_paso(símismo):
+        egr = SWAT_Wrappper.read_output(símismo.dir, file_type='rch', n_units=2)
+        símismo.assertListEqual(egr['MON'].tolist(), [3, 3])
+        símismo.assertListEqual(egr['FLOW_OUT'].tolist(), [105, 205])
+
+    def test_leer_sin_número_de_unidades(símismo):
+        egr = SWAT_Wrappper.read_output(símismo.dir, file_type='rch')
+        símismo.assertListEqual(egr['RCH'].tolist(), [1, 2])
+
+    def test_leer_egresos_ríos(símismo):
+        egr = SWAT_Wrappper.read_reach_output(símismo.dir, nsub=2)
+        símismo.assertListEqual(egr['NO3CONC'].tolist(), [148, 248])
+
+    def test_archivo_sin_egresos(símismo):
+        directorio = tempfile.mkdtemp()
+        try:
+            for texto in ['', 'SWAT Sep 7 VER 2012\n\n        RCH      GIS   MON     AREAkm2  FLOW_INcms\n']:
+                with open(os.path.join(directorio, 'output.rch'), 'w') as d:
+                    d.write(texto)
+                with símismo.assertRaises(ValueError):
+                    SWAT_Wrappper.read_output(directorio, file_type='rch')
+        finally:
+            shutil.rmtree(directorio)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.dir)
@@ -1,8 +1,12 @@
+import atexit
 import datetime as ft
 import inspect
 import math as mat
 import os
+import shutil
 import sys
+import tempfile
+import time
 from copy import copy as copiar
 from importlib import import_module as importar_mod
 from warnings import warn as avisar
@@ -10,7 +14,7 @@ from warnings import warn as avisar
 import numpy as np
 from dateutil.relativedelta import relativedelta as deltarelativo
 
-from tinamit import _
+from tinamit import _, obt_val_config
 from tinamit.Modelo import Modelo
 from .Unidades.Unidades import convertir
 
@@ -117,6 +121,17 @@ class EnvolturaBF(Modelo):
 
         símismo.modelo.cambiar_vals_modelo_interno(valores=valores)
 
+    def estab_recibe_vals(símismo, recibe):
+        """
+        Pasa la información al modelo interno.
+
+        :param recibe: Si el modelo recibirá valores de otro modelo.
+        :type recibe: bool
+
+        """
+
+        símismo.modelo.estab_recibe_vals(recibe=recibe)
+
     def incrementar(símismo, paso):
         """
         Esta función avanza el modelo por un periodo de tiempo especificado en `paso`.
@@ -194,8 +209,40 @@ class ModeloBF(Modelo):
         Esta función correrá automáticamente con la inclusión de `super().__init__()` en la función `__init__()` de las
         subclases de esta clase.
         """
+        # El directorio de trabajo de la corrida actual, si el modelo lo pidió de una reserva de directorios.
+        símismo.dir_trabajo = None  # type: str
+        símismo._reserva_dir_trabajo = None  # type: ReservaDirsTrabajo
+
         super().__init__(nombre='modeloBF')
 
+    def pedir_dir_trabajo(símismo, reserva=None):
+        """
+        Obtiene un directorio de trabajo limpio para la corrida actual desde la reserva de directorios temporarios
+        (en ``/dev/shm`` si existe). Llamar desde ``iniciar_modelo()`` de la subclase en vez de crear y borrar
+        directorios a cada corrida.
+
+        :param reserva: La reserva de directorios. Si es ``None``, se empleará la reserva general.
+        :type reserva: ReservaDirsTrabajo
+        :return: La dirección del directorio de trabajo.
+        :rtype: str
+        """
+
+        símismo.liberar_dir_trabajo()
+
+        símismo._reserva_dir_trabajo = reserva_dirs if reserva is None else reserva
+        símismo.dir_trabajo = símismo._reserva_dir_trabajo.pedir()
+        return símismo.dir_trabajo
+
+    def liberar_dir_trabajo(símismo):
+        """
+        Devuelve el directorio de trabajo actual a la reserva (se limpiará para la próxima corrida).
+        """
+
+        if símismo.dir_trabajo is not None:
+            símismo._reserva_dir_trabajo.devolver(símismo.dir_trabajo)
+            símismo.dir_trabajo = None
+            símismo._reserva_dir_trabajo = None
+
     def cambiar_vals_modelo_interno(símismo, valores):
         """
         Esta función debe cambiar el valor de variables en el modelo biofísico.
@@ -319,6 +366,22 @@ class ModeloImpaciente(ModeloBF):
         símismo.estación = 0
         símismo.mes = 0
 
+        # Para simulaciones en lote: si el modelo recibirá valores de otro modelo (``None`` si no se sabe), si todavía
+        # se permite correr varios años a la vez, el número máximo de años por lote (``None`` para no limitar), y
+        # los egresos de los años ya simulados pero todavía no aplicados.
+        símismo.recibe_vals = None
+        símismo.lote_posible = True
+        símismo.máx_años_lote = None
+        símismo.egr_lote = []
+
+        # El tiempo final de la corrida (en meses) y el número de años ya aplicados
+        símismo.tiempo_final = None
+        símismo.año = 0
+
+        # El tiempo (en segundos) pasado escribiendo ingresos, corriendo el modelo externo y leyendo egresos durante
+        # la corrida actual.
+        símismo.tiempos = {'ingr': 0, 'simul': 0, 'egr': 0}
+
         # Creamos un diccionario para guardar valores de variables para cada estación. Tiene el formato siguiente:
         # {'var 1': [valorestación1, valorestación2, ...],
         #  'var 2': [valorestación1, valorestación2, ...],
@@ -335,11 +398,48 @@ class ModeloImpaciente(ModeloBF):
         con los nuevos valores cambiadas por la conexión con el modelo externo. La función `.avanzar_modelo()` debe
         utilizar este diccionario interno para mandar los nuevos valores a la próxima simulación.
 
+        Si cambia un variable de ingreso mientras quedan egresos ya simulados en lote, éstos ya no son válidos y se
+        tendrán que volver a simular año por año.
+
         :param valores: Un diccionario de variables y valores para cambiar.
         :type valores: dict
 
         """
-        pass
+
+        ingresos = símismo.tipos_vars['Ingresos']
+        if len(símismo.egr_lote) and any(var in ingresos for var in valores):
+            símismo._anular_lote()
+
+    def estab_recibe_vals(símismo, recibe):
+        """
+        Si el modelo no recibe valores de otro modelo, se puede simular en lote (varios años con una sola corrida del
+        modelo externo).
+
+        :param recibe: Si el modelo recibirá valores de otro modelo.
+        :type recibe: bool
+
+        """
+
+        símismo.recibe_vals = recibe
+
+    def _anular_lote(símismo):
+        """
+        Borra los egresos simulados en lote y desactiva las simulaciones en lote para el resto de la corrida.
+        """
+
+        símismo.egr_lote.clear()
+        símismo.lote_posible = False
+
+    def _usar_lote(símismo):
+        """
+        Determina si se puede simular en lote. Hay que, además, que la subclase implemente
+        :func:`ModeloImpaciente.leer_archivo_egr_todos`.
+
+        :rtype: bool
+        """
+
+        implementado = type(símismo).leer_archivo_egr_todos is not ModeloImpaciente.leer_archivo_egr_todos
+        return implementado and símismo.lote_posible and not símismo.recibe_vals and símismo.tiempo_final is not None
 
     def act_vals_clima(símismo, n_paso, f):
         """
@@ -372,6 +472,10 @@ class ModeloImpaciente(ModeloBF):
             # La fecha inicial
             f_inic = f
 
+            # Los valores de clima cambian los ingresos del modelo
+            if len(vars_clima):
+                símismo._anular_lote()
+
             for e, dur in enumerate(símismo.dur_estaciones):
                 # Para cada estación...
 
@@ -431,14 +535,44 @@ class ModeloImpaciente(ModeloBF):
                 # El número de años para simular
                 a = mat.ceil(paso / 12)  # type: int
 
-                # Escribir el archivo de ingresos
-                símismo.escribir_ingr(n_años_simul=a)
-
-                # Avanzar la simulación
-                símismo.avanzar_modelo()
-
-                # Leer los egresos
-                símismo.leer_egr(n_años_egr=a)
+                # Si no quedan suficientes egresos de la última simulación en lote, hay que correr el modelo externo.
+                if len(símismo.egr_lote) < a:
+                    símismo.egr_lote.clear()
+
+                    # El número de años para simular con esta corrida del modelo externo
+                    if símismo._usar_lote():
+                        n_años = max(a, mat.ceil(símismo.tiempo_final / 12) - símismo.año)
+                        if símismo.máx_años_lote is not None:
+                            n_años = max(a, min(n_años, símismo.máx_años_lote))
+                    else:
+                        n_años = a
+
+                    # Escribir el archivo de ingresos
+                    t = time.perf_counter()
+                    símismo.escribir_ingr(n_años_simul=n_años)
+
+                    # Avanzar la simulación
+                    t_ingr = time.perf_counter()
+                    símismo.avanzar_modelo()
+
+                    # Leer los egresos
+                    t_simul = time.perf_counter()
+                    if n_años > a:
+                        símismo.egr_lote.extend(símismo.leer_archivo_egr_todos(n_años_egr=n_años))
+                    else:
+                        símismo.egr_lote.append(símismo.leer_archivo_egr(n_años_egr=n_años))
+
+                    # Guardar los tiempos de lectura/escritura y de simulación
+                    t_egr = time.perf_counter()
+                    símismo.tiempos['ingr'] += t_ingr - t
+                    símismo.tiempos['simul'] += t_simul - t_ingr
+                    símismo.tiempos['egr'] += t_egr - t_simul
+
+                # Aplicar los egresos del último año de este paso
+                dic_egr = símismo.egr_lote[min(a, len(símismo.egr_lote)) - 1]
+                del símismo.egr_lote[:a]
+                símismo._guardar_egr(dic_egr)
+                símismo.año += a
 
         # Aplicar el incremento de paso
         m += int(paso)
@@ -483,6 +617,16 @@ class ModeloImpaciente(ModeloBF):
         símismo.estación = 0
         símismo.mes = 0
 
+        # Reestablecer los tiempos
+        for t in símismo.tiempos:
+            símismo.tiempos[t] = 0
+
+        # Reestablecer las simulaciones en lote
+        símismo.tiempo_final = tiempo_final
+        símismo.año = 0
+        símismo.egr_lote.clear()
+        símismo.lote_posible = True
+
         super().iniciar_modelo(tiempo_final, nombre_corrida)
 
     def cerrar_modelo(símismo):
@@ -492,6 +636,17 @@ class ModeloImpaciente(ModeloBF):
         """
         raise NotImplementedError
 
+    def obt_tiempos(símismo):
+        """
+        Devuelve el tiempo pasado en lectura y escritura de archivos y el tiempo de corrida del modelo externo
+        durante la corrida actual.
+
+        :return: Un diccionario con los tiempos, en segundos, de ``'E/S'`` (ingresos y egresos) y de ``'simul'``.
+        :rtype: dict[str, float]
+        """
+
+        return {'E/S': símismo.tiempos['ingr'] + símismo.tiempos['egr'], 'simul': símismo.tiempos['simul']}
+
     def inic_vars(símismo):
         """
         Esta función debe iniciar el diccionario interno de variables.
@@ -571,6 +726,18 @@ class ModeloImpaciente(ModeloBF):
         # Leer el archivo de egreso
         dic_egr = símismo.leer_archivo_egr(n_años_egr=n_años_egr)
 
+        símismo._guardar_egr(dic_egr)
+
+    def _guardar_egr(símismo, dic_egr):
+        """
+        Guarda los egresos de un año en los diccionarios internos apropiados.
+
+        :param dic_egr: Un diccionario de los egresos por variable, tal como lo devuelve
+          :func:`ModeloImpaciente.leer_archivo_egr`.
+        :type dic_egr: dict
+
+        """
+
         # Para simplificar el código
         estacionales = símismo.tipos_vars['EgrEstacionales']
         finales = [v for v in símismo.tipos_vars['Egresos'] if v not in estacionales]
@@ -623,6 +790,21 @@ class ModeloImpaciente(ModeloBF):
 
         raise NotImplementedError
 
+    def leer_archivo_egr_todos(símismo, n_años_egr):
+        """
+        Lee todos los años de un archivo de egresos del modelo. Es opcional; si la subclase la implementa, el modelo
+        externo se podrá correr por varios años a la vez cuando sus ingresos no cambian durante la simulación (por
+        ejemplo, si no recibe valores de otro modelo).
+
+        :param n_años_egr: El número de años en los egresos.
+        :type n_años_egr: int
+        :return: Una lista de diccionarios de resultados por variable, uno por año, en el formato de
+          :func:`ModeloImpaciente.leer_archivo_egr`.
+        :rtype: list[dict]
+        """
+
+        raise NotImplementedError
+
     def escribir_archivo_ingr(símismo, n_años_simul, dic_ingr):
         """
         Escribe un archivo de ingresos para el modelo, en un formato que lee el modelo externo.
@@ -775,4 +957,106 @@ class ModeloFlexible(ModeloBF):
         raise NotImplementedError
 
     def __getinitargs__(símismo):
-        return tuple()
\ No newline at end of file
+        return tuple()
+
+class ReservaDirsTrabajo(object):
+    """
+    Una reserva de directorios de trabajo temporarios para modelos biofísicos que se comunican con su ejecutable
+    externo por archivos. Los directorios se crean en un sistema de archivos en memoria (``/dev/shm``) si existe, y
+    se limpian y se reutilizan entre corridas en vez de crearse y borrarse para cada una.
+
+    Se puede especificar otro directorio base con la configuración ``dir_trabajo_bf`` de Tinamït.
+    """
+
+    def __init__(símismo, dir_base=None):
+        """
+
+        :param dir_base: El directorio en el cual crear los directorios de trabajo. Si es ``None``, se tomará de la
+          configuración ``dir_trabajo_bf``, o bien ``/dev/shm``, o bien el directorio temporario del sistema.
+        :type dir_base: str
+
+        """
+
+        símismo._dir_base = dir_base
+
+        símismo.libres = []
+        símismo.en_uso = set()
+
+    @property
+    def dir_base(símismo):
+        """
+        El directorio base de la reserva.
+
+        :rtype: str
+        """
+
+        if símismo._dir_base is None:
+            try:
+                símismo._dir_base = obt_val_config('dir_trabajo_bf', tipo='dir', pedir=False)
+            except (KeyError, FileNotFoundError):
+                if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+                    símismo._dir_base = '/dev/shm'
+                else:
+                    símismo._dir_base = tempfile.gettempdir()
+
+        return símismo._dir_base
+
+    def pedir(símismo):
+        """
+        Devuelve un directorio de trabajo vacío.
+
+        :return: La dirección del directorio.
+        :rtype: str
+        """
+
+        # Reutilizar un directorio libre si hay, si no crear uno nuevo.
+        dir_trab = None
+        while len(símismo.libres) and dir_trab is None:
+            d = símismo.libres.pop()
+            if os.path.isdir(d):
+                dir_trab = d
+
+        if dir_trab is None:
+            if not os.path.isdir(símismo.dir_base):
+                os.makedirs(símismo.dir_base)
+            dir_trab = tempfile.mkdtemp(prefix='tinamit_{}_'.format(os.getpid()), dir=símismo.dir_base)
+
+        símismo.en_uso.add(dir_trab)
+        return dir_trab
+
+    def devolver(símismo, dir_trab):
+        """
+        Limpia un directorio de trabajo y lo devuelve a la reserva.
+
+        :param dir_trab: El directorio, tal como lo devolvió :func:`ReservaDirsTrabajo.pedir`.
+        :type dir_trab: str
+
+        """
+
+        if dir_trab not in símismo.en_uso:
+            raise ValueError(_('El directorio "{}" no es de esta reserva.').format(dir_trab))
+        símismo.en_uso.remove(dir_trab)
+
+        # Vaciar el directorio sin borrarlo
+        for a in os.scandir(dir_trab):
+            if a.is_dir(follow_symlinks=False):
+                shutil.rmtree(a.path, ignore_errors=True)
+            else:
+                os.remove(a.path)
+
+        símismo.libres.append(dir_trab)
+
+    def vaciar(símismo):
+        """
+        Borra todos los directorios de la reserva.
+        """
+
+        for d in [*símismo.libres, *símismo.en_uso]:
+            shutil.rmtree(d, ignore_errors=True)
+        símismo.libres.clear()
+        símismo.en_uso.clear()
+
+
+# La reserva de directorios de trabajo de este proceso.
+reserva_dirs = ReservaDirsTrabajo()
+atexit.register(reserva_dirs.vaciar)
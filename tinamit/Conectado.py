@@ -3,9 +3,11 @@ import os
 import pickle
 import re
 import threading
+import time
 from copy import copy as copiar
 from copy import deepcopy as copiar_profundo
 from multiprocessing import Pool as Reserva
+from multiprocessing.pool import ThreadPool as ReservaHilos
 from warnings import warn as avisar
 
 import numpy as np
@@ -54,6 +56,12 @@ class SuperConectado(Modelo):
         símismo.conv_tiempo = {}
         símismo.conv_tiempo_dudoso = False  # Para acordarse si Tinamït tuvo que adivinar la conversión o no.
 
+        # Las opciones de intercambio adaptivo de valores entre los modelos (ver .estab_intercambios()), y el
+        # resumen de los intercambios de la última simulación.
+        símismo.ops_intercambio = {'tol': None, 'máx_intervalo': 12, 'puntos_control': None}
+        símismo.info_intercambios = {}
+        símismo._planificador = None  # type: _PlanificadorIntercambios
+
         # Inicializamos el SuperConectado como todos los Modelos.
         super().__init__(nombre=nombre)
 
@@ -212,6 +220,31 @@ class SuperConectado(Modelo):
         # Si había duda acerca de la conversión de tiempo, ya no hay.
         símismo.conv_tiempo_dudoso = False
 
+    def estab_intercambios(símismo, tol=None, máx_intervalo=12, puntos_control=None):
+        """
+        Establece el intercambio adaptivo de valores entre los submodelos. Si los valores que un modelo mandaría al
+        otro no cambiaron más que ``tol`` (relativamente) desde el último intercambio, se omite el intercambio y se
+        dobla el intervalo hasta la próxima verificación, hasta ``máx_intervalo`` pasos. Un cambio más grande vuelve
+        a intercambiar a cada paso.
+
+        Después de cada simulación, :attr:`SuperConectado.info_intercambios` indica el número de intercambios hechos y
+        omitidos y la aceleración estimada.
+
+        :param tol: La tolerancia relativa de cambio en los valores intercambiados. Si es ``None``, se intercambian los
+          valores a cada paso.
+        :type tol: float
+        :param máx_intervalo: El número máximo de pasos sin intercambio.
+        :type máx_intervalo: int
+        :param puntos_control: Los tiempos a los cuales siempre hay que intercambiar los valores.
+        :type puntos_control: list[float]
+
+        """
+
+        if máx_intervalo < 1:
+            raise ValueError(_('El intervalo máximo de intercambio debe ser al menos 1.'))
+
+        símismo.ops_intercambio = {'tol': tol, 'máx_intervalo': máx_intervalo, 'puntos_control': puntos_control}
+
     def cambiar_vals_modelo_interno(símismo, valores):
         """
         Esta función cambia los valores del modelo. A través de la función :func:`~tinamit.Conectado.cambiar_vals`, se
@@ -369,12 +402,31 @@ class SuperConectado(Modelo):
                 vars_interés[i] = símismo.valid_var(v)
 
         # Todo el restode la simulación se hace como en la clase pariente
-        super().simular(tiempo_final=tiempo_final, paso=paso, nombre_corrida=nombre_corrida, fecha_inic=fecha_inic,
-                        lugar=lugar, tcr=tcr, recalc=recalc, clima=clima, vars_interés=vars_interés)
+        inic = time.time()
+        res = super().simular(tiempo_final=tiempo_final, paso=paso, nombre_corrida=nombre_corrida,
+                              fecha_inic=fecha_inic, lugar=lugar, tcr=tcr, recalc=recalc, clima=clima,
+                              vars_interés=vars_interés)
+
+        símismo.info_intercambios = símismo._planificador.resumen(tiempo_total=time.time() - inic)
+
+        return res
 
     def simular_paralelo(símismo, tiempo_final, paso=1, nombre_corrida='Corrida Tinamït', vals_inic=None,
                          fecha_inic=None, lugar=None, tcr=None, recalc=True, clima=False, combinar=True,
                          dibujar=None, paralelo=True, devolver=None):
+        """
+        Simula varias corridas del modelo, en paralelo si todos los submodelos son paralelizables. Las opciones en
+        forma de lista o de diccionario definen las corridas.
+
+        :param paralelo: Si hay que correr las corridas en paralelo. Puede ser el número de procesos que emplear.
+        :type paralelo: bool | int
+        :param devolver: Los variables cuyos valores devolver. Se guardan en la memoria de cada corrida.
+        :type devolver: str | list[str]
+        :return: Si ``devolver`` no es ``None``, los valores de cada variable para cada corrida (en lista o en
+          diccionario según la forma de las opciones).
+        :rtype: dict[str, list[np.ndarray] | dict[str, np.ndarray]]
+        """
+
         #
         if isinstance(vals_inic, dict):
             if all(x in símismo.modelos for x in vals_inic):
@@ -464,7 +516,7 @@ class SuperConectado(Modelo):
         else:
             # Si no estamos haciendo todas las combinaciones posibles de opciones, es un poco más fácil.
 
-            n_corridas = np.max(l_n_ops)  # El número de corridas
+            n_corridas = np.max(l_n_ops) if len(l_n_ops) else 1  # El número de corridas
 
             # Asegurarse de que todas las opciones tengan el mismo número de opciones.
             if np.any(np.not_equal(l_n_ops, n_corridas)):
@@ -501,6 +553,13 @@ class SuperConectado(Modelo):
         # Sacar los valores iniciales del diccionario de opciones de corridas
         d_vals_inic = {ll: v.pop('vals_inic') for ll, v in corridas.items()}
 
+        # Los variables para devolver se guardan en la memoria de cada corrida, porque no todos los modelos pueden
+        # leer los resultados de una corrida después de terminarla.
+        if devolver is not None:
+            vars_interés = [símismo.valid_var(v) for v in devolver]
+            for d_prms_corr in corridas.values():
+                d_prms_corr['vars_interés'] = vars_interés
+
         # Detectar si el modelo y todos sus submodelos son paralelizables
         if símismo.paralelizable() and paralelo:
             # ...si lo son...
@@ -516,8 +575,9 @@ class SuperConectado(Modelo):
 
                 l_trabajos.append((copia_mod, copiar_profundo(d_vals_inic[corr]), d_args))
 
-            with Reserva() as r:
-                r.map(_correr_modelo, l_trabajos)
+            n_procs = None if paralelo is True else paralelo
+            with Reserva(n_procs) as r:
+                memorias = r.map(_correr_modelo, l_trabajos)
 
         else:
             # Sino simplemente correrlas una tras otra con símismo.simular()
@@ -528,6 +588,7 @@ class SuperConectado(Modelo):
                          'paralelización.').format(símismo.nombre))
 
             # Para cada corrida...
+            memorias = []
             for corr, d_prms_corr in corridas.items():
 
                 # Implementar los valores iniciales
@@ -538,7 +599,8 @@ class SuperConectado(Modelo):
                     símismo.modelos[m].inic_vals(dic_vals=d_vals)
 
                 # Después, simular el modelo.
-                símismo.simular(**d_prms_corr, nombre_corrida=corr)
+                memoria = símismo.simular(**d_prms_corr, nombre_corrida=corr)
+                memorias.append({v: np.copy(memoria[v]) for v in d_prms_corr.get('vars_interés', [])})
 
         if dibujar is not None:
             # Para hacer: formalizar para todos los modelos
@@ -552,13 +614,11 @@ class SuperConectado(Modelo):
 
         if devolver is not None:
             egresos = {}
-            for var in devolver:
+            for var, v_mem in zip(devolver, vars_interés):
                 if devolv_lista:
-                    egresos[var] = [símismo.leer_resultados(corrida=x, var=var)
-                                    for x in corridas.keys()]
+                    egresos[var] = [mem[v_mem] for mem in memorias]
                 else:
-                    egresos[var] = {x: símismo.leer_resultados(corrida=x, var=var)
-                                    for x in corridas.keys()}
+                    egresos[var] = {x: mem[v_mem] for x, mem in zip(corridas, memorias)}
 
             return egresos
 
@@ -624,8 +684,14 @@ class SuperConectado(Modelo):
                            m.variables[v]['val'] * símismo.conex_rápida[nombre][v]['conv'])
                           for v in m.vars_saliendo]) for nombre, m in l_mods]
 
-        for n, tup in enumerate(l_mods):
-            tup[1].cambiar_vals(valores=vars_egr[(n + 1) % 2])
+        planif = símismo._planificador
+        planif.avanzar(paso)
+        for n, (nombre, m) in enumerate(l_mods):
+            valores = vars_egr[(n + 1) % 2]
+            if planif.intercambiar(nombre, valores):
+                inic = time.time()
+                m.cambiar_vals(valores=valores)
+                planif.tiempo_intercambios += time.time() - inic
 
     def leer_vals(símismo):
         """
@@ -675,6 +741,14 @@ class SuperConectado(Modelo):
             # Agregar el diccionario de conexión rápida.
             símismo.conex_rápida[mod_fuente][var_fuente] = {'var': var_recip, 'conv': conex['conv']}
 
+        # Avisar a cada submodelo si recibirá valores del otro (los modelos en conexiones unidireccionales pueden
+        # así acelerar sus simulaciones).
+        for mod in l_mod:
+            recibe = any(m != mod and m in símismo.conex_rápida for m in l_mod)
+            símismo.modelos[mod].estab_recibe_vals(recibe=recibe)
+
+        símismo._planificador = _PlanificadorIntercambios(**símismo.ops_intercambio)
+
         # Iniciar los submodelos también.
         for mod in símismo.modelos.values():
             args_inic = kwargs.copy()  # Para hacer: reformatear y limpiar
@@ -861,6 +935,7 @@ class SuperConectado(Modelo):
         copia.conv_tiempo = símismo.conv_tiempo
         copia.conv_tiempo_dudoso = símismo.conv_tiempo_dudoso
         copia.vars_clima = símismo.vars_clima
+        copia.ops_intercambio = símismo.ops_intercambio
 
         return copia
 
@@ -870,6 +945,7 @@ class SuperConectado(Modelo):
             {
                 'conv_tiempo': símismo.conv_tiempo,
                 'conv_tiempo_dudoso': símismo.conv_tiempo_dudoso,
+                'ops_intercambio': símismo.ops_intercambio,
                 'conexiones': símismo.conexiones,
                 'modelos': [pickle.dumps(m) for m in símismo.modelos.values()]
             }
@@ -886,6 +962,7 @@ class SuperConectado(Modelo):
 
         símismo.conv_tiempo = estado['conv_tiempo']
         símismo.conv_tiempo_dudoso = estado['conv_tiempo_dudoso']
+        símismo.ops_intercambio = estado['ops_intercambio']
         símismo.unidad_tiempo = estado['unidad_tiempo']  # Necesario después de estab_modelo()
 
 
@@ -1018,6 +1095,540 @@ class Conectado(SuperConectado):
         símismo.mds = símismo.modelos['mds']
 
 
+class MultiConectado(SuperConectado):
+    """
+    Un modelo conectado plano de un número cualquiera de submodelos, sin tener que anidar instancias de
+    :class:`SuperConectado`. Cada submodelo avanza con su propio paso; los submodelos que empiezan un paso al mismo
+    tiempo corren en paralelo, y los valores se intercambian con una sola tabla de conexiones compilada al inicio de
+    cada simulación.
+
+    La unidad de tiempo del modelo es la unidad más pequeña de sus submodelos. El calendario de los pasos de los
+    submodelos se repite cada :attr:`MultiConectado.paso_macro` unidades de tiempo (el mínimo común múltiplo de los
+    pasos de los submodelos).
+    """
+
+    def __init__(símismo, nombre='MultiConectado', paralelo=True):
+        """
+
+        :param nombre: El nombre del modelo.
+        :type nombre: str
+        :param paralelo: Si hay que correr en paralelo los submodelos que avanzan al mismo tiempo.
+        :type paralelo: bool
+
+        """
+
+        # El paso de cada submodelo, en sus propias unidades de tiempo.
+        símismo.pasos = {}  # type: dict[str, int]
+
+        # El número de unidades de tiempo de base en una unidad de tiempo de cada submodelo, y las conversiones
+        # especificadas por el usuario.
+        símismo.factor_tiempo = {}  # type: dict[str, int]
+        símismo._factores_fijos = {}  # type: dict[str, int]
+
+        # Para encontrar el submodelo y el variable correspondiendo a cada variable del modelo sin tener que separar
+        # su nombre.
+        símismo._ubic_vars = {}  # type: dict[str, tuple[str, str]]
+
+        símismo.paralelo = paralelo
+
+        # La tabla de conexiones y el calendario compilados, y el tiempo actual de la simulación.
+        símismo._tabla = {}
+        símismo._calendario = None
+        símismo._t = 0
+        símismo._t_intercambio = 0
+        símismo._reserva_hilos = None
+
+        super().__init__(nombre=nombre)
+
+    @property
+    def paso_macro(símismo):
+        """
+        El intervalo (en unidades de tiempo del modelo) después del cual todos los submodelos terminan un paso al
+        mismo tiempo.
+
+        :rtype: int
+        """
+
+        pasos = [símismo.pasos[m] * símismo.factor_tiempo[m] for m in símismo.modelos]
+        return int(np.lcm.reduce(pasos)) if pasos else 1
+
+    def estab_modelo(símismo, modelo, paso=1):
+        """
+        Agrega un submodelo.
+
+        :param modelo: El modelo para agregar.
+        :type modelo: tinamit.Modelo.Modelo
+        :param paso: El paso del submodelo, en sus propias unidades de tiempo.
+        :type paso: int
+
+        """
+
+        if modelo.nombre in símismo.modelos:
+            avisar(_('El modelo {} ya existe. El nuevo modelo reemplazará el modelo anterior.').format(modelo.nombre))
+            símismo._quitar_vars(modelo.nombre)
+
+        símismo.modelos[modelo.nombre] = modelo
+        símismo.pasos[modelo.nombre] = paso
+
+        for var in modelo.variables:
+            nombre_var = '{mod}_{var}'.format(var=var, mod=modelo.nombre)
+            símismo.variables[nombre_var] = modelo.variables[var]
+            símismo._ubic_vars[nombre_var] = (modelo.nombre, var)
+
+        símismo.unidad_tiempo = símismo.obt_unidad_tiempo()
+
+    def quitar_modelo(símismo, nombre):
+        """
+        Quita un submodelo y sus conexiones.
+
+        :param nombre: El nombre del submodelo.
+        :type nombre: str
+
+        """
+
+        if nombre not in símismo.modelos:
+            raise ValueError(_('El modelo "{}" no existe en este modelo conectado.').format(nombre))
+
+        for c in [c for c in símismo.conexiones if nombre in (c['modelo_fuente'], c['modelo_recip'])]:
+            símismo.desconectar_vars(c['var_fuente'], c['modelo_fuente'], c['var_recip'], c['modelo_recip'])
+
+        símismo._quitar_vars(nombre)
+        símismo.modelos.pop(nombre)
+        símismo.pasos.pop(nombre)
+        símismo._factores_fijos.pop(nombre, None)
+        símismo.unidad_tiempo = símismo.obt_unidad_tiempo()
+
+    def _quitar_vars(símismo, nombre):
+        for nombre_var in [v for v, (m, _v) in símismo._ubic_vars.items() if m == nombre]:
+            símismo.variables.pop(nombre_var)
+            símismo._ubic_vars.pop(nombre_var)
+
+    def obt_unidad_tiempo(símismo):
+        """
+        Establece la unidad de tiempo de base (la más pequeña de los submodelos) y el número de unidades de base en
+        una unidad de tiempo de cada submodelo.
+
+        :return: La unidad de tiempo del modelo.
+        :rtype: str
+        """
+
+        símismo.factor_tiempo.clear()
+        if not símismo.modelos:
+            return None
+
+        # Convertir las unidades de todos los submodelos a las del primero.
+        l_mods = list(símismo.modelos)
+        ref = símismo.modelos[l_mods[0]].unidad_tiempo
+        factores = {}
+        símismo.conv_tiempo_dudoso = False
+        for m in l_mods:
+            try:
+                factores[m] = convertir(de=símismo.modelos[m].unidad_tiempo, a=ref)
+            except ValueError:
+                factores[m] = 1
+                if m not in símismo._factores_fijos:
+                    símismo.conv_tiempo_dudoso = True
+
+        base = min(l_mods, key=lambda x: factores[x])
+        for m in l_mods:
+            if m in símismo._factores_fijos:
+                símismo.factor_tiempo[m] = símismo._factores_fijos[m]
+                continue
+
+            factor = factores[m] / factores[base]
+            if int(factor) != factor:
+                avisar(_('Las unidades de tiempo de los modelos "{}" y "{}" no tienen denominator común. Se aproximará '
+                         'la conversión.').format(m, base))
+            símismo.factor_tiempo[m] = max(1, int(round(factor)))
+
+        return símismo.modelos[base].unidad_tiempo
+
+    def estab_conv_tiempo(símismo, modelo, factor):
+        """
+        Establece el número de unidades de tiempo del modelo conectado en una unidad de tiempo de un submodelo
+        (útil para unidades que Tinamït no reconoce).
+
+        :param modelo: El nombre del submodelo.
+        :type modelo: str
+        :param factor: El factor de conversión.
+        :type factor: int
+
+        """
+
+        if modelo not in símismo.modelos:
+            raise ValueError(_('El modelo "{}" no existe en este modelo conectado.').format(modelo))
+
+        símismo._factores_fijos[modelo] = factor
+        símismo.unidad_tiempo = símismo.obt_unidad_tiempo()
+
+    def conectar_vars(símismo, var_fuente, modelo_fuente, var_recip, modelo_recip, conv=None):
+        """
+        Conecta un variable de un submodelo a un variable de otro.
+
+        :param var_fuente: El variable fuente.
+        :type var_fuente: str
+        :param modelo_fuente: El nombre del modelo fuente.
+        :type modelo_fuente: str
+        :param var_recip: El variable recipiente.
+        :type var_recip: str
+        :param modelo_recip: El nombre del modelo recipiente.
+        :type modelo_recip: str
+        :param conv: La conversión entre las unidades de ambos variables. En el caso ``None``, se intentará adivinar
+          la conversión con el módulo `~tinamit.Unidades`.
+        :type conv: float
+
+        """
+
+        for nombre_mod, var in [(modelo_fuente, var_fuente), (modelo_recip, var_recip)]:
+            if nombre_mod not in símismo.modelos:
+                raise ValueError(_('Nombre de modelo "{}" erróneo.').format(nombre_mod))
+            if var not in símismo.modelos[nombre_mod].variables:
+                raise ValueError(_('El variable "{}" no existe en el modelo "{}".').format(var, nombre_mod))
+
+        if modelo_fuente == modelo_recip:
+            raise ValueError(_('No se puede conectar un modelo consigo mismo.'))
+
+        if any(c['var_recip'] == var_recip and c['modelo_recip'] == modelo_recip for c in símismo.conexiones):
+            raise ValueError(_('El variable "{}" del modelo "{}" ya está conectado. '
+                               'Desconéctalo primero con .desconectar_vars().').format(var_recip, modelo_recip))
+
+        d_fuente = símismo.modelos[modelo_fuente].variables[var_fuente]
+        d_recip = símismo.modelos[modelo_recip].variables[var_recip]
+
+        if d_fuente['dims'] != d_recip['dims']:
+            raise ValueError(_('Las dimensiones de los dos variables ({}: {}; {}: {}) no son compatibles.')
+                             .format(var_fuente, d_fuente['dims'], var_recip, d_recip['dims']))
+
+        if conv is None:
+            try:
+                conv = convertir(de=d_fuente['unidades'], a=d_recip['unidades'])
+            except (ValueError, AttributeError):
+                avisar(_('No se pudo identificar una conversión automática para las unidades de los variables'
+                         '"{}" (unidades: {}) y "{}" (unidades: {}). Se está suponiendo un factor de conversión de 1.')
+                       .format(var_fuente, d_fuente['unidades'], var_recip, d_recip['unidades']))
+                conv = 1
+
+        símismo.conexiones.append({
+            'var_fuente': var_fuente, 'modelo_fuente': modelo_fuente, 'var_recip': var_recip,
+            'modelo_recip': modelo_recip, 'conv': conv
+        })
+
+        # Un variable fuente puede alimentar varios modelos.
+        if var_fuente not in símismo.modelos[modelo_fuente].vars_saliendo:
+            símismo.modelos[modelo_fuente].vars_saliendo.append(var_fuente)
+        símismo.modelos[modelo_recip].vars_entrando.append(var_recip)
+
+    def desconectar_vars(símismo, var_fuente, modelo_fuente, var_recip=None, modelo_recip=None):
+        """
+        Desconecta variables. Si no se especifica el variable recipiente, se quitan todas las conexiones del
+        variable fuente.
+
+        :param var_fuente: El variable fuente de la conexión.
+        :type var_fuente: str
+        :param modelo_fuente: El modelo fuente de la conexión.
+        :type modelo_fuente: str
+        :param var_recip: El variable recipiente de la conexión.
+        :type var_recip: str
+        :param modelo_recip: El modelo recipiente de la conexión.
+        :type modelo_recip: str
+
+        """
+
+        quitar = [
+            c for c in símismo.conexiones
+            if c['var_fuente'] == var_fuente and c['modelo_fuente'] == modelo_fuente
+            and (var_recip is None or c['var_recip'] == var_recip)
+            and (modelo_recip is None or c['modelo_recip'] == modelo_recip)
+        ]
+        if not quitar:
+            raise ValueError(_('La conexión especificada no existe.'))
+
+        for c in quitar:
+            símismo.conexiones.remove(c)
+            símismo.modelos[c['modelo_recip']].vars_entrando.remove(c['var_recip'])
+
+        if not any(c['var_fuente'] == var_fuente and c['modelo_fuente'] == modelo_fuente for c in símismo.conexiones):
+            símismo.modelos[modelo_fuente].vars_saliendo.remove(var_fuente)
+
+    def cambiar_vals_modelo_interno(símismo, valores):
+        for nombre_var, val in valores.items():
+            nombre_mod, var = símismo._ubic_vars[nombre_var]
+            símismo.modelos[nombre_mod].cambiar_vals(valores={var: val})
+
+    def act_vals_clima(símismo, n_paso, f):
+        for nombre, mod in símismo.modelos.items():
+            mod.act_vals_clima(n_paso=max(1, int(round(n_paso / símismo.factor_tiempo[nombre]))), f=f)
+
+    def simular(símismo, tiempo_final, paso=None, nombre_corrida='Corrida Tinamït', fecha_inic=None, lugar=None,
+                tcr=None, recalc=True, clima=False, vars_interés=None):
+        """
+        Simula el modelo. Los parámetros son iguales a los de :meth:`SuperConectado.simular`, menos ``paso``, que
+        solamente determina la frecuencia de los resultados guardados (cada submodelo avanza con su propio paso).
+        Si es ``None``, se emplea :attr:`MultiConectado.paso_macro`.
+
+        """
+
+        if not símismo.modelos:
+            raise ValueError(_('Hay que agregar modelos antes de empezar una simulación.'))
+
+        if símismo.conv_tiempo_dudoso:
+            avisar(_('No se pudo inferir la conversión de unidades de tiempo entre los submodelos de "{}". '
+                     'Especificarla con la función .estab_conv_tiempo(). Por el momento pusimos los factores de '
+                     'conversión a 1, pero probablemente no es lo que quieres.').format(símismo.nombre))
+
+        if paso is None:
+            paso = símismo.paso_macro
+
+        if vars_interés is not None:
+            for i, v in enumerate(vars_interés.copy()):
+                vars_interés[i] = símismo.valid_var(v)
+
+        inic = time.time()
+        res = Modelo.simular(símismo, tiempo_final=tiempo_final, paso=paso, nombre_corrida=nombre_corrida,
+                             fecha_inic=fecha_inic, lugar=lugar, tcr=tcr, recalc=recalc, clima=clima,
+                             vars_interés=vars_interés)
+
+        símismo.info_intercambios = símismo._planificador.resumen(tiempo_total=time.time() - inic)
+
+        return res
+
+    def iniciar_modelo(símismo, tiempo_final, nombre_corrida, **kwargs):
+        """
+        Compila la tabla de conexiones y el calendario de pasos de los submodelos, y inicia los submodelos.
+
+        La tabla de conexiones tiene la forma general:
+
+        { modelo_fuente: [(modelo_recip, [(dic_var_fuente, var_recip, conv), ...]), ...], ...}
+
+        """
+
+        símismo._tabla.clear()
+        for c in símismo.conexiones:
+            d_var = símismo.modelos[c['modelo_fuente']].variables[c['var_fuente']]
+            recips = símismo._tabla.setdefault(c['modelo_fuente'], {})
+            recips.setdefault(c['modelo_recip'], []).append((d_var, c['var_recip'], c['conv']))
+        símismo._tabla = {m: list(d.items()) for m, d in símismo._tabla.items()}
+
+        # El calendario: los tiempos (dentro de un paso macro) a los cuales submodelos empiezan un paso, con la
+        # lista de estos submodelos.
+        pasos = {m: símismo.pasos[m] * símismo.factor_tiempo[m] for m in símismo.modelos}
+        macro = símismo.paso_macro
+        tiempos = sorted({t for p in pasos.values() for t in range(0, macro, p)})
+        símismo._calendario = {
+            'tiempos': np.array(tiempos + [macro]), 'macro': macro,
+            'modelos': {t: [m for m, p in pasos.items() if t % p == 0] for t in tiempos}
+        }
+        símismo._t = símismo._t_intercambio = 0
+
+        símismo._planificador = _PlanificadorIntercambios(**símismo.ops_intercambio)
+
+        if símismo.paralelo and len(símismo.modelos) > 1:
+            símismo._reserva_hilos = ReservaHilos(len(símismo.modelos))
+
+        recipientes = {c['modelo_recip'] for c in símismo.conexiones}
+        for nombre, mod in símismo.modelos.items():
+            mod.estab_recibe_vals(recibe=nombre in recipientes)
+            t_final_mod = int(np.ceil(tiempo_final / símismo.factor_tiempo[nombre]))
+            mod.iniciar_modelo(tiempo_final=t_final_mod, nombre_corrida=nombre_corrida, **kwargs)
+
+    def incrementar(símismo, paso):
+        """
+        Avanza el modelo de ``paso`` unidades de tiempo. Cada submodelo empieza sus pasos según el calendario
+        compilado, y sus egresos se mandan a los otros submodelos al final de cada uno de sus pasos.
+
+        :param paso: El intervalo de tiempo.
+        :type paso: int
+
+        """
+
+        cal = símismo._calendario
+        fin = símismo._t + paso
+
+        while símismo._t < fin:
+            ciclo, t_rel = divmod(símismo._t, cal['macro'])
+
+            # Correr los submodelos que empiezan un paso ahora.
+            activos = cal['modelos'].get(t_rel)
+            if activos:
+                símismo._incrementar_mods(activos)
+
+            # Avanzar hasta el fin de paso siguiente de un submodelo.
+            t_sig = ciclo * cal['macro'] + cal['tiempos'][np.searchsorted(cal['tiempos'], t_rel, side='right')]
+            if t_sig > fin:
+                símismo._t = fin
+                break
+
+            símismo._t = int(t_sig)
+            símismo._intercambiar(cal['modelos'][símismo._t % cal['macro']])
+
+    def _incrementar_mods(símismo, nombres):
+        if símismo._reserva_hilos is not None and len(nombres) > 1:
+            símismo._reserva_hilos.map(lambda m: símismo.modelos[m].incrementar(símismo.pasos[m]), nombres)
+        else:
+            for m in nombres:
+                símismo.modelos[m].incrementar(símismo.pasos[m])
+
+    def _intercambiar(símismo, terminados):
+        """
+        Manda los egresos de los submodelos que acaban de terminar un paso a sus modelos recipientes.
+        """
+
+        for m in terminados:
+            símismo.modelos[m].leer_vals()
+
+        # Leer todos los valores antes de cambiar cualquier recipiente.
+        envíos = {}
+        for m in terminados:
+            for recip, conexs in símismo._tabla.get(m, []):
+                envíos.setdefault(recip, {}).update({v: d_var['val'] * conv for d_var, v, conv in conexs})
+
+        planif = símismo._planificador
+        planif.avanzar(símismo._t - símismo._t_intercambio)
+        símismo._t_intercambio = símismo._t
+        for recip, valores in envíos.items():
+            if planif.intercambiar(recip, valores):
+                inic = time.time()
+                símismo.modelos[recip].cambiar_vals(valores=valores)
+                planif.tiempo_intercambios += time.time() - inic
+
+    def cerrar_modelo(símismo):
+        if símismo._reserva_hilos is not None:
+            símismo._reserva_hilos.close()
+            símismo._reserva_hilos = None
+
+        super().cerrar_modelo()
+
+    def valid_var(símismo, var):
+        if var in símismo.variables:
+            return var
+
+        cands = ['{}_{}'.format(m, var) for m, obj_m in símismo.modelos.items() if var in obj_m.variables]
+        if len(cands) == 1:
+            return cands[0]
+        elif len(cands) > 1:
+            raise ValueError(_('El variable "{}" existe en varios submodelos; hay que especificar el submodelo ({}).')
+                             .format(var, ', '.join(cands)))
+        raise ValueError(_('El variable "{}" no existe en el modelo "{}", ni siquiera en sus submodelos.')
+                         .format(var, símismo))
+
+    def _leer_resultados(símismo, var, corrida):
+        nombre_mod, v = símismo._ubic_vars[símismo.valid_var(var)]
+        return símismo.modelos[nombre_mod]._leer_resultados(v, corrida)
+
+    def __getinitargs__(símismo):
+        return símismo.nombre, símismo.paralelo
+
+    def __copy__(símismo):
+        copia = super().__copy__()
+        copia.pasos.update(símismo.pasos)
+        copia._factores_fijos.update(símismo._factores_fijos)
+        copia.unidad_tiempo = copia.obt_unidad_tiempo()
+
+        return copia
+
+    def __getstate__(símismo):
+        d = super().__getstate__()
+        d.update({'pasos': símismo.pasos, 'factores_fijos': símismo._factores_fijos})
+        return d
+
+    def __setstate__(símismo, estado):
+        super().__setstate__(estado)
+        símismo.pasos.update(estado['pasos'])
+        símismo._factores_fijos.update(estado['factores_fijos'])
+        símismo.unidad_tiempo = símismo.obt_unidad_tiempo()
+
+
+class _PlanificadorIntercambios(object):
+    """
+    Decide, a cada paso de una simulación de un :class:`SuperConectado`, si hay que mandar los valores conectados a
+    cada submodelo recipiente, y guarda cuenta de los intercambios hechos y omitidos.
+    """
+
+    def __init__(símismo, tol=None, máx_intervalo=12, puntos_control=None):
+        símismo.tol = tol
+        símismo.máx_intervalo = máx_intervalo
+        símismo.puntos_control = np.sort(puntos_control) if puntos_control is not None else np.array([])
+
+        símismo.t = 0
+        símismo.t_ant = 0
+
+        símismo.últimos = {}  # Los últimos valores mandados a cada recipiente
+        símismo.intervalo = {}  # El intervalo actual (en pasos) de verificación para cada recipiente
+        símismo.próximo = {}  # El próximo tiempo de verificación para cada recipiente
+        símismo.paso = 1
+
+        símismo.n_intercambios = 0
+        símismo.n_omitidos = 0
+        símismo.tiempo_intercambios = 0
+
+    def avanzar(símismo, paso):
+        símismo.t_ant = símismo.t
+        símismo.t += paso
+        símismo.paso = paso
+
+    def intercambiar(símismo, recip, valores):
+        """
+        Decide si hay que mandar los valores al modelo recipiente ahora.
+
+        :param recip: El nombre del modelo recipiente.
+        :type recip: str
+        :param valores: Los valores que se mandarían.
+        :type valores: dict
+        :rtype: bool
+        """
+
+        if símismo.tol is None or not valores:
+            símismo.n_intercambios += bool(valores)
+            return True
+
+        últimos = símismo.últimos.get(recip)
+        control = np.any((símismo.puntos_control > símismo.t_ant) & (símismo.puntos_control <= símismo.t))
+
+        if últimos is None or control:
+            mandar = True
+        elif símismo.t < símismo.próximo[recip]:
+            mandar = False
+        else:
+            mandar = any(
+                np.any(np.abs(np.asarray(val) - últimos[v]) > símismo.tol * np.abs(últimos[v]))
+                for v, val in valores.items()
+            )
+            # Alargar el intervalo si los valores varían poco; volver a intercambiar a cada paso si no.
+            símismo.intervalo[recip] = 1 if mandar else min(2 * símismo.intervalo[recip], símismo.máx_intervalo)
+
+        if mandar:
+            símismo.últimos[recip] = {v: np.array(val, dtype=float) for v, val in valores.items()}
+            símismo.intervalo.setdefault(recip, 1)
+            símismo.n_intercambios += 1
+        else:
+            símismo.n_omitidos += 1
+
+        if mandar or símismo.t >= símismo.próximo[recip]:
+            símismo.próximo[recip] = símismo.t + símismo.intervalo[recip] * símismo.paso
+
+        return mandar
+
+    def resumen(símismo, tiempo_total):
+        """
+        Resume los intercambios de la simulación.
+
+        :param tiempo_total: El tiempo total de la simulación, en segundos.
+        :type tiempo_total: float
+        :return: El número de intercambios hechos y omitidos, la fracción omitida, y la aceleración estimada (el
+          tiempo que hubiera tomado la simulación con todos los intercambios, dividido por el tiempo real).
+        :rtype: dict
+        """
+
+        n_total = símismo.n_intercambios + símismo.n_omitidos
+        t_medio = símismo.tiempo_intercambios / símismo.n_intercambios if símismo.n_intercambios else 0
+        return {
+            'intercambios': símismo.n_intercambios,
+            'omitidos': símismo.n_omitidos,
+            'fracción_omitida': símismo.n_omitidos / n_total if n_total else 0,
+            'aceleración': (tiempo_total + símismo.n_omitidos * t_medio) / tiempo_total if tiempo_total else 1
+        }
+
+
 def _correr_modelo(x):
     """
     Función para inicializar y correr un modelo :class:`SuperConectado`.
@@ -1026,6 +1637,8 @@ def _correr_modelo(x):
       nivel de llaves es el nombre del submodelo y el segundo los nombres de los variables con sus valores
       iniciales), y el tercero es el diccionario de argumentos para pasar al modelo.
     :type x: tuple[SuperConectado, dict[str, dict[str, float | int | np.ndarray]], dict]
+    :return: Los valores de los variables de interés (``vars_interés``) de la corrida.
+    :rtype: dict[str, np.ndarray]
 
     """
 
@@ -1043,4 +1656,4 @@ def _correr_modelo(x):
         mod.modelos[m].inic_vals(dic_vals=d_inic)
 
     # Después, simular el modelo
-    mod.simular(**d_args)
+    return mod.simular(**d_args)
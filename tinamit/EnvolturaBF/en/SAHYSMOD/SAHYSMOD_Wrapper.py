@@ -4,7 +4,6 @@ from subprocess import run
 from warnings import warn
 
 import numpy as np
-import shutil
 
 from tinamit import obt_val_config, _
 from tinamit.BF import ModeloImpaciente
@@ -102,11 +101,8 @@ class ModeloSAHYSMOD(ModeloImpaciente):
         Variables have already been read in func:`inic_vars`.
         """
 
-        # Create run-specific working directories and input and ouput paths.
-        self.working_dir = os.path.join(self.base_dir, '_temp', nombre_corrida)
-        if os.path.isdir(self.working_dir):
-            shutil.rmtree(self.working_dir)
-        os.makedirs(self.working_dir)
+        # Get a clean run-specific working directory (in memory if possible) and input and ouput paths.
+        self.working_dir = self.pedir_dir_trabajo()
         self.output = os.path.join(self.working_dir, 'SAHYSMOD.out')
         self.input = os.path.join(self.working_dir, 'SAHYSMOD.inp')
 
@@ -135,11 +131,11 @@ class ModeloSAHYSMOD(ModeloImpaciente):
 
     def cerrar_modelo(self):
         """
-        No specific closing actions necessary, but we will clean up the directory, just to be nice.
+        No specific closing actions necessary, but we will clean up the directory and give it back to the pool of
+        working directories, just to be nice.
         """
-        for f in os.listdir(self.working_dir):
-            if re.match('Name(0|[0-9]{2})$', f):
-                os.remove(f)
+        self.liberar_dir_trabajo()
+        self.working_dir = None
 
     def escribir_archivo_ingr(self, n_años_simul, dic_ingr):
         """
@@ -181,6 +177,32 @@ class ModeloSAHYSMOD(ModeloImpaciente):
 
         dic_out = read_output_file(file_path=self.output, n_s=self.n_estaciones, n_p=self.n_poly, n_y=n_años_egr)
 
+        return self._process_output(dic_out)
+
+    def leer_archivo_egr_todos(self, n_años_egr):
+        """
+        This function reads all years of a SAHYSMOD output file in one pass, so that a multi-year simulation can be
+        replayed year by year.
+
+        :param n_años_egr: The number of output years.
+        :type n_años_egr: int
+        :rtype: list[dict]
+        """
+
+        l_dic_out = read_output_file(file_path=self.output, n_s=self.n_estaciones, n_p=self.n_poly, n_y=n_años_egr,
+                                     all_years=True)
+
+        return [self._process_output(dic_out) for dic_out in l_dic_out]
+
+    def _process_output(self, dic_out):
+        """
+        Adjusts soil salinity for the different crops and converts variable codes to variable names.
+
+        :param dic_out: The dictionary of output values for one year, as returned by :func:`read_output_file`.
+        :type dic_out: dict
+        :rtype: dict
+        """
+
         for cr in ['CrA#', 'CrB#', 'CrU#', 'Cr4#', 'A#', 'B#', 'U#']:
             dic_out[cr][dic_out[cr] == -1] = 0
 
@@ -270,7 +292,7 @@ class ModeloSAHYSMOD(ModeloImpaciente):
 
     def paralelizable(símismo):
         """
-        El modelo SAHYSMOD sí es paralelizable si las corridas tienen nombres distintos.
+        El modelo SAHYSMOD sí es paralelizable, porque cada corrida tiene su propio directorio de trabajo.
 
         :return: Verdadero.
         :rtype: bool
@@ -438,11 +460,12 @@ SAHYSMOD_input_vars = [v['code'] for v in vars_SAHYSMOD.values() if v['inp']]
 SAHYSMOD_output_vars = [v['code'] for v in vars_SAHYSMOD.values() if v['out']]
 
 
-def read_output_file(file_path, n_s, n_p, n_y):
+def read_output_file(file_path, n_s, n_p, n_y, all_years=False):
     """
     Reads the last year (all seasons and polygons) of a SAHYSMOD output file.
 
-    :param n_y: The number of years in the output file. Only the last year will be read.
+    :param n_y: The number of years in the output file. Only the last year will be read, unless `all_years` is
+      ``True``.
     :type n_y: int
     :param file_path: The absolute path to the output file.
     :type file_path: str
@@ -450,48 +473,79 @@ def read_output_file(file_path, n_s, n_p, n_y):
     :type n_s: int
     :param n_p: Number of INTERNAL polygons in the SAHYSMOD model.
     :type n_p: int
+    :param all_years: Whether to read all years of the output file (in one pass) instead of only the last one.
+    :type all_years: bool
     :return: A dictionary of output values, where each key is a variable name (SAHYSMOD variable code format) and each
       value is a numpy matrix with axis 0 = season, axis 1 = polygon. According to SAHYSMOD convention,
-      -1 indicates missing values.
-    :rtype: dict[np.ndarray]
+      -1 indicates missing values. If `all_years` is ``True``, a list of such dictionaries, one per year.
+    :rtype: dict[np.ndarray] | list[dict[np.ndarray]]
+    """
+
+    years = range(1, n_y + 1) if all_years else [n_y]
+    l_dic_data = []
+
+    with open(file_path, 'r') as d:
+        l = ''
+        for y in years:
+            while 'YEAR:      %i' % y not in l:
+                l = d.readline()
+                if not l:
+                    raise ValueError('Year %i was not found in the SAHYSMOD output.' % y)
+            dic_data, l = _read_output_year(d, l, n_s=n_s, n_p=n_p)
+            l_dic_data.append(dic_data)
+
+    if all_years:
+        return l_dic_data
+    return l_dic_data[0]
+
+
+def _read_output_year(d, l, n_s, n_p):
+    """
+    Reads one year (all seasons and polygons) of an open SAHYSMOD output file.
+
+    :param d: The open output file, positioned right after the year's header line.
+    :param l: The year's header line.
+    :type l: str
+    :param n_s: Number of seasons per year.
+    :type n_s: int
+    :param n_p: Number of INTERNAL polygons in the SAHYSMOD model.
+    :type n_p: int
+    :return: The dictionary of output values for the year, and the last line read from the file.
+    :rtype: (dict[np.ndarray], str)
     """
 
     dic_data = dict([(k, np.empty((n_s, n_p))) for k in SAHYSMOD_output_vars])
     for k, v in dic_data.items():
         v[:] = -1
 
-    with open(file_path, 'r') as d:
-        l = ''
-        while 'YEAR:      %i' % n_y not in l:
-            l = d.readline()
-        for season in range(n_s):
-            for season_poly in range(n_p):  # Read output for the last year's seasons from the output file
-
-                poly = []
-                while re.match(' #', l) is None:
-                    poly.append(l)
-                    l = d.readline()
-
-                l = d.readline()  # Advance one more line for the next season
-
-                for cod in SAHYSMOD_output_vars:
-                    var_out = cod.replace('#', '').replace('*', '\*')
-
-                    for line in poly:
-
-                        line += ' '
-                        m = re.search(' %s += +([^ ]*)' % var_out, line)
-
-                        if m:
-                            val = m.groups()[0]
-                            if val == '-':
-                                val = -1
-                            else:
-                                try:
-                                    val = float(val)
-                                except ValueError:
-                                    raise ValueError('The variable "%s" was not read from the SAHYSMOD output.'
-                                                     % var_out)
-                            dic_data[cod][(season, season_poly)] = val
-                            break
-    return dic_data
+    for season in range(n_s):
+        for season_poly in range(n_p):  # Read output for the year's seasons from the output file
+
+            poly = []
+            while re.match(' #', l) is None:
+                poly.append(l)
+                l = d.readline()
+
+            l = d.readline()  # Advance one more line for the next season
+
+            for cod in SAHYSMOD_output_vars:
+                var_out = cod.replace('#', '').replace('*', '\\*')
+
+                for line in poly:
+
+                    line += ' '
+                    m = re.search(' %s += +([^ ]*)' % var_out, line)
+
+                    if m:
+                        val = m.groups()[0]
+                        if val == '-':
+                            val = -1
+                        else:
+                            try:
+                                val = float(val)
+                            except ValueError:
+                                raise ValueError('The variable "%s" was not read from the SAHYSMOD output.'
+                                                 % var_out)
+                        dic_data[cod][(season, season_poly)] = val
+                        break
+    return dic_data, l
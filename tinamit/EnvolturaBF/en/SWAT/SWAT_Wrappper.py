@@ -1,8 +1,13 @@
+import atexit
 import os
+import pickle
+import shutil
+import tempfile
+from fnmatch import fnmatch
 from subprocess import run
 import numpy as np
 from tinamit import obt_val_config
-from tinamit.BF import ModeloBF
+from tinamit.BF import ModeloBF, ReservaDirsTrabajo
 
 
 class ModeloSWAT(ModeloBF):
@@ -32,13 +37,22 @@ class ModeloSWAT(ModeloBF):
         # Time step of the model
         self.timestep = None
 
-        # Set the working directory, which is basically the same as Textinout Path
+        # Set the working directory, which is the same as Textinout Path until a run starts. Each run is then done in
+        # its own clone of the project (see :func:`clone_project_files`), in a folder on the same disk so that files
+        # can be hard linked.
+        self.textinout_path = textinout_path
         self.working_dir = textinout_path
+        self.clone_pool = ReservaDirsTrabajo(dir_base=os.path.join(textinout_path, '_temp'))
+        atexit.register(self.clone_pool.vaciar)
 
         # Prepare the command to the SWAT executable
         # This is prepared later on in the function "iniciar_modelo"
         self.command = None
 
+        # The values of the input variables as they were last written to the SWAT files (to only rewrite the files
+        # whose values have changed)
+        self.written_vals = {}
+
         # Initialise as the parent class.
         super().__init__()
 
@@ -57,40 +71,29 @@ class ModeloSWAT(ModeloBF):
                                     'dims': (None,)  # This will be changed later for multidimensional variables.
                                     }
 
-        self.hru_params = read_hru_details(self.working_dir)
-
-        # Number of sub-basins in the model
-        self.nsub = self.hru_params["no_sub"]
-
-        # Number of hrus in the model (determining from the number of mgt parameter files)
-        self.nhru = self.hru_params["no_hru"]
-
         self.leer_vals_inic()
 
     def iniciar_modelo(self, tiempo_final, nombre_corrida):
         """
         This function doesn't do anything of much importance.
         It:
-        1) Determines the time step;
-        2) Reads the HRU details;
-        3) Determines the number of sub-basins and HRUs in the SWAT project.
-        4) Creates a run command for running SWAT
+        1) Clones the SWAT project into a working directory for this run;
+        2) Determines the time step;
+        3) Creates a run command for running SWAT
+
+        The HRU details and the number of sub-basins and HRUs are (re)read with the initial values, by the parent
+        class.
 
         The input arguments are not used and are passed to parent class.
         """
 
+        # Clone the project, so that the original project is never changed and runs can be done in parallel
+        self.working_dir = self.pedir_dir_trabajo(reserva=self.clone_pool)
+        clone_project_files(self.textinout_path, self.working_dir)
+
         # Determining the time step
         self.timestep = self.obt_unidad_tiempo()
 
-        # Reading HRU details
-        self.hru_params = read_hru_details(self.working_dir)
-
-        # Number of sub-basins in the model
-        self.nsub = self.hru_params["no_sub"]
-
-        # Number of hrus in the model (determining from the number of mgt parameter files)
-        self.nhru = self.hru_params["no_hru"]
-
         # Create the run command (for later use)
         args = dict(SWAT=self.swat_exe, work_dir=self.working_dir)
         self.command = '"{SWAT}" "{work_dir}"'.format(**args)
@@ -229,35 +232,73 @@ class ModeloSWAT(ModeloBF):
 
             self.variables[code]["dims"] = (1,)
 
+        # Find which files (and which HRUs or subbasins) have changed since they were last written
+        changes = self._find_changes()
+
         # Writing the file.cio with updated values
-        write_file_cio(self.working_dir, self.variables)
+        if 'file.cio' in changes:
+            write_file_cio(self.working_dir, self.variables)
 
         # Updating basin.bsn file
-        write_bsn_file(self.working_dir, self.variables)
+        if 'bsn' in changes:
+            write_bsn_file(self.working_dir, self.variables)
 
-        # Updating .mgt files
-        write_mgt_file(self.working_dir, self.variables, self.hru_params)
+        # Updating .mgt, .hru, .gw, .sdr, .sep and .sol files, only for the HRUs that changed
+        for file_type, write_file in hru_file_writers.items():
+            if file_type in changes:
+                write_file(self.working_dir, self.variables, self.hru_params, hrus=changes[file_type])
+
+        # Updating .pnd and .rte files, only for the subbasins that changed
+        for file_type, write_file in sub_file_writers.items():
+            if file_type in changes:
+                write_file(self.working_dir, self.variables, self.hru_params, subs=changes[file_type])
+
+        # Remember what was written
+        self._save_written_vals()
+
+    def _find_changes(self):
+        """
+        This function compares the current values of the input variables with the values last written to the SWAT
+        files.
+
+        :return: A dictionary with the types of files that must be rewritten as keys, and the set of changed HRU (or
+          subbasin) indices as values (``None`` means all of them).
+        :rtype: dict[str, set[int] | None]
+        """
 
-        # Updating .hru files
-        write_hru_file(self.working_dir, self.variables, self.hru_params)
+        changes = {}
 
-        # Updating .pnd files
-        write_pnd_file(self.working_dir, self.variables, self.hru_params)
+        for code in SWAT_input_vars:
+            file_type = vars_SWAT[code]['file']
 
-        # Updating .rte files
-        write_rte_file(self.working_dir, self.variables, self.hru_params)
+            # If we don't know what is in the file, it must be written entirely
+            if code in self.written_vals:
+                indices = changed_indices(self.written_vals[code], self.variables[code]['val'])
+            else:
+                indices = None
 
-        # Updating .gw files
-        write_gw_file(self.working_dir, self.variables, self.hru_params)
+            if indices is None:
+                changes[file_type] = None
+            elif len(indices):
+                if file_type not in changes:
+                    changes[file_type] = set()
+                if changes[file_type] is not None:
+                    changes[file_type].update(indices)
 
-        # Updating .sdr files
-        write_sdr_file(self.working_dir, self.variables, self.hru_params)
+        return changes
 
-        # Updating .sep files
-        write_sep_file(self.working_dir, self.variables, self.hru_params)
+    def _save_written_vals(self):
+        """
+        This function saves a copy of the values of the input variables, as they are in the SWAT files.
+        """
 
-        # Updating .sol files
-        write_sol_file(self.working_dir, self.variables, self.hru_params)
+        for code in SWAT_input_vars:
+            val = self.variables[code]['val']
+            if isinstance(val, np.ndarray):
+                val = val.copy()
+            elif isinstance(val, list):
+                val = list(val)
+            self.written_vals[code] = val
 
     def incrementar(self, paso):
         """
@@ -293,10 +334,21 @@ class ModeloSWAT(ModeloBF):
 
     def cerrar_modelo(self):
         """
-        Esta función debe cerrar la simulación. No se aplica a todos los modelos biofísicos (en ese caso, usar ``pass``
-        ).
+        This function gives the run's clone of the project back to the pool of working directories.
+        """
+
+        self.liberar_dir_trabajo()
+        self.working_dir = self.textinout_path
+
+    def paralelizable(self):
+        """
+        SWAT runs are parallelizable, since each one is done in its own clone of the project.
+
+        :return: True
+        :rtype: bool
         """
-        pass
+
+        return True
 
     def obt_unidad_tiempo(self):
         """
@@ -326,156 +378,33 @@ class ModeloSWAT(ModeloBF):
 
     def leer_vals_inic(self):
         """
-        This function reads the values of the SWAT parameters
-        For now, it works only for basins.bsn and mgt files parameters
+        This function reads the values of the SWAT parameters, as well as the HRU details and the number of
+        sub-basins and HRUs in the SWAT project.
+        The parameter files are only parsed again if they changed since the last time (see :func:`load_project`).
         """
 
-        # Read file.cio parameters
-        file_cio_vars = read_file_cio(self.working_dir)
-
-        # Writing the values of file.cio parameters in variables dictionary
-        for code in file_cio_vars:
-            if isinstance(self.variables[code]["val"], np.ndarray):
-                self.variables[code]["val"][:] = file_cio_vars[code]
-            else:
-                self.variables[code]["val"] = file_cio_vars[code]
-            if isinstance(file_cio_vars[code], np.ndarray):
-                dims = file_cio_vars[code].shape
-            else:
-                dims = (1,)
-            self.variables[code]["dims"] = dims
-
-        # Reading basin parameters
-        bsn_params = read_bsn_file(self.working_dir)
-
-        # Writing the values of basin parameters in variables dictionary
-        for code in bsn_params:
-            if isinstance(self.variables[code]["val"], np.ndarray):
-                self.variables[code]["val"][:] = bsn_params[code]
-            else:
-                self.variables[code]["val"] = bsn_params[code]
-            if isinstance(bsn_params[code], np.ndarray):
-                dims = bsn_params[code].shape
-            else:
-                dims = (1,)
-            self.variables[code]["dims"] = dims
-
-        # Reading mgt files parameters
-        mgt_params = read_mgt_file(self.working_dir, self.hru_params)
+        # Get a copy of the parsed project (the run's clone, if any, starts identical to the original project)
+        project = clone_project(load_project(self.textinout_path))
 
-        # Writing the values of mgt parameters in variables dictionary
-        for code in mgt_params:
-            if isinstance(self.variables[code]["val"], np.ndarray):
-                self.variables[code]["val"][:] = mgt_params[code]
-            else:
-                self.variables[code]["val"] = mgt_params[code]
-            if isinstance(mgt_params[code], np.ndarray):
-                dims = mgt_params[code].shape
-            else:
-                dims = (1,)
-            self.variables[code]["dims"] = dims
-
-        # Reading hru files parameters
-        hru_file_params = read_hru_file(self.working_dir, self.hru_params)
-
-        # Writing the values of mgt parameters in variables dictionary
-        for code in hru_file_params:
-            if isinstance(self.variables[code]["val"], np.ndarray):
-                self.variables[code]["val"][:] = hru_file_params[code]
-            else:
-                self.variables[code]["val"] = hru_file_params[code]
-            if isinstance(hru_file_params[code], np.ndarray):
-                dims = hru_file_params[code].shape
-            else:
-                dims = (1,)
-            self.variables[code]["dims"] = dims
-
-        # Reading pnd files parameters
-        pnd_file_params = read_pond_file(self.working_dir, self.hru_params)
-
-        # Writing the values of mgt parameters in variables dictionary
-        for code in pnd_file_params:
-            if isinstance(self.variables[code]["val"], np.ndarray):
-                self.variables[code]["val"][:] = pnd_file_params[code]
-            else:
-                self.variables[code]["val"] = pnd_file_params[code]
-            if isinstance(pnd_file_params[code], np.ndarray):
-                dims = pnd_file_params[code].shape
-            else:
-                dims = (1,)
-            self.variables[code]["dims"] = dims
-
-        # Reading rte files parameters
-        rte_file_params = read_rte_file(self.working_dir, self.hru_params)
-
-        # Writing the values of rte parameters in variables dictionary
-        for code in rte_file_params:
-            if isinstance(self.variables[code]["val"], np.ndarray):
-                self.variables[code]["val"][:] = rte_file_params[code]
-            else:
-                self.variables[code]["val"] = rte_file_params[code]
-            if isinstance(rte_file_params[code], np.ndarray):
-                dims = rte_file_params[code].shape
-            else:
-                dims = (1,)
-            self.variables[code]["dims"] = dims
-
-        # Reading gw files parameters
-        gw_file_params = read_gw_file(self.working_dir, self.hru_params)
-
-        # Writing the values of gw parameters in variables dictionary
-        for code in gw_file_params:
-            if isinstance(self.variables[code]["val"], np.ndarray):
-                self.variables[code]["val"][:] = gw_file_params[code]
-            else:
-                self.variables[code]["val"] = gw_file_params[code]
-            if isinstance(gw_file_params[code], np.ndarray):
-                dims = gw_file_params[code].shape
-            else:
-                dims = (1,)
-            self.variables[code]["dims"] = dims
-
-        # Reading sdr files parameters
-        sdr_file_params = read_sdr_file(self.working_dir, self.hru_params)
-
-        # Writing the values of sdr parameters in variables dictionary
-        for code in sdr_file_params:
-            if isinstance(self.variables[code]["val"], np.ndarray):
-                self.variables[code]["val"][:] = sdr_file_params[code]
-            else:
-                self.variables[code]["val"] = sdr_file_params[code]
-            if isinstance(sdr_file_params[code], np.ndarray):
-                dims = sdr_file_params[code].shape
-            else:
-                dims = (1,)
-            self.variables[code]["dims"] = dims
-
-        # Reading sep files parameters
-        sep_file_params = read_sep_file(self.working_dir, self.hru_params)
+        self.hru_params = project['hru_params']
 
-        # Writing the values of sep parameters in variables dictionary
-        for code in sep_file_params:
-            if isinstance(self.variables[code]["val"], np.ndarray):
-                self.variables[code]["val"][:] = sep_file_params[code]
-            else:
-                self.variables[code]["val"] = sep_file_params[code]
-            if isinstance(sep_file_params[code], np.ndarray):
-                dims = sep_file_params[code].shape
-            else:
-                dims = (1,)
-            self.variables[code]["dims"] = dims
+        # Number of sub-basins in the model
+        self.nsub = self.hru_params["no_sub"]
 
-        # Reading sol files parameters
-        sol_file_params = read_sol_file(self.working_dir, self.hru_params)
+        # Number of hrus in the model (determining from the number of mgt parameter files)
+        self.nhru = self.hru_params["no_hru"]
 
-        # Writing the values of sol parameters in variables dictionary
-        for code in sol_file_params:
-            if isinstance(self.variables[code]["val"], list):
-                self.variables[code]["val"][:] = sol_file_params[code]
+        # Writing the values of the parameters in variables dictionary
+        for code, val in project['params'].items():
+            if isinstance(self.variables[code]["val"], (np.ndarray, list)) and \
+                    isinstance(val, type(self.variables[code]["val"])):
+                self.variables[code]["val"][:] = val
             else:
-                self.variables[code]["val"] = sol_file_params[code]
-            if isinstance(sol_file_params[code], list):
-                dims = len(sol_file_params[code])
+                self.variables[code]["val"] = val
+            if isinstance(val, np.ndarray):
+                dims = val.shape
+            elif isinstance(val, list):
+                dims = (len(val),)
             else:
                 dims = (1,)
             self.variables[code]["dims"] = dims
@@ -484,6 +413,9 @@ class ModeloSWAT(ModeloBF):
         for code in SWAT_output_vars:
             self.variables[code]["dims"] = (self.nsub,)
 
+        # The values just read are the ones in the files
+        self._save_written_vals()
+
     def __getinitargs__(self):
         return self.initargs
 
@@ -943,13 +875,233 @@ SWAT_sdr_file_vars = [v['code'] for v in vars_SWAT.values() if v['file'] == 'sdr
 SWAT_sep_file_vars = [v['code'] for v in vars_SWAT.values() if v['file'] == 'sep']
 SWAT_sol_file_vars = [v['code'] for v in vars_SWAT.values() if v['file'] == 'sol']
 
+# The columns of the SWAT output files (after the leading text label), in order. Only the columns actually present in
+# an output file will be read, so that files from SWAT versions with fewer columns can also be read.
+SWAT_output_columns = {
+    'rch': SWAT_output_vars,
+    'sub': ['SUB', 'GIS', 'MON', 'AREA', 'PRECIP', 'SNOMELT', 'PET', 'ET', 'SW', 'PERC', 'SURQ', 'GW_Q', 'WYLD',
+            'SYLD', 'ORGN', 'ORGP', 'NSURQ', 'SOLP', 'SEDP', 'LAT_Q', 'LATNO3', 'GWNO3', 'CHOLA', 'CBODU', 'DOXQ',
+            'TNO3', 'QTILE', 'TVAP'],
+    'hru': ['HRU', 'GIS', 'SUB', 'MGT', 'MON', 'AREA', 'PRECIP', 'SNOFALL', 'SNOMELT', 'IRR', 'PET', 'ET',
+            'SW_INIT', 'SW_END', 'PERC', 'GW_RCHG', 'DA_RCHG', 'REVAP', 'SA_IRR', 'DA_IRR', 'SA_ST', 'DA_ST',
+            'SURQ_GEN', 'SURQ_CNT', 'TLOSS', 'LATQGEN', 'GW_Q', 'WYLD', 'DAILYCN', 'TMP_AV', 'TMP_MX', 'TMP_MN',
+            'SOL_TMP', 'SOLAR', 'SYLD', 'USLE', 'N_APP', 'P_APP', 'NAUTO', 'PAUTO', 'NGRZ', 'PGRZ', 'NCFRT', 'PCFRT',
+            'NRAIN', 'NFIX', 'F-MN', 'A-MN', 'A-SN', 'F-MP', 'AO-LP', 'L-AP', 'A-SP', 'DNIT', 'NUP', 'PUP', 'ORGN',
+            'ORGP', 'SEDP', 'NSURQ', 'NLATQ', 'NO3L', 'NO3GW', 'SOLP', 'P_GW', 'W_STRS', 'TMP_STRS', 'N_STRS',
+            'P_STRS', 'BIOM', 'LAI', 'YLD', 'BACTP', 'BACTLP', 'WTAB_CLI', 'WTAB_SOL', 'SNO', 'CMUP', 'CMTOT',
+            'QTILE', 'TNO3', 'LNO3', 'GW_Q_D', 'LATQCNT', 'TVAP'],
+    'rsv': ['RES', 'MON', 'VOLUME', 'FLOW_IN', 'FLOW_OUT', 'PRECIP', 'EVAP', 'SEEPAGE', 'SED_IN', 'SED_OUT',
+            'SED_CONC', 'ORGN_IN', 'ORGN_OUT', 'RES_ORGN', 'ORGP_IN', 'ORGP_OUT', 'RES_ORGP', 'NO3_IN', 'NO3_OUT',
+            'RES_NO3', 'NO2_IN', 'NO2_OUT', 'RES_NO2', 'NH3_IN', 'NH3_OUT', 'RES_NH3', 'MINP_IN', 'MINP_OUT',
+            'RES_MINP', 'CHLA_IN', 'CHLA_OUT', 'SECCHIDEPTH', 'PEST_IN', 'REACTPST', 'VOLPST', 'SETTLPST',
+            'RESUSP_PST', 'DIFFUSEPST', 'REACBEDPST', 'BURYPST', 'PEST_OUT', 'PSTCNCW', 'PSTCNCB']
+}
+
+
+# The files (by extension or by name) of a SWAT project that are read by :func:`read_project`.
+SWAT_project_extensions = ('.cio', '.bsn', '.mgt', '.hru', '.pnd', '.rte', '.gw', '.sdr', '.sep', '.sol')
+SWAT_project_files = ('HRULandUseSoilsReport.txt',)
+
+# Name of the cache file of parsed SWAT projects, in the TextInOut folder
+project_cache_file = '.tinamit_project.pkl'
+
+# Parsed SWAT projects already loaded in this process, by TextInOut folder
+_loaded_projects = {}
+
+
+def read_project(textinout_path):
+    """
+    This function reads the HRU details and all the parameter files of a SWAT project.
+
+    :param textinout_path: Path to the TextInOut folder
+    :type textinout_path: str
+    :return: A dictionary with the HRU details (key 'hru_params') and the values of all the parameters (key 'params').
+    :rtype: dict
+    """
+
+    hru_params = read_hru_details(textinout_path)
+
+    params = {}
+    params.update(read_file_cio(textinout_path))
+    params.update(read_bsn_file(textinout_path))
+    for read_file in [read_mgt_file, read_hru_file, read_pond_file, read_rte_file, read_gw_file, read_sdr_file,
+                      read_sep_file, read_sol_file]:
+        params.update(read_file(textinout_path, hru_params))
+
+    return {'hru_params': hru_params, 'params': params}
+
+
+def load_project(textinout_path):
+    """
+    This function returns the parsed SWAT project (see :func:`read_project`). The project is kept in memory and cached
+    in the TextInOut folder, and is only parsed again if a project file was modified, added or removed.
+    The returned project must not be modified; use :func:`clone_project` to get a copy.
+
+    :param textinout_path: Path to the TextInOut folder
+    :type textinout_path: str
+    :rtype: dict
+    """
+
+    key = _project_key(textinout_path)
+
+    # Already loaded in this process
+    if textinout_path in _loaded_projects and _loaded_projects[textinout_path]['key'] == key:
+        return _loaded_projects[textinout_path]['project']
+
+    # Cached on disk
+    cache_path = os.path.join(textinout_path, project_cache_file)
+    project = None
+    try:
+        with open(cache_path, 'rb') as d:
+            cache = pickle.load(d)
+        if cache['key'] == key:
+            project = cache['project']
+    except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+        pass
+
+    # Otherwise, parse the project files
+    if project is None:
+        project = read_project(textinout_path)
+
+        # Write to a temporary file first, so that other processes never read a partially written cache
+        temp_path = None
+        try:
+            temp_file, temp_path = tempfile.mkstemp(suffix='.temp', prefix=project_cache_file, dir=textinout_path)
+            with os.fdopen(temp_file, 'wb') as d:
+                pickle.dump({'key': key, 'project': project}, d, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            # Read-only project folder; it will only be kept in memory
+            if temp_path is not None and os.path.isfile(temp_path):
+                os.remove(temp_path)
+
+    _loaded_projects[textinout_path] = {'key': key, 'project': project}
+    return project
+
+
+def clone_project(project):
+    """
+    This function makes a copy of a parsed SWAT project that can be modified without changing the original.
+
+    :param project: The project, as returned by :func:`load_project`.
+    :type project: dict
+    :rtype: dict
+    """
+
+    def copy_val(val):
+        if isinstance(val, np.ndarray):
+            return val.copy()
+        elif isinstance(val, list):
+            return list(val)
+        return val
+
+    return {'hru_params': {k: copy_val(v) for k, v in project['hru_params'].items()},
+            'params': {k: copy_val(v) for k, v in project['params'].items()}}
+
+
+def _project_key(textinout_path):
+    """
+    This function generates a key that changes whenever a file of the SWAT project is modified, added or removed.
+
+    :param textinout_path: Path to the TextInOut folder
+    :type textinout_path: str
+    :rtype: tuple
+    """
+
+    return tuple(sorted(
+        (f.name, f.stat().st_mtime_ns, f.stat().st_size) for f in os.scandir(textinout_path)
+        if f.is_file() and (os.path.splitext(f.name)[1] in SWAT_project_extensions or f.name in SWAT_project_files)
+    ))
+
+
+# The files (by pattern) that SWAT writes during a run, and that must not be cloned
+SWAT_output_patterns = ('output.*', '*.out', '*.std', 'fin.fin', 'chan.deg', 'watout.dat')
+
+
+def clone_project_files(textinout_path, clone_path):
+    """
+    This function clones the files of a SWAT project into another (empty) folder. Files are hard linked when possible
+    (so that cloning is almost instantaneous even for large projects), or otherwise copied. Output files are not
+    cloned.
+    Since linked files are shared with the original project, files in the clone must be written with
+    :func:`_write_lines`, which replaces the link with a new file instead of changing the original one.
+
+    :param textinout_path: Path to the original TextInOut folder
+    :type textinout_path: str
+    :param clone_path: Path to the folder of the clone
+    :type clone_path: str
+    """
+
+    link = True
+    for f in os.scandir(textinout_path):
+        if not f.is_file() or f.name == project_cache_file or any(fnmatch(f.name, p) for p in SWAT_output_patterns):
+            continue
+
+        clone_file = os.path.join(clone_path, f.name)
+        if link:
+            try:
+                os.link(f.path, clone_file)
+                continue
+            except OSError:
+                link = False  # For example, if the clone is on another disk
+        shutil.copy2(f.path, clone_file)
+
+
+def _write_lines(file_path, lines):
+    """
+    This function writes the lines of a SWAT file. The existing file is removed first, so that if it is a hard link
+    to the original project (see :func:`clone_project_files`), the original file is left unchanged.
+
+    :param file_path: Path of the file
+    :type file_path: str
+    :param lines: The lines of the file
+    :type lines: list[str]
+    """
+
+    if os.path.isfile(file_path):
+        os.remove(file_path)
+
+    with open(file_path, 'w') as d:
+        for line in lines:
+            d.write(line)
+
+
+def changed_indices(old, new):
+    """
+    This function finds the indices (HRUs or subbasins) at which the values of a variable have changed.
+
+    :param old: The old values.
+    :type old: np.ndarray | list | float | int | str
+    :param new: The new values.
+    :type new: np.ndarray | list | float | int | str
+    :return: The set of changed indices, or ``None`` if the values can't be compared index by index.
+    :rtype: set[int] | None
+    """
+
+    if isinstance(new, list) or isinstance(old, list):
+        if not isinstance(new, list) or not isinstance(old, list) or len(new) != len(old):
+            return None
+        return {i for i, (o, n) in enumerate(zip(old, new)) if o != n}
+
+    old = np.asarray(old)
+    new = np.asarray(new)
+    if old.shape != new.shape:
+        return None
+
+    different = old != new
+    if new.dtype.kind == 'f' and old.dtype.kind == 'f':
+        # Uninitialised (nan) values have not changed
+        different &= ~(np.isnan(old) & np.isnan(new))
+
+    return set(np.flatnonzero(different).tolist())
+
 
 def read_reach_output(textinout_path, nsub):
     """
     This function reads output of last day from output.rch file
 
-    :param output_rch_path: Path of the output.rch file in the TextInOut folder
-    :type output_rch_path: str
+    :param textinout_path: Path of the TextInOut folder
+    :type textinout_path: str
 
     :param nsub: Number of subbasins
     :type nsub: int
@@ -958,72 +1110,98 @@ def read_reach_output(textinout_path, nsub):
       value is a numpy array with axis as subbasins
     :rtype: dict[np.array]
     """
-    output_rch_path = os.path.join(textinout_path, "output.rch")
-
-    dict_data = dict([(k, np.empty((nsub,))) for k in SWAT_output_vars])
-
-    with open(output_rch_path, 'r') as output_rch:
-        output_rch_content = output_rch.readlines()
-
-    # For every subbasin in the project
-    for sb_no in range(nsub):
-        row_index = sb_no - nsub  # Skipping first 9 header rows
-        sb_output = output_rch_content[row_index]
-        split_output = sb_output.split()
-
-        dict_data['RCH'][sb_no] = split_output[1]
-        dict_data['GIS'][sb_no] = split_output[2]
-        dict_data['MON'][sb_no] = split_output[3]
-        dict_data['AREA'][sb_no] = split_output[4]
-        dict_data['FLOW_IN'][sb_no] = split_output[5]
-        dict_data['FLOW_OUT'][sb_no] = split_output[6]
-        dict_data['EVAP'][sb_no] = split_output[7]
-        dict_data['TLOSS'][sb_no] = split_output[8]
-        dict_data['SED_IN'][sb_no] = split_output[9]
-        dict_data['SED_OUT'][sb_no] = split_output[10]
-        dict_data['SEDCONC'][sb_no] = split_output[11]
-        dict_data['ORGN_IN'][sb_no] = split_output[12]
-        dict_data['ORGN_OUT'][sb_no] = split_output[13]
-        dict_data['ORGP_IN'][sb_no] = split_output[14]
-        dict_data['ORGP_OUT'][sb_no] = split_output[15]
-        dict_data['NO3_IN'][sb_no] = split_output[16]
-        dict_data['NO3_OUT'][sb_no] = split_output[17]
-        dict_data['NH4_IN'][sb_no] = split_output[18]
-        dict_data['NH4_OUT'][sb_no] = split_output[19]
-        dict_data['NO2_IN'][sb_no] = split_output[20]
-        dict_data['NO2_OUT'][sb_no] = split_output[21]
-        dict_data['MINP_IN'][sb_no] = split_output[22]
-        dict_data['MINP_OUT'][sb_no] = split_output[23]
-        dict_data['ALGAE_IN'][sb_no] = split_output[24]
-        dict_data['ALGAE_OUT'][sb_no] = split_output[25]
-        dict_data['CBOD_IN'][sb_no] = split_output[26]
-        dict_data['CBOD_OUT'][sb_no] = split_output[27]
-        dict_data['DISOX_IN'][sb_no] = split_output[28]
-        dict_data['DISOX_OUT'][sb_no] = split_output[29]
-        dict_data['SOLPST_IN'][sb_no] = split_output[30]
-        dict_data['SOLPST_OUT'][sb_no] = split_output[31]
-        dict_data['SORPST_IN'][sb_no] = split_output[32]
-        dict_data['SORPST_OUT'][sb_no] = split_output[33]
-        dict_data['REACTPST'][sb_no] = split_output[34]
-        dict_data['VOLPST'][sb_no] = split_output[35]
-        dict_data['SETTLPST'][sb_no] = split_output[36]
-        dict_data['RESUSP_PST'][sb_no] = split_output[37]
-        dict_data['DIFFUSEPST'][sb_no] = split_output[38]
-        dict_data['REACBEDPST'][sb_no] = split_output[39]
-        dict_data['BURYPST'][sb_no] = split_output[40]
-        dict_data['BED_PST'][sb_no] = split_output[41]
-        dict_data['BACTP_OUT'][sb_no] = split_output[42]
-        dict_data['BACTLP_OUT'][sb_no] = split_output[43]
-        dict_data['CMETAL#1'][sb_no] = split_output[44]
-        dict_data['CMETAL#2'][sb_no] = split_output[45]
-        dict_data['CMETAL#3'][sb_no] = split_output[46]
-        dict_data['TOT_N'][sb_no] = split_output[47]
-        dict_data['TOT_P'][sb_no] = split_output[48]
-        dict_data['NO3CONC'][sb_no] = split_output[49]
+
+    table = read_output(textinout_path, file_type='rch', n_units=nsub)
+
+    dict_data = dict([(k, np.full((nsub,), np.nan)) for k in SWAT_output_vars])
+    for code in table.dtype.names:
+        dict_data[code][:] = table[code]
 
     return dict_data
 
 
+def read_output(textinout_path, file_type='rch', n_units=None):
+    """
+    This function reads the output of the last time step of a SWAT output file (output.rch, output.sub, output.hru
+    or output.rsv). It reads the file backwards from its end, so the time taken does not depend on the length of the
+    simulation, and converts all values at once.
+
+    :param textinout_path: Path of the TextInOut folder
+    :type textinout_path: str
+
+    :param file_type: The output file to read: 'rch', 'sub', 'hru' or 'rsv'.
+    :type file_type: str
+
+    :param n_units: The number of reaches, subbasins, HRUs or reservoirs in the last time step. If ``None``, it will be
+      determined from the file (the last time step ends when a unit number repeats itself).
+    :type n_units: int
+
+    :return: A structured array, with one row per unit and one field per output variable (see
+      :data:`SWAT_output_columns`).
+    :rtype: np.ndarray
+    """
+
+    columns = SWAT_output_columns[file_type]
+    output_path = os.path.join(textinout_path, 'output.' + file_type)
+
+    # Read the lines of the last time step
+    lines = []
+    units = set()
+    with open(output_path, 'rb') as output_file:
+        for line in _lines_from_end(output_file):
+            split_line = line.split()
+            if len(split_line) < 2 or not split_line[1].isdigit():
+                continue  # Blank or header line
+
+            if n_units is None:
+                if split_line[1] in units:
+                    break
+                units.add(split_line[1])
+
+            lines.append(line.decode())
+            if len(lines) == n_units:
+                break
+    lines.reverse()
+
+    if not lines:
+        raise ValueError('The SWAT output file "{}" contains no output values.'.format(output_path))
+
+    # Convert everything at once, skipping the text label in the first column
+    n_cols = min(len(columns), len(lines[0].split()) - 1)
+    data = np.loadtxt(lines, usecols=range(1, n_cols + 1), dtype=float, ndmin=2)
+
+    dtype = np.dtype([(code, float) for code in columns[:n_cols]])
+    return np.ascontiguousarray(data).view(dtype).ravel()
+
+
+def _lines_from_end(file, chunk_size=2 ** 16):
+    """
+    This function generates the lines of a file opened in binary mode, starting with the last one.
+
+    :param file: The file.
+    :param chunk_size: The number of bytes to read at once.
+    :type chunk_size: int
+    :rtype: collections.Iterable[bytes]
+    """
+
+    file.seek(0, os.SEEK_END)
+    pos = file.tell()
+    rest = b''
+
+    while pos > 0:
+        size = min(chunk_size, pos)
+        pos -= size
+        file.seek(pos)
+        split_text = (file.read(size) + rest).split(b'\n')
+
+        # The first piece might be an incomplete line
+        rest = split_text[0]
+        for line in reversed(split_text[1:]):
+            yield line
+
+    yield rest
+
+
 def read_bsn_file(textinout_path):
     bsn_file_path = os.path.join(textinout_path, "basins.bsn")
 
@@ -1084,9 +1262,7 @@ def write_bsn_file(textinout_path, variables):
 
             new_file_content.append(new_line)
 
-    with open(bsn_file_path, 'w') as file_cio:
-        for line in new_file_content:
-            file_cio.write(line)
+    _write_lines(bsn_file_path, new_file_content)
 
 
 def read_file_cio(textinout_path):
@@ -1142,9 +1318,7 @@ def write_file_cio(textinout_path, variables):
 
             new_file_content.append(new_line)
 
-    with open(file_cio_path, 'w') as file_cio:
-        for line in new_file_content:
-            file_cio.write(line)
+    _write_lines(file_cio_path, new_file_content)
 
 
 def read_hru_details(textinout_path):
@@ -1348,7 +1522,7 @@ def read_mgt_file(textinout_path, hru_params):
     return mgt_params
 
 
-def write_mgt_file(textinout_path, variables, hru_params):
+def write_mgt_file(textinout_path, variables, hru_params, hrus=None):
     """
     This function writes the updated values of the .mgt file parameters
     in the .mgt files for every HRU.
@@ -1359,6 +1533,9 @@ def write_mgt_file(textinout_path, variables, hru_params):
     :type dict
     :param hru_params: A dictionary of HRU parameters
     :type dict
+    :param hrus: The serial numbers (starting at 0) of the HRUs whose files must be written. If ``None``, the
+      files of all HRUs are written.
+    :type hrus: set[int]
     :return:
     """
     no_hru_in_sub = hru_params["no_hru_in_sub"]
@@ -1372,6 +1549,10 @@ def write_mgt_file(textinout_path, variables, hru_params):
             hru_no = hru_index + 1
             hru_sr_no += 1
 
+            # Skip HRUs whose parameters did not change
+            if hrus is not None and hru_sr_no not in hrus:
+                continue
+
             # Getting the filename for the mgt file based in subbasin and hru no.
             if sub_no < 10:
                 sub_no_code = "0000" + str(sub_no)
@@ -1423,9 +1604,7 @@ def write_mgt_file(textinout_path, variables, hru_params):
 
                     new_file_content.append(new_line)
 
-            with open(mgt_file_path, 'w') as mgt_file:
-                for line in new_file_content:
-                    mgt_file.write(line)
+            _write_lines(mgt_file_path, new_file_content)
 
 
 def read_hru_file(textinout_path, hru_params):
@@ -1514,7 +1693,7 @@ def read_hru_file(textinout_path, hru_params):
     return hru_file_params
 
 
-def write_hru_file(textinout_path, variables, hru_params):
+def write_hru_file(textinout_path, variables, hru_params, hrus=None):
     """
     This function writes the updated values of the .hru file parameters
     in the .mgt files for every HRU.
@@ -1525,6 +1704,9 @@ def write_hru_file(textinout_path, variables, hru_params):
     :type dict
     :param hru_params: A dictionary of HRU parameters
     :type dict
+    :param hrus: The serial numbers (starting at 0) of the HRUs whose files must be written. If ``None``, the
+      files of all HRUs are written.
+    :type hrus: set[int]
     :return:
     """
     no_hru_in_sub = hru_params["no_hru_in_sub"]
@@ -1538,6 +1720,10 @@ def write_hru_file(textinout_path, variables, hru_params):
             hru_no = hru_index + 1
             hru_sr_no += 1
 
+            # Skip HRUs whose parameters did not change
+            if hrus is not None and hru_sr_no not in hrus:
+                continue
+
             # Getting the filename for the mgt file based in subbasin and hru no.
             if sub_no < 10:
                 sub_no_code = "0000" + str(sub_no)
@@ -1596,9 +1782,7 @@ def write_hru_file(textinout_path, variables, hru_params):
 
                     new_file_content.append(new_line)
 
-            with open(hru_file_path, 'w') as hru_file:
-                for line in new_file_content:
-                    hru_file.write(line)
+            _write_lines(hru_file_path, new_file_content)
 
 
 def read_pond_file(textinout_path, hru_params):
@@ -1664,7 +1848,7 @@ def read_pond_file(textinout_path, hru_params):
     return pnd_file_params
 
 
-def write_pnd_file(textinout_path, variables, hru_params):
+def write_pnd_file(textinout_path, variables, hru_params, subs=None):
     """
     This function writes the updated values of the .pnd file parameters
     in the .pnd files for every SB.
@@ -1675,12 +1859,19 @@ def write_pnd_file(textinout_path, variables, hru_params):
     :type dict
     :param hru_params: A dictionary of HRU parameters
     :type dict
+    :param subs: The subbasins (starting at 0) whose files must be written. If ``None``, the files of all
+      subbasins are written.
+    :type subs: set[int]
     :return:
     """
     nsub = hru_params["no_sub"]
 
     for sub in range(nsub):
 
+        # Skip subbasins whose parameters did not change
+        if subs is not None and sub not in subs:
+            continue
+
         sub_no = sub + 1
 
         # Getting the filename for the mgt file based in subbasin and hru no.
@@ -1724,9 +1915,7 @@ def write_pnd_file(textinout_path, variables, hru_params):
 
                 new_file_content.append(new_line)
 
-        with open(pnd_file_path, 'w') as pnd_file:
-            for line in new_file_content:
-                pnd_file.write(line)
+        _write_lines(pnd_file_path, new_file_content)
 
 
 def read_rte_file(textinout_path, hru_params):
@@ -1792,7 +1981,7 @@ def read_rte_file(textinout_path, hru_params):
     return rte_file_params
 
 
-def write_rte_file(textinout_path, variables, hru_params):
+def write_rte_file(textinout_path, variables, hru_params, subs=None):
     """
     This function writes the updated values of the .rte file parameters
     in the .rte files for every SB.
@@ -1803,12 +1992,19 @@ def write_rte_file(textinout_path, variables, hru_params):
     :type dict
     :param hru_params: A dictionary of HRU parameters
     :type dict
+    :param subs: The subbasins (starting at 0) whose files must be written. If ``None``, the files of all
+      subbasins are written.
+    :type subs: set[int]
     :return:
     """
     nsub = hru_params["no_sub"]
 
     for sub in range(nsub):
 
+        # Skip subbasins whose parameters did not change
+        if subs is not None and sub not in subs:
+            continue
+
         sub_no = sub + 1
 
         # Getting the filename for the mgt file based in subbasin and hru no.
@@ -1852,9 +2048,7 @@ def write_rte_file(textinout_path, variables, hru_params):
 
                 new_file_content.append(new_line)
 
-        with open(rte_file_path, 'w') as rte_file:
-            for line in new_file_content:
-                rte_file.write(line)
+        _write_lines(rte_file_path, new_file_content)
 
 
 def read_gw_file(textinout_path, hru_params):
@@ -1938,7 +2132,7 @@ def read_gw_file(textinout_path, hru_params):
     return gw_file_params
 
 
-def write_gw_file(textinout_path, variables, hru_params):
+def write_gw_file(textinout_path, variables, hru_params, hrus=None):
     """
     This function writes the updated values of the .gw file parameters
     in the .gw files for every HRU.
@@ -1949,6 +2143,9 @@ def write_gw_file(textinout_path, variables, hru_params):
     :type dict
     :param hru_params: A dictionary of HRU parameters
     :type dict
+    :param hrus: The serial numbers (starting at 0) of the HRUs whose files must be written. If ``None``, the
+      files of all HRUs are written.
+    :type hrus: set[int]
     :return:
     """
     no_hru_in_sub = hru_params["no_hru_in_sub"]
@@ -1962,6 +2159,10 @@ def write_gw_file(textinout_path, variables, hru_params):
             hru_no = hru_index + 1
             hru_sr_no += 1
 
+            # Skip HRUs whose parameters did not change
+            if hrus is not None and hru_sr_no not in hrus:
+                continue
+
             # Getting the filename for the mgt file based in subbasin and hru no.
             if sub_no < 10:
                 sub_no_code = "0000" + str(sub_no)
@@ -2014,9 +2215,7 @@ def write_gw_file(textinout_path, variables, hru_params):
 
                     new_file_content.append(new_line)
 
-            with open(gw_file_path, 'w') as gw_file:
-                for line in new_file_content:
-                    gw_file.write(line)
+            _write_lines(gw_file_path, new_file_content)
 
 
 def read_sdr_file(textinout_path, hru_params):
@@ -2100,7 +2299,7 @@ def read_sdr_file(textinout_path, hru_params):
     return sdr_file_params
 
 
-def write_sdr_file(textinout_path, variables, hru_params):
+def write_sdr_file(textinout_path, variables, hru_params, hrus=None):
     """
     This function writes the updated values of the .sdr file parameters
     in the .sdr files for every HRU.
@@ -2111,6 +2310,9 @@ def write_sdr_file(textinout_path, variables, hru_params):
     :type dict
     :param hru_params: A dictionary of HRU parameters
     :type dict
+    :param hrus: The serial numbers (starting at 0) of the HRUs whose files must be written. If ``None``, the
+      files of all HRUs are written.
+    :type hrus: set[int]
     :return:
     """
     no_hru_in_sub = hru_params["no_hru_in_sub"]
@@ -2124,6 +2326,10 @@ def write_sdr_file(textinout_path, variables, hru_params):
             hru_no = hru_index + 1
             hru_sr_no += 1
 
+            # Skip HRUs whose parameters did not change
+            if hrus is not None and hru_sr_no not in hrus:
+                continue
+
             # Getting the filename for the mgt file based in subbasin and hru no.
             if sub_no < 10:
                 sub_no_code = "0000" + str(sub_no)
@@ -2176,9 +2382,7 @@ def write_sdr_file(textinout_path, variables, hru_params):
 
                     new_file_content.append(new_line)
 
-            with open(sdr_file_path, 'w') as sdr_file:
-                for line in new_file_content:
-                    sdr_file.write(line)
+            _write_lines(sdr_file_path, new_file_content)
 
 
 def read_sep_file(textinout_path, hru_params):
@@ -2262,7 +2466,7 @@ def read_sep_file(textinout_path, hru_params):
     return sep_file_params
 
 
-def write_sep_file(textinout_path, variables, hru_params):
+def write_sep_file(textinout_path, variables, hru_params, hrus=None):
     """
     This function writes the updated values of the .sep file parameters
     in the .sep files for every HRU.
@@ -2273,6 +2477,9 @@ def write_sep_file(textinout_path, variables, hru_params):
     :type dict
     :param hru_params: A dictionary of HRU parameters
     :type dict
+    :param hrus: The serial numbers (starting at 0) of the HRUs whose files must be written. If ``None``, the
+      files of all HRUs are written.
+    :type hrus: set[int]
     :return:
     """
     no_hru_in_sub = hru_params["no_hru_in_sub"]
@@ -2286,6 +2493,10 @@ def write_sep_file(textinout_path, variables, hru_params):
             hru_no = hru_index + 1
             hru_sr_no += 1
 
+            # Skip HRUs whose parameters did not change
+            if hrus is not None and hru_sr_no not in hrus:
+                continue
+
             # Getting the filename for the mgt file based in subbasin and hru no.
             if sub_no < 10:
                 sub_no_code = "0000" + str(sub_no)
@@ -2338,9 +2549,7 @@ def write_sep_file(textinout_path, variables, hru_params):
 
                     new_file_content.append(new_line)
 
-            with open(sep_file_path, 'w') as sep_file:
-                for line in new_file_content:
-                    sep_file.write(line)
+            _write_lines(sep_file_path, new_file_content)
 
 
 def read_sol_file(textinout_path, hru_params):
@@ -2451,7 +2660,7 @@ def read_sol_file(textinout_path, hru_params):
 
 
 
-def write_sol_file(textinout_path, variables, hru_params):
+def write_sol_file(textinout_path, variables, hru_params, hrus=None):
     """
     This function writes the updated values of the .sol file parameters
     in the .sol files for every HRU.
@@ -2462,6 +2671,9 @@ def write_sol_file(textinout_path, variables, hru_params):
     :type dict
     :param hru_params: A dictionary of HRU parameters
     :type dict
+    :param hrus: The serial numbers (starting at 0) of the HRUs whose files must be written. If ``None``, the
+      files of all HRUs are written.
+    :type hrus: set[int]
     :return:
     """
     no_hru_in_sub = hru_params["no_hru_in_sub"]
@@ -2475,6 +2687,10 @@ def write_sol_file(textinout_path, variables, hru_params):
             hru_no = hru_index + 1
             hru_sr_no += 1
 
+            # Skip HRUs whose parameters did not change
+            if hrus is not None and hru_sr_no not in hrus:
+                continue
+
             # Getting the filename for the mgt file based in subbasin and hru no.
             if sub_no < 10:
                 sub_no_code = "0000" + str(sub_no)
@@ -2516,7 +2732,7 @@ def write_sol_file(textinout_path, variables, hru_params):
                     line = lines[line_no]
                     code = line.split(":")[0].strip()
                     value_text = line.split(":")[1].strip()
-                    new_value_text = variables[code]["val"][hru_sr_no]
+                    new_value_text = str(variables[code]["val"][hru_sr_no])
 
                     if not " " in value_text:
                         new_line = line.split(":")[0] + ": " + new_value_text + "\n"
@@ -2529,6 +2745,10 @@ def write_sol_file(textinout_path, variables, hru_params):
                     new_file_content.append(new_line)
                     line_no += 1
 
-            with open(sol_file_path, 'w') as sol_file:
-                for line in new_file_content:
-                    sol_file.write(line)
+            _write_lines(sol_file_path, new_file_content)
+
+
+# The functions that write the files of every HRU and of every subbasin, by file type
+hru_file_writers = {'mgt': write_mgt_file, 'hru': write_hru_file, 'gw': write_gw_file, 'sdr': write_sdr_file,
+                    'sep': write_sep_file, 'sol': write_sol_file}
+sub_file_writers = {'pnd': write_pnd_file, 'rte': write_rte_file}
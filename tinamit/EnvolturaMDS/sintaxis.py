@@ -229,6 +229,10 @@ class Ecuación(object):
         except BaseException as e:
             raise ValueError('Error en la ecuación "{}". Detalles: {}'.format(ec, e))
 
+        # Las funciones Python ya generadas, por lista de parámetros
+        símismo._caché_python = {}
+        símismo._caché_grad = {}
+
     def variables(símismo):
 
         def _obt_vars(á):
@@ -265,8 +269,144 @@ class Ecuación(object):
         return _obt_vars(símismo.árbol)
 
     def gen_func_python(símismo, paráms):
+        """
+        Genera una función Python ``f(p, vr)`` para la ecuación, donde ``p`` son los valores de los parámetros y
+        ``vr`` un diccionario de los valores de los otros variables, que pueden ser matrices NumPy. La función se
+        genera una sola vez para cada lista de parámetros.
+
+        :param paráms: Los nombres de los parámetros, en el orden de ``p``.
+        :type paráms: list[str]
+        :return: La función.
+        :rtype: callable
+        """
+
+        llave = tuple(paráms)
+        if llave not in símismo._caché_python:
+            símismo._caché_python[llave] = símismo._gen_func_python(list(paráms))
+
+        return símismo._caché_python[llave]
+
+    def gen_func_grad(símismo, paráms):
+        """
+        Genera una función Python ``g(p, vr)`` que devuelve las derivadas de la ecuación en cuanto a cada parámetro,
+        a base de las derivadas simbólicas de :meth:`derivar`.
+
+        :param paráms: Los nombres de los parámetros, en el orden de ``p``.
+        :type paráms: list[str]
+        :return: La función, que devuelve una lista con la derivada para cada parámetro.
+        :rtype: callable
+        """
+
+        llave = tuple(paráms)
+        if llave not in símismo._caché_grad:
+            derivadas = [símismo._gen_func_python(list(paráms), árbol=símismo.derivar(p)) for p in paráms]
+            símismo._caché_grad[llave] = lambda p, vr: [d(p=p, vr=vr) for d in derivadas]
+
+        return símismo._caché_grad[llave]
+
+    def derivar(símismo, parám):
+        """
+        Deriva la ecuación de manera simbólica.
+
+        :param parám: El variable en cuanto al cual derivar.
+        :type parám: str
+        :return: El árbol de la derivada, en el mismo formato que :attr:`árbol`.
+        :rtype: dict | float
+        """
+
+        def _fun(f, *args):
+            if símismo.dialecto != 'tinamït':
+                f = conv_fun(f, 'tinamït', _dialectos_funs[símismo.dialecto])
+            return {'func': [f, list(args)]}
+
+        def _der(á):
+            if isinstance(á, int) or isinstance(á, float):
+                return 0.
+
+            elif isinstance(á, dict):
+                for ll, v in á.items():
+                    if ll == 'var':
+                        return 1. if v == parám else 0.
+
+                    elif ll == 'neg':
+                        return _neg(_der(v))
+
+                    elif ll == 'func':
+                        f, args = v[0], v[1]
+
+                        if f in ['+', '-', '*', '/', '^']:
+                            u, w = args
+                            du, dw = _der(u), _der(w)
+                            if f == '+':
+                                return _suma(du, dw)
+                            elif f == '-':
+                                return _resta(du, dw)
+                            elif f == '*':
+                                return _suma(_mult(du, w), _mult(u, dw))
+                            elif f == '/':
+                                return _div(_resta(_mult(du, w), _mult(u, dw)), _pod(w, 2.))
+                            else:
+                                if _es_cero(dw):
+                                    return _mult(_mult(w, _pod(u, _resta(w, 1.))), du)
+                                return _mult(á, _suma(_mult(dw, _fun('ln', u)), _div(_mult(w, du), u)))
+
+                        nmb = f if símismo.dialecto == 'tinamït' else dic_funs_inv[_dialectos_funs[símismo.dialecto]][f]
+                        dus = [_der(x) for x in args]
+                        if all(_es_cero(x) for x in dus):
+                            return 0.
+
+                        u, du = args[0], dus[0]
+                        if nmb == 'exp':
+                            return _mult(á, du)
+                        elif nmb == 'ln':
+                            return _div(du, u)
+                        elif nmb == 'log':
+                            return _div(du, _mult(u, mat.log(10)))
+                        elif nmb == 'rcd':
+                            return _div(du, _mult(2., á))
+                        elif nmb == 'abs':
+                            return _mult(_fun('signo', u), du)
+                        elif nmb == 'ent':
+                            return 0.
+                        elif nmb == 'sin':
+                            return _mult(_fun('cos', u), du)
+                        elif nmb == 'cos':
+                            return _neg(_mult(_fun('sin', u), du))
+                        elif nmb == 'tan':
+                            return _div(du, _pod(_fun('cos', u), 2.))
+                        elif nmb == 'sinh':
+                            return _mult(_fun('cosh', u), du)
+                        elif nmb == 'cosh':
+                            return _mult(_fun('sinh', u), du)
+                        elif nmb == 'tanh':
+                            return _mult(_resta(1., _pod(á, 2.)), du)
+                        elif nmb in ['asin', 'acos']:
+                            d = _div(du, _fun('rcd', _resta(1., _pod(u, 2.))))
+                            return d if nmb == 'asin' else _neg(d)
+                        elif nmb == 'atan':
+                            return _div(du, _suma(1., _pod(u, 2.)))
+                        elif nmb in ['mín', 'máx']:
+                            # mín(u, w) = (u + w - |u - w|) / 2 ; máx(u, w) = (u + w + |u - w|) / 2
+                            w, dw = args[1], dus[1]
+                            d_abs = _mult(_fun('signo', _resta(u, w)), _resta(du, dw))
+                            d_abs = _neg(d_abs) if nmb == 'mín' else d_abs
+                            return _mult(0.5, _suma(_suma(du, dw), d_abs))
+                        else:
+                            raise ValueError(_('No se puede derivar la función "{}".').format(f))
+
+                    else:
+                        raise TypeError('')
+
+            else:
+                raise TypeError('{}'.format(type(á)))
+
+        return _der(símismo.árbol)
+
+    def _gen_func_python(símismo, paráms, árbol=None):
 
         dialecto = símismo.dialecto
+        if árbol is None:
+            árbol = símismo.árbol
 
         def _a_python(á, l_prms=paráms):
 
@@ -297,10 +437,10 @@ class Ecuación(object):
                             comp_2 = _a_python(v[1][1], l_prms=l_prms)
                             return lambda p, vr: comp_1(p=p, vr=vr) ** comp_2(p=p, vr=vr)
                         else:
-                            fun = conv_fun(v[0], dialecto, 'python')
-                            comp = _a_python(v[1][1], l_prms=l_prms)
+                            fun = conv_fun(v[0], dialecto, 'np')
+                            comps = _a_python(v[1], l_prms=l_prms)
 
-                            return lambda p, vr: fun(*comp(p=p, vr=vr))
+                            return lambda p, vr: fun(*[c(p=p, vr=vr) for c in comps])
 
                     elif ll == 'var':
                         try:
@@ -313,7 +453,7 @@ class Ecuación(object):
                             # Si el variable no es un parámetro calibrable, debe ser un valor observado
                             return lambda p, vr: vr[v]
                     elif ll == 'neg':
-                        comp = _a_python(v[1][1], l_prms=l_prms)
+                        comp = _a_python(v, l_prms=l_prms)
                         return lambda p, vr: -comp(p=p, vr=vr)
                     else:
                         raise TypeError('')
@@ -325,101 +465,175 @@ class Ecuación(object):
             else:
                 raise TypeError('{}'.format(type(á)))
 
-        return _a_python(símismo.árbol)
+        return _a_python(árbol)
 
     def gen_mod_bayes(símismo, paráms, líms_paráms, obs_x, obs_y, aprioris=None, binario=False):
 
         if pm is None:
-            return ImportError(_('Hay que instalar PyMC3 para poder utilizar modelos bayesianos.'))
-
-        dialecto = símismo.dialecto
-
-        def _a_bayes(á, d_pm=None):
-            if d_pm is None:
-                d_pm = {}
-
-            if isinstance(á, dict):
-
-                for ll, v in á.items():
-
-                    if ll == 'func':
-
-                        if v[0] == '+':
-                            return _a_bayes(v[1][0], d_pm=d_pm) + _a_bayes(v[1][1], d_pm=d_pm)
-                        elif v[0] == '/':
-                            return _a_bayes(v[1][0], d_pm=d_pm) / _a_bayes(v[1][1], d_pm=d_pm)
-                        elif v[0] == '-':
-                            return _a_bayes(v[1][0], d_pm=d_pm) - _a_bayes(v[1][1], d_pm=d_pm)
-                        elif v[0] == '*':
-                            return _a_bayes(v[1][0], d_pm=d_pm) * _a_bayes(v[1][1], d_pm=d_pm)
-                        elif v[0] == '^':
-                            return _a_bayes(v[1][0], d_pm=d_pm) ** _a_bayes(v[1][1], d_pm=d_pm)
-                        else:
-                            return conv_fun(v[0], 'tinamït', 'pm')(*_a_bayes(v[1], d_pm=d_pm))  # para hacer: arreglar dialecto
+            raise ImportError(_('Hay que instalar PyMC3 para poder utilizar modelos bayesianos.'))
 
-                    elif ll == 'var':
-                        try:
-                            if v in d_pm:
-                                return d_pm[v]
-                            else:
-                                í_var = paráms.index(v)
-                                líms = líms_paráms[í_var]
-
-                                if aprioris is None:
-                                    if líms[0] is None:
-                                        if líms[1] is None:
-                                            dist_pm = pm.Flat(v, testval=0)
-                                        else:
-                                            dist_pm = líms[1] - pm.HalfFlat(v, testval=1)
-                                    else:
-                                        if líms[1] is None:
-                                            dist_pm = líms[0] + pm.HalfFlat(v, testval=1)
-                                        else:
-                                            dist_pm = pm.Uniform(name=v, lower=líms[0], upper=líms[1])
-                                else:
-                                    dist, prms = aprioris[í_var]
-                                    if (líms[0] is not None or líms[1] is not None) and dist != pm.Uniform:
-                                        acotada = pm.Bound(dist, lower=líms[0], upper=líms[1])
-                                        dist_pm = acotada(v, **prms)
-                                    else:
-                                        if dist == pm.Uniform:
-                                            prms['lower'] = max(prms['lower'], líms[0])
-                                            prms['upper'] = min(prms['upper'], líms[1])
-                                        dist_pm = dist(v, **prms)
-
-                                d_pm[v] = dist_pm
-                                return dist_pm
-
-                        except ValueError:
+        def _gen_prm(v):
+            í_var = paráms.index(v)  # Error de valor si el variable no es parámetro
+            líms = líms_paráms[í_var]
 
-                            # Si el variable no es un parámetro calibrable, debe ser un valor observado
-                            return obs_x[v]
-                    elif ll == 'neg':
-                        return -_a_bayes(v, d_pm=d_pm)
+            if aprioris is None:
+                if líms[0] is None:
+                    if líms[1] is None:
+                        dist_pm = pm.Flat(v, testval=0)
                     else:
-                        raise TypeError('')
-
-            elif isinstance(á, list):
-                return [_a_bayes(x, d_pm=d_pm) for x in á]
-            elif isinstance(á, int) or isinstance(á, float):
-                return á
+                        dist_pm = líms[1] - pm.HalfFlat(v, testval=1)
+                else:
+                    if líms[1] is None:
+                        dist_pm = líms[0] + pm.HalfFlat(v, testval=1)
+                    else:
+                        dist_pm = pm.Uniform(name=v, lower=líms[0], upper=líms[1])
             else:
-                raise TypeError('')
+                dist, prms = aprioris[í_var]
+                if (líms[0] is not None or líms[1] is not None) and dist != pm.Uniform:
+                    acotada = pm.Bound(dist, lower=líms[0], upper=líms[1])
+                    dist_pm = acotada(v, **prms)
+                else:
+                    if dist == pm.Uniform:
+                        prms['lower'] = max(prms['lower'], líms[0])
+                        prms['upper'] = min(prms['upper'], líms[1])
+                    dist_pm = dist(v, **prms)
+
+            return dist_pm
 
         modelo = pm.Model()
         with modelo:
-            mu = _a_bayes(símismo.árbol)
-            sigma = pm.HalfNormal(name='sigma', sd=max(obs_y)/3)
+            mu = símismo._a_bayes(símismo.árbol, d_pm={}, obs_x=obs_x, gen_prm=_gen_prm)
+            _gen_verosimilitud(mu, obs_y, binario=binario)
 
-            if binario:
-                x = pm.Normal(name='logit_prob', mu=mu, sd=sigma, shape=obs_y.shape, testval=np.full(obs_y.shape, 0))
-                pm.Bernoulli(name='Y_obs', p=pm.invlogit(-x), observed=obs_y)  #
+        return modelo
 
-            else:
-                pm.Normal(name='Y_obs', mu=mu, sd=sigma, observed=obs_y)
+    def gen_mod_bayes_jer(símismo, paráms, líms_paráms, obs_x, obs_y, í_obs, padres, binario=False):
+        """
+        Genera un modelo bayesiano jerárquico para calibrar la ecuación en todas las regiones a la vez. Cada
+        parámetro tiene un valor por nodo de la jerarquía; el valor de cada nodo se distribuye alrededor del valor
+        de su nodo pariente (en un espacio transformado según los límites del parámetro), y el valor de cada región
+        se usa para sus propias observaciones.
+
+        :param paráms: Los parámetros que calibrar.
+        :type paráms: list[str]
+        :param líms_paráms: Los límites de los parámetros.
+        :type líms_paráms: list[tuple]
+        :param obs_x: Las observaciones de los variables independientes, para todas las regiones.
+        :type obs_x: dict[str, np.ndarray]
+        :param obs_y: Las observaciones del variable dependiente, para todas las regiones.
+        :type obs_y: np.ndarray
+        :param í_obs: El índice de la región de cada observación.
+        :type í_obs: np.ndarray
+        :param padres: Para cada nivel de la jerarquía debajo del nivel global, el índice del pariente de cada
+          nodo en el nivel anterior. El último nivel es el de las regiones.
+        :type padres: list[np.ndarray]
+        :param binario: Si el variable dependiente es binario.
+        :type binario: bool
+        :return: El modelo.
+        :rtype: pm.Model
+        """
+
+        if pm is None:
+            raise ImportError(_('Hay que instalar PyMC3 para poder utilizar modelos bayesianos.'))
+
+        modelo = pm.Model()
+        with modelo:
+            d_pm = {}
+            for p, líms in zip(paráms, líms_paráms):
+                acotado = líms[0] is not None and líms[1] is not None
+                if acotado:
+                    z = pm.Normal(name='{}_global'.format(p), mu=0, sd=1.5, testval=0)
+                else:
+                    z = pm.Flat(name='{}_global'.format(p), testval=0)
+
+                # Cada nivel se centra en los valores de su nivel pariente (parametrización no centrada)
+                z = z * np.ones(1)
+                for n, í_padres in enumerate(padres):
+                    sigma = pm.HalfNormal(name='sigma_{}_{}'.format(p, n), sd=1)
+                    desv = pm.Normal(name='desv_{}_{}'.format(p, n), mu=0, sd=1, shape=len(í_padres))
+                    z = z[í_padres] + sigma * desv
+
+                if acotado:
+                    val = líms[0] + (líms[1] - líms[0]) * pm.math.invlogit(z)
+                elif líms[0] is not None:
+                    val = líms[0] + pm.math.exp(z)
+                elif líms[1] is not None:
+                    val = líms[1] - pm.math.exp(z)
+                else:
+                    val = z
+
+                d_pm[p] = pm.Deterministic(p, val)[í_obs]
+
+            mu = símismo._a_bayes(símismo.árbol, d_pm=d_pm, obs_x=obs_x)
+            _gen_verosimilitud(mu, obs_y, binario=binario)
 
         return modelo
 
+    def _a_bayes(símismo, á, d_pm, obs_x, gen_prm=None):
+        """
+        Convierte el árbol de la ecuación en una expresión de PyMC3.
+
+        :param á: El árbol.
+        :type á: dict | list | int | float
+        :param d_pm: Las distribuciones de los parámetros ya generadas.
+        :type d_pm: dict
+        :param obs_x: Las observaciones de los variables que no son parámetros.
+        :type obs_x: dict[str, np.ndarray]
+        :param gen_prm: Función que genera la distribución de un parámetro que todavía no está en ``d_pm``, o que
+          lanza un error de valor si el variable no es parámetro.
+        :type gen_prm: callable
+        :return: La expresión.
+        """
+
+        if isinstance(á, dict):
+
+            for ll, v in á.items():
+
+                if ll == 'func':
+
+                    if v[0] == '+':
+                        return símismo._a_bayes(v[1][0], d_pm, obs_x, gen_prm) + \
+                               símismo._a_bayes(v[1][1], d_pm, obs_x, gen_prm)
+                    elif v[0] == '/':
+                        return símismo._a_bayes(v[1][0], d_pm, obs_x, gen_prm) / \
+                               símismo._a_bayes(v[1][1], d_pm, obs_x, gen_prm)
+                    elif v[0] == '-':
+                        return símismo._a_bayes(v[1][0], d_pm, obs_x, gen_prm) - \
+                               símismo._a_bayes(v[1][1], d_pm, obs_x, gen_prm)
+                    elif v[0] == '*':
+                        return símismo._a_bayes(v[1][0], d_pm, obs_x, gen_prm) * \
+                               símismo._a_bayes(v[1][1], d_pm, obs_x, gen_prm)
+                    elif v[0] == '^':
+                        return símismo._a_bayes(v[1][0], d_pm, obs_x, gen_prm) ** \
+                               símismo._a_bayes(v[1][1], d_pm, obs_x, gen_prm)
+                    else:
+                        # para hacer: arreglar dialecto
+                        return conv_fun(v[0], 'tinamït', 'pm')(*símismo._a_bayes(v[1], d_pm, obs_x, gen_prm))
+
+                elif ll == 'var':
+                    if v in d_pm:
+                        return d_pm[v]
+                    try:
+                        if gen_prm is None:
+                            raise ValueError
+                        d_pm[v] = gen_prm(v)
+                        return d_pm[v]
+
+                    except ValueError:
+                        # Si el variable no es un parámetro calibrable, debe ser un valor observado
+                        return obs_x[v]
+                elif ll == 'neg':
+                    return -símismo._a_bayes(v, d_pm, obs_x, gen_prm)
+                else:
+                    raise TypeError('')
+
+        elif isinstance(á, list):
+            return [símismo._a_bayes(x, d_pm, obs_x, gen_prm) for x in á]
+        elif isinstance(á, int) or isinstance(á, float):
+            return á
+        else:
+            raise TypeError('')
+
     def gen_texto(símismo, paráms=None):
 
         dialecto = símismo.dialecto
@@ -473,25 +687,113 @@ class Ecuación(object):
     def __str__(símismo):
         return símismo.gen_texto()[0]
 
+    def __getstate__(símismo):
+        # Las funciones generadas no se pueden guardar; se vuelven a generar en cada proceso.
+        estado = símismo.__dict__.copy()
+        estado['_caché_python'] = {}
+        estado['_caché_grad'] = {}
+        return estado
+
+
+def _es_cero(á):
+    return (isinstance(á, int) or isinstance(á, float)) and á == 0
+
+
+def _es_uno(á):
+    return (isinstance(á, int) or isinstance(á, float)) and á == 1
+
+
+def _es_núm(á):
+    return isinstance(á, int) or isinstance(á, float)
+
+
+# Operaciones sobre árboles de ecuaciones, simplificando los casos triviales de las derivadas
+
+def _suma(a, b):
+    if _es_cero(a):
+        return b
+    if _es_cero(b):
+        return a
+    if _es_núm(a) and _es_núm(b):
+        return a + b
+    return {'func': ['+', [a, b]]}
+
+
+def _resta(a, b):
+    if _es_cero(b):
+        return a
+    if _es_cero(a):
+        return _neg(b)
+    if _es_núm(a) and _es_núm(b):
+        return a - b
+    return {'func': ['-', [a, b]]}
+
+
+def _mult(a, b):
+    if _es_cero(a) or _es_cero(b):
+        return 0.
+    if _es_uno(a):
+        return b
+    if _es_uno(b):
+        return a
+    if _es_núm(a) and _es_núm(b):
+        return a * b
+    return {'func': ['*', [a, b]]}
+
+
+def _div(a, b):
+    if _es_cero(a):
+        return 0.
+    if _es_uno(b):
+        return a
+    return {'func': ['/', [a, b]]}
+
+
+def _pod(a, b):
+    if _es_cero(b):
+        return 1.
+    if _es_uno(b):
+        return a
+    return {'func': ['^', [a, b]]}
+
+
+def _neg(a):
+    if _es_núm(a):
+        return -a
+    return {'neg': a}
+
+
+def _gen_verosimilitud(mu, obs_y, binario):
+    sigma = pm.HalfNormal(name='sigma', sd=max(obs_y)/3)
+
+    if binario:
+        x = pm.Normal(name='logit_prob', mu=mu, sd=sigma, shape=obs_y.shape, testval=np.full(obs_y.shape, 0))
+        pm.Bernoulli(name='Y_obs', p=pm.invlogit(-x), observed=obs_y)  #
+
+    else:
+        pm.Normal(name='Y_obs', mu=mu, sd=sigma, observed=obs_y)
+
 
 dic_funs = {
-    'mín': {'vensim': 'MIN', 'pm': pm.math.minimum if pm is not None else None, 'python': min},
-    'máx': {'vensim': 'MAX', 'pm': pm.math.maximum if pm is not None else None, 'python': max},
-    'abs': {'vensim': 'ABS', 'pm': pm.math.abs_ if pm is not None else None, 'python': abs},
-    'exp': {'vensim': 'EXP', 'pm': pm.math.exp if pm is not None else None, 'python': mat.exp},
-    'ent': {'vensim': 'INTEGER', 'pm': pm.math.floor if pm is not None else None, 'python': int},
-    'rcd': {'vensim': 'SQRT', 'pm': pm.math.sqrt if pm is not None else None, 'python': mat.sqrt},
-    'ln': {'vensim': 'LN', 'pm': pm.math.log if pm is not None else None, 'python': mat.log},
-    'log': {'vensim': 'LOG', 'pm': None if pm is None else lambda x: pm.math.log(x) / mat.log(10), 'python': mat.log10},
-    'sin': {'vensim': 'SIN', 'pm': pm.math.sin if pm is not None else None, 'python': mat.sin},
-    'cos': {'vensim': 'COS', 'pm': pm.math.cos if pm is not None else None, 'python': mat.cos},
-    'tan': {'vensim': 'TAN', 'pm': pm.math.tan if pm is not None else None, 'python': mat.tan},
-    'sinh': {'vensim': 'SINH', 'pm': pm.math.sinh if pm is not None else None, 'python': mat.sinh},
-    'cosh': {'vensim': 'COSH', 'pm': pm.math.cosh if pm is not None else None, 'python': mat.cosh},
-    'tanh': {'vensim': 'TANH', 'pm': pm.math.tanh if pm is not None else None, 'python': mat.tanh},
-    'asin': {'vensim': 'ARCSIN', 'python': mat.asin},
-    'acos': {'vensim': 'ARCCOS', 'python': mat.acos},
-    'atan': {'vensim': 'ARCTAN', 'python': mat.atan},
+    'mín': {'vensim': 'MIN', 'pm': pm.math.minimum if pm is not None else None, 'python': min, 'np': np.minimum},
+    'máx': {'vensim': 'MAX', 'pm': pm.math.maximum if pm is not None else None, 'python': max, 'np': np.maximum},
+    'abs': {'vensim': 'ABS', 'pm': pm.math.abs_ if pm is not None else None, 'python': abs, 'np': np.abs},
+    'exp': {'vensim': 'EXP', 'pm': pm.math.exp if pm is not None else None, 'python': mat.exp, 'np': np.exp},
+    'ent': {'vensim': 'INTEGER', 'pm': pm.math.floor if pm is not None else None, 'python': int, 'np': np.trunc},
+    'rcd': {'vensim': 'SQRT', 'pm': pm.math.sqrt if pm is not None else None, 'python': mat.sqrt, 'np': np.sqrt},
+    'ln': {'vensim': 'LN', 'pm': pm.math.log if pm is not None else None, 'python': mat.log, 'np': np.log},
+    'log': {'vensim': 'LOG', 'pm': None if pm is None else lambda x: pm.math.log(x) / mat.log(10), 'python': mat.log10,
+            'np': np.log10},
+    'sin': {'vensim': 'SIN', 'pm': pm.math.sin if pm is not None else None, 'python': mat.sin, 'np': np.sin},
+    'cos': {'vensim': 'COS', 'pm': pm.math.cos if pm is not None else None, 'python': mat.cos, 'np': np.cos},
+    'tan': {'vensim': 'TAN', 'pm': pm.math.tan if pm is not None else None, 'python': mat.tan, 'np': np.tan},
+    'sinh': {'vensim': 'SINH', 'pm': pm.math.sinh if pm is not None else None, 'python': mat.sinh, 'np': np.sinh},
+    'cosh': {'vensim': 'COSH', 'pm': pm.math.cosh if pm is not None else None, 'python': mat.cosh, 'np': np.cosh},
+    'tanh': {'vensim': 'TANH', 'pm': pm.math.tanh if pm is not None else None, 'python': mat.tanh, 'np': np.tanh},
+    'asin': {'vensim': 'ARCSIN', 'python': mat.asin, 'np': np.arcsin},
+    'acos': {'vensim': 'ARCCOS', 'python': mat.acos, 'np': np.arccos},
+    'atan': {'vensim': 'ARCTAN', 'python': mat.atan, 'np': np.arctan},
+    'signo': {'vensim': 'SIGN', 'pm': pm.math.sgn if pm is not None else None, 'python': np.sign, 'np': np.sign},
 
     '+': {'vensim': '+'},
     '-': {'vensim': '-'},
@@ -508,7 +810,12 @@ for f, d_fun in dic_funs.items():
         dic_funs_inv[tipo][d] = f
 
 
+# Los nombres de funciones de cada dialecto de ecuaciones
+_dialectos_funs = {'modelovensimmdl': 'vensim', 'modelovensim': 'vensim'}
+
+
 def conv_fun(fun, dialecto_0, dialecto_1):
+    dialecto_0 = _dialectos_funs.get(dialecto_0, dialecto_0)
     if dialecto_0 == 'tinamït':
         return dic_funs[fun][dialecto_1]
     else:
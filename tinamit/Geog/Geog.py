@@ -1,13 +1,17 @@
 import csv
 import datetime as ft
 import os
+import subprocess
+from multiprocessing import Pool as Reserva
 
 import matplotlib.colors as colors
 import numpy as np
 import pandas as pd
 import shapefile as sf
-from matplotlib import cm
+from PIL import Image as Imagen
+from matplotlib import cm, rcParams
 from matplotlib.backends.backend_agg import FigureCanvasAgg as TelaFigura
+from matplotlib.collections import LineCollection, PolyCollection
 from matplotlib.figure import Figure as Figura
 
 from taqdir.ذرائع.مشاہدات import دن_مشا, مہنہ_مشا, سال_مشا
@@ -263,11 +267,18 @@ class Geografía(object):
         símismo.grupos = []
         símismo.orden_jer = []
 
+        # Índices para búsquedas rápidas en la jerarquía de regiones
+        símismo.códs = []
+        símismo.padres = np.array([], dtype=int)
+        símismo._í_cód = {}
+        símismo._índ_escala = {}
+        símismo._índ_en = {}
+
     def agregar_forma(símismo, archivo, nombre=None, tipo=None, alpha=None, color=None, llenar=None):
         if nombre is None:
             nombre = os.path.splitext(os.path.split(archivo)[1])[0]
 
-        símismo.objetos[nombre] = {'obj': sf.Reader(archivo),
+        símismo.objetos[nombre] = {'obj': AlmacénFormas(archivo),
                                    'color': color,
                                    'llenar': llenar,
                                    'alpha': alpha,
@@ -289,27 +300,17 @@ class Geografía(object):
         if escala_geog is None:
             escala_geog = 'Principal'
 
-        af = sf.Reader(archivo)
-
-        attrs = af.fields[1:]
-        nombres_attr = [field[0] for field in attrs]
+        af = AlmacénFormas(archivo)
 
         if col_orden is not None:
-            try:
-                orden = np.array([x.record[nombres_attr.index(col_orden)] for x in af.shapeRecords()])
-            except ValueError:
-                raise ValueError(_('La columna "{}" no existe en la base de datos.').format(col_orden))
-
+            orden = af.obt_col(col_orden)
             orden -= np.min(orden)
 
         else:
-            orden = range(len(af.records()))
+            orden = range(len(af.registros()))
 
         if col_id is not None:
-            try:
-                ids = np.array([x.record[nombres_attr.index(col_orden)] for x in af.shapeRecords()])
-            except ValueError:
-                raise ValueError(_('La columna "{}" no existe en la base de datos.').format(col_orden))
+            ids = af.obt_col(col_id)
         else:
             ids = None
 
@@ -334,6 +335,7 @@ class Geografía(object):
 
         símismo.árbol_geog.clear()
         símismo.árbol_geog_inv.clear()
+        símismo.cód_a_lugar.clear()
         símismo.grupos.clear()
 
         if grupos is None:
@@ -394,13 +396,80 @@ class Geografía(object):
                 nombre = f[cols.index(escala)]
                 símismo.cód_a_lugar[cód] = {'escala': escala, 'nombre': nombre}
 
+        símismo._indexar()
+
+    def _indexar(símismo):
+        """
+        Construye los índices de la jerarquía de regiones: los códigos de cada escala, los códigos de cada escala que
+        se encuentran en una región o en un grupo dado, y el padre de cada región en la jerarquía.
+        """
+
+        símismo.códs = list(símismo.árbol_geog_inv)
+        símismo._í_cód = {c: í for í, c in enumerate(símismo.códs)}
+        símismo._índ_escala = {}
+        símismo._índ_en = {}
+
+        for cód, d in símismo.árbol_geog_inv.items():
+            escala = símismo.cód_a_lugar[cód]['escala']
+            símismo._índ_escala.setdefault(escala, []).append(cód)
+
+            # Las llaves son (escala o grupo, nombre) y los valores, los códigos de cada escala allí adentro.
+            for col, nombre in d.items():
+                símismo._índ_en.setdefault((col, str(nombre)), {}).setdefault(escala, []).append(cód)
+
+        padres = np.full(len(símismo.códs), -1, dtype=int)
+        for í, cód in enumerate(símismo.códs):
+            padre = símismo._buscar_padre(cód)
+            if padre is not None:
+                padres[í] = símismo._í_cód[padre]
+        símismo.padres = padres
+
+    def _buscar_padre(símismo, cód):
+        """
+        Busca la región inmediatamente superior a una región en la jerarquía.
+
+        :param cód: El código de la región.
+        :type cód: str
+        :return: El código de la región padre, o ``None`` si no tiene.
+        :rtype: str | None
+        """
+
+        d = símismo.árbol_geog_inv[cód]
+        n_escala = símismo.orden_jer.index(símismo.cód_a_lugar[cód]['escala'])
+
+        for escala_sup in reversed(símismo.orden_jer[:n_escala]):
+            nombre_sup = d[escala_sup]
+            if nombre_sup == '':
+                continue
+
+            candidatos = símismo._índ_en.get((escala_sup, nombre_sup), {}).get(escala_sup, [])
+            for c in candidatos:
+                d_c = símismo.árbol_geog_inv[c]
+                if all(d_c[e] == d[e] for e in símismo.orden_jer[:símismo.orden_jer.index(escala_sup)]):
+                    return c
+
+        return None
+
+    def obt_padre(símismo, cód):
+        """
+        Devuelve la región inmediatamente superior a una región en la jerarquía.
+
+        :param cód: El código de la región.
+        :type cód: str
+        :return: El código de la región padre, o ``None`` si no tiene.
+        :rtype: str | None
+        """
+
+        í_padre = símismo.padres[símismo._í_cód[cód]]
+        return símismo.códs[í_padre] if í_padre >= 0 else None
+
     def obt_lugares_en(símismo, escala=None, en=None, por=None):
         """"""
 
         if escala is None:
             escala = símismo.orden_jer[-1]
         if en is None:
-            regiones = [x for x, d in símismo.árbol_geog_inv.items() if símismo.cód_a_lugar[x]['escala'] == escala]
+            regiones = list(símismo._índ_escala.get(escala, []))
         else:
             if isinstance(en, dict):
                 # Grupos
@@ -417,9 +486,10 @@ class Geografía(object):
 
                 nombres_en = [símismo.cód_a_lugar[x]['nombre'] for x in en]
 
-            nombres_en = [str(x) for x in nombres_en]
-            regiones = [x for x, d in símismo.árbol_geog_inv.items() if d[escala_en] in nombres_en and
-                        símismo.cód_a_lugar[x]['escala'] == escala]
+            regiones = [
+                x for n in dict.fromkeys(str(x) for x in nombres_en)
+                for x in símismo._índ_en.get((escala_en, n), {}).get(escala, [])
+            ]
 
         if por is None:
             return regiones
@@ -453,7 +523,10 @@ class Geografía(object):
         if tipo_grupo not in símismo.grupos:
             raise ValueError('')
 
-        return [x for x, d in símismo.árbol_geog_inv.items() if str(d[tipo_grupo]) in grupos]
+        return [
+            x for g in dict.fromkeys(grupos)
+            for l_escala in símismo._índ_en.get((tipo_grupo, g), {}).values() for x in l_escala
+        ]
 
     def dibujar(símismo, archivo, valores=None, título=None, unidades=None, colores=None, escala_num=None):
         """
@@ -474,10 +547,114 @@ class Geografía(object):
 
         """
 
+        if valores is None:
+            fig = símismo._prep_dibujo(título=título)[0]
+        else:
+            if escala_num is None:
+                escala_num = (np.min(valores), np.max(valores))
+            fig, colección, a_colores = símismo._prep_dibujo(
+                n_regiones=valores.shape[0], título=título, unidades=unidades, colores=colores, escala_num=escala_num
+            )
+            colección.set_color(a_colores(valores))
+
+        fig.savefig(archivo, dpi=500)
+
+    def dibujar_serie(símismo, archivos, valores, título=None, unidades=None, colores=None, escala_num=None,
+                      formato='png', dpi=None, paralelo=False, cuadros_seg=5):
+        """
+        Dibuja una serie de mapas (por ejemplo, uno por paso de una simulación) con la misma figura. Las formas
+        se dibujan una sola vez; para cada mapa únicamente se actualizan los colores de las regiones.
+
+        Los mapas se pueden guardar como imágenes separadas (``'png'``), como una animación (``'gif'`` o ``'mp4'``;
+        éste último necesita `ffmpeg <https://ffmpeg.org>`_) o como una sola imagen con todos los mapas en una
+        cuadrícula (``'sprite'``). Con ``paralelo``, cada proceso prepara su propia figura una vez y dibuja una parte
+        de los mapas; los cuadros de animaciones se guardan en orden a medida que llegan.
+
+        :param archivos: Dónde hay que guardar cada mapa si ``formato`` es ``'png'``; si no, el archivo único donde
+          hay que guardar la serie entera.
+        :type archivos: list[str] | str
+        :param valores: Los valores para dibujar, con regiones en el primer eje y mapas en el último.
+        :type valores: np.ndarray
+        :param título: El título de los mapas.
+        :type título: str
+        :param unidades: Las unidades de los valores.
+        :type unidades: str
+        :param colores: Los colores para dibujar.
+        :type colores: str | list | tuple | int
+        :param escala_num: La escala numérica para los colores. Si ``None``, será el rango de todos los valores.
+        :type escala_num: tuple
+        :param formato: El formato de la serie: ``'png'``, ``'gif'``, ``'mp4'`` o ``'sprite'``.
+        :type formato: str
+        :param dpi: La resolución de los mapas. Si ``None``, será 500 para ``'png'`` y 100 para los otros formatos.
+        :type dpi: int
+        :param paralelo: Si hay que dibujar los mapas en paralelo. Si es un número entero, será el número de
+          procesos.
+        :type paralelo: bool | int
+        :param cuadros_seg: El número de cuadros por segundo para animaciones.
+        :type cuadros_seg: int | float
+
+        """
+
+        formato = formato.lower()
+        if formato not in formatos_serie:
+            raise ValueError(_('Formato "{}" no reconocido. Debe ser uno de: {}').format(
+                formato, ', '.join(formatos_serie)))
+
+        n_mapas = valores.shape[-1]
+        if formato == 'png':
+            if len(archivos) != n_mapas:
+                raise ValueError(_('El número de archivos no corresponde con el número de mapas en los valores.'))
+            arch_cuadros = archivos
+        else:
+            if not isinstance(archivos, str):
+                raise ValueError(_('Para el formato "{}", hay que especificar un archivo único.').format(formato))
+            arch_cuadros = [None] * n_mapas
+
+        if dpi is None:
+            dpi = 500 if formato == 'png' else 100
+
+        if escala_num is None:
+            escala_num = (np.min(valores), np.max(valores))
+
+        args_prep = dict(
+            n_regiones=valores.shape[0], título=título, unidades=unidades, colores=colores, escala_num=escala_num
+        )
+        tareas = ((valores[..., i], arch_cuadros[i]) for i in range(n_mapas))
+
+        if paralelo:
+            n_procs = os.cpu_count() if paralelo is True else paralelo
+            with Reserva(n_procs, initializer=_inic_dibujante, initargs=(símismo, args_prep, dpi)) as r:
+                cuadros = r.imap(_dibujar_cuadro, tareas, chunksize=max(1, n_mapas // (4 * n_procs)))
+                _guardar_cuadros(cuadros, archivo=archivos, formato=formato, cuadros_seg=cuadros_seg)
+        else:
+            dibujante = _DibujanteMapas(geog=símismo, args_prep=args_prep, dpi=dpi)
+            cuadros = (dibujante(t) for t in tareas)
+            _guardar_cuadros(cuadros, archivo=archivos, formato=formato, cuadros_seg=cuadros_seg)
+
+    def _prep_dibujo(símismo, n_regiones=None, título=None, unidades=None, colores=None, escala_num=None):
+        """
+        Prepara la figura de un mapa, con las formas de las regiones y de los objetos geográficos ya dibujadas.
+
+        :param n_regiones: El número de regiones que se van a colorar. Si ``None``, no se dibujarán regiones.
+        :type n_regiones: int
+        :param título: El título del mapa.
+        :type título: str
+        :param unidades: Las unidades de los valores.
+        :type unidades: str
+        :param colores: Los colores para dibujar.
+        :type colores: str | list | tuple | int
+        :param escala_num: La escala numérica para los colores.
+        :type escala_num: tuple
+        :return: La figura, la colección de polígonos de las regiones y una función que convierte valores a los
+          colores de cada polígono.
+        :rtype: (Figura, PolyCollection, function)
+
+        """
+
         if colores is None:
             colores = ['#FF6666', '#FFCC66', '#00CC66']
         if colores == -1:
-            colores = ['#00CC66', '#FFCC66','#FF6666']
+            colores = ['#00CC66', '#FFCC66', '#FF6666']
 
         if isinstance(colores, str):
             colores = ['#FFFFFF', colores]
@@ -489,30 +666,27 @@ class Geografía(object):
         ejes = fig.add_subplot(111)
         ejes.set_aspect('equal')
 
-        if valores is not None:
+        colección = a_colores = None
+
+        if n_regiones is not None:
             d_regiones = None
             for escala, d_reg in símismo.regiones.items():
-                if len(d_reg['orden_regs']) == valores.shape[0]:
+                if len(d_reg['orden_regs']) == n_regiones:
                     d_regiones = d_reg
                     continue
 
             if d_regiones is None:
                 raise ValueError(_('El número de regiones en los datos no concuerdan con la geografía del lugar.'))
 
-            regiones = d_regiones['af']
+            vértices = símismo._obt_vértices(d_regiones)
             orden = d_regiones['orden_regs']
 
-            n_regiones = len(regiones.shapes())
-            if len(valores) != n_regiones:
+            if vértices[2] != n_regiones:
                 raise ValueError(_('El número de regiones no corresponde con el tamñao de los valores.'))
 
-            if escala_num is None:
-                escala_num = (np.min(valores), np.max(valores))
             if len(escala_num) != 2:
                 raise ValueError
 
-            vals_norm = (valores - escala_num[0]) / (escala_num[1] - escala_num[0])
-
             d_clrs = _gen_d_mapacolores(colores=colores)
 
             mapa_color = colors.LinearSegmentedColormap('mapa_color', d_clrs)
@@ -520,13 +694,18 @@ class Geografía(object):
             cpick = cm.ScalarMappable(norm=norm, cmap=mapa_color)
             cpick.set_array([])
 
-            v_cols = mapa_color(vals_norm)
-            _dibujar_shp(ejes=ejes, frm=regiones, orden=orden, colores=v_cols)
+            colección = _dibujar_shp(
+                ejes=ejes, vértices=vértices, orden=orden, colores=mapa_color(np.zeros(n_regiones))
+            )
+            í_colores = _í_colores(vértices=vértices, orden=orden)
+
+            def a_colores(vals):
+                return mapa_color(norm(vals))[í_colores]
 
             if unidades is not None:
-                fig.colorbar(cpick, label=unidades)
+                fig.colorbar(cpick, ax=ejes, label=unidades)
             else:
-                fig.colorbar(cpick)
+                fig.colorbar(cpick, ax=ejes)
 
         for nombre, d_obj in símismo.objetos.items():
 
@@ -540,28 +719,360 @@ class Geografía(object):
             llenar = d_obj['llenar']
             alpha = d_obj['alpha']
 
-            _dibujar_shp(ejes=ejes, frm=d_obj['obj'], colores=color, alpha=alpha, llenar=llenar)
+            _dibujar_shp(ejes=ejes, vértices=símismo._obt_vértices(d_obj), colores=color, alpha=alpha, llenar=llenar)
+
+        ejes.autoscale_view()
 
         if título is not None:
             ejes.set_title(título)
 
-        fig.savefig(archivo, dpi=500)
+        return fig, colección, a_colores
+
+    @staticmethod
+    def _obt_vértices(d_frm):
+        """
+        Devuelve los vértices de una forma.
+
+        :param d_frm: El diccionario de la forma (de :attr:`regiones` o de :attr:`objetos`).
+        :type d_frm: dict
+        :return: Los polígonos de la forma, el índice de la forma a la cual pertenece cada polígono y el número de
+          formas.
+        :rtype: (list[np.ndarray], np.ndarray, int)
+        """
+
+        almacén = d_frm['af'] if 'af' in d_frm else d_frm['obj']  # type: AlmacénFormas
+        return almacén.vértices()
 
     def __str__(símismo):
         return símismo.nombre
 
 
-def _dibujar_shp(ejes, frm, colores, orden=None, alpha=1.0, llenar=True):
+formatos_serie = ['png', 'gif', 'mp4', 'sprite']
+
+
+class _DibujanteMapas(object):
+    """
+    Guarda una figura ya preparada y dibuja mapas con ella, cambiando únicamente los colores de las regiones.
+    """
+
+    def __init__(símismo, geog, args_prep, dpi):
+        símismo.fig, símismo.colección, símismo.a_colores = geog._prep_dibujo(**args_prep)
+        símismo.fig.set_dpi(dpi)
+        símismo.dpi = dpi
+
+    def __call__(símismo, tarea):
+        """
+        Dibuja un mapa.
+
+        :param tarea: Los valores del mapa y el archivo donde guardarlo. Si el archivo es ``None``, se devuelve
+          la imagen en vez de guardarla.
+        :type tarea: (np.ndarray, str)
+        :return: La imagen RVAA del mapa, o ``None`` si se guardó en un archivo.
+        :rtype: np.ndarray | None
+        """
+
+        valores, archivo = tarea
+        símismo.colección.set_color(símismo.a_colores(valores))
+
+        if archivo is not None:
+            símismo.fig.savefig(archivo, dpi=símismo.dpi)
+        else:
+            símismo.fig.canvas.draw()
+            return np.array(símismo.fig.canvas.buffer_rgba())
+
+
+_dibujante = None  # type: _DibujanteMapas
+
+
+def _inic_dibujante(geog, args_prep, dpi):
+    # Cada proceso de dibujo prepara su propia figura una sola vez.
+    global _dibujante
+    _dibujante = _DibujanteMapas(geog=geog, args_prep=args_prep, dpi=dpi)
+
+
+def _dibujar_cuadro(tarea):
+    return _dibujante(tarea)
+
+
+def _guardar_cuadros(cuadros, archivo, formato, cuadros_seg):
+    """
+    Guarda los cuadros de una serie de mapas a medida que se dibujan.
+
+    :param cuadros: Los cuadros, en orden. Para ``'png'`` ya se guardaron y son ``None``.
+    :type cuadros: collections.Iterable[np.ndarray | None]
+    :param archivo: El archivo donde guardar la serie.
+    :type archivo: str
+    :param formato: El formato de la serie.
+    :type formato: str
+    :param cuadros_seg: El número de cuadros por segundo para animaciones.
+    :type cuadros_seg: int | float
+    """
+
+    if formato == 'png':
+        for _c in cuadros:
+            pass
+
+    elif formato == 'gif':
+        imágenes = (Imagen.fromarray(c) for c in cuadros)
+        primera = next(imágenes)
+        primera.save(archivo, save_all=True, append_images=imágenes, duration=1000 / cuadros_seg, loop=0)
+
+    elif formato == 'mp4':
+        cuadros = iter(cuadros)
+        primero = next(cuadros)
+        alto, ancho = primero.shape[:2]
+        comanda = [
+            rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', '{}x{}'.format(ancho, alto), '-r', str(cuadros_seg),
+            '-i', '-', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', archivo
+        ]
+        try:
+            proc = subprocess.Popen(comanda, stdin=subprocess.PIPE)
+        except FileNotFoundError:
+            raise OSError(_('Se necesita ffmpeg para guardar animaciones mp4. Instálalo o especifica su ubicación '
+                            'en "matplotlib.rcParams[\'animation.ffmpeg_path\']".'))
+        with proc.stdin as ent:
+            ent.write(primero.tobytes())
+            for c in cuadros:
+                ent.write(c.tobytes())
+        if proc.wait():
+            raise OSError(_('Error de ffmpeg al guardar la animación "{}".').format(archivo))
+
+    elif formato == 'sprite':
+        cuadros = list(cuadros)
+        n_cols = int(np.ceil(np.sqrt(len(cuadros))))
+        n_filas = int(np.ceil(len(cuadros) / n_cols))
+        alto, ancho, n_canales = cuadros[0].shape
+        mosaico = np.zeros((n_filas * alto, n_cols * ancho, n_canales), dtype=cuadros[0].dtype)
+        for í, c in enumerate(cuadros):
+            f, col = divmod(í, n_cols)
+            mosaico[f * alto:(f + 1) * alto, col * ancho:(col + 1) * ancho] = c
+        Imagen.fromarray(mosaico).save(archivo, format='png')
+
+    else:
+        raise ValueError(formato)
+
+
+class AlmacénFormas(object):
     """
-    Dibujar una forma geográfica.
+    Las formas de un archivo ``.shp``. Las geometrías no se leen hasta que se necesiten, y después se guardan como
+    una sola matriz de coordenadas con los índices del inicio de cada parte y de las partes de cada forma. Si
+    ``caché`` es ``True``, estas matrices también se guardan en un archivo ``.npz`` al lado del ``.shp`` para no
+    tener que leer el ``.shp`` otra vez mientras éste no cambie.
+    """
+
+    def __init__(símismo, archivo, caché=True):
+        """
+
+        :param archivo: El archivo ``.shp``.
+        :type archivo: str
+        :param caché: Si hay que guardar y reutilizar las geometrías en un archivo ``.npz``.
+        :type caché: bool
+        """
+
+        if os.path.splitext(archivo)[1].lower() != '.shp':
+            archivo += '.shp'
+
+        símismo.archivo = archivo
+        símismo.caché = caché
 
-    Basado en código de Chris Halvin: https://github.com/chrishavlin/learning_shapefiles/tree/master/src
+        símismo._coords = None  # type: np.ndarray
+        símismo._í_partes = None  # type: np.ndarray
+        símismo._í_formas = None  # type: np.ndarray
+        símismo._vértices = None
+
+        símismo._campos = None
+        símismo._registros = None
+
+    @property
+    def archivo_caché(símismo):
+        return os.path.splitext(símismo.archivo)[0] + '.tinamit.npz'
+
+    @property
+    def coords(símismo):
+        """
+        Las coordenadas de todos los puntos de todas las formas, de tamaño ``(n_puntos, 2)``.
+
+        :rtype: np.ndarray
+        """
+        símismo._cargar()
+        return símismo._coords
+
+    @property
+    def í_partes(símismo):
+        """
+        El índice, en :attr:`coords`, del primer punto de cada parte, más el número total de puntos al final.
+
+        :rtype: np.ndarray
+        """
+        símismo._cargar()
+        return símismo._í_partes
+
+    @property
+    def í_formas(símismo):
+        """
+        El índice, en :attr:`í_partes`, de la primera parte de cada forma, más el número total de partes al final.
+
+        :rtype: np.ndarray
+        """
+        símismo._cargar()
+        return símismo._í_formas
+
+    @property
+    def n_formas(símismo):
+        return len(símismo.í_formas) - 1
+
+    def vértices(símismo):
+        """
+        Devuelve los polígonos de las formas, para dibujarlos.
+
+        :return: Los polígonos, cada uno una matriz de tamaño ``(n_puntos, 2)``, el índice de la forma a la cual
+          pertenece cada polígono y el número de formas.
+        :rtype: (list[np.ndarray], np.ndarray, int)
+        """
+
+        if símismo._vértices is None:
+            polígonos = np.split(símismo.coords, símismo.í_partes[1:-1]) if len(símismo.coords) else []
+            í_formas = np.repeat(np.arange(símismo.n_formas), np.diff(símismo.í_formas))
+            símismo._vértices = (polígonos, í_formas, símismo.n_formas)
+
+        return símismo._vértices
+
+    def registros(símismo):
+        """
+        Devuelve la tabla de atributos de las formas. No lee las geometrías.
+
+        :return: Los registros, uno por forma.
+        :rtype: list[list]
+        """
+
+        if símismo._registros is None:
+            af = sf.Reader(símismo.archivo)
+            try:
+                símismo._campos = [c[0] for c in af.fields[1:]]
+                símismo._registros = [list(r) for r in af.records()]
+            finally:
+                af.close()
+
+        return símismo._registros
+
+    def obt_col(símismo, col):
+        """
+        Devuelve los valores de una columna de la tabla de atributos.
+
+        :param col: El nombre de la columna.
+        :type col: str
+        :return: Los valores, uno por forma.
+        :rtype: np.ndarray
+        """
+
+        registros = símismo.registros()
+        try:
+            í = símismo._campos.index(col)
+        except ValueError:
+            raise ValueError(_('La columna "{}" no existe en la base de datos.').format(col))
+
+        return np.array([r[í] for r in registros])
+
+    def guardar(símismo):
+        """
+        Guarda las geometrías en el archivo ``.npz`` de caché.
+        """
+
+        np.savez(
+            símismo.archivo_caché, coords=símismo.coords, partes=símismo.í_partes, formas=símismo.í_formas,
+            llave=símismo._llave()
+        )
+
+    def _llave(símismo):
+        # Identifica la versión del archivo .shp
+        estado = os.stat(símismo.archivo)
+        return np.array([estado.st_mtime_ns, estado.st_size], dtype=np.int64)
+
+    def _cargar(símismo):
+        if símismo._coords is not None:
+            return
+
+        if símismo.caché and os.path.isfile(símismo.archivo_caché):
+            try:
+                with np.load(símismo.archivo_caché) as d:
+                    if np.array_equal(d['llave'], símismo._llave()):
+                        símismo._coords, símismo._í_partes, símismo._í_formas = d['coords'], d['partes'], d['formas']
+                        return
+            except (OSError, KeyError, ValueError):
+                pass
+
+        símismo._leer_shp()
+
+        if símismo.caché:
+            try:
+                símismo.guardar()
+            except OSError:
+                pass
+
+    def _leer_shp(símismo):
+        coords = []
+        í_partes = []
+        í_formas = [0]
+        n_puntos = 0
+
+        af = sf.Reader(símismo.archivo)
+        try:
+            for forma in af.iterShapes():
+                if len(forma.points):
+                    coords.append(np.array(forma.points, dtype=np.float64)[:, :2])
+                    í_partes.extend(n_puntos + p for p in forma.parts)
+                    n_puntos += len(forma.points)
+                í_formas.append(len(í_partes))
+        finally:
+            af.close()
+
+        í_partes.append(n_puntos)
+
+        símismo._coords = np.concatenate(coords) if coords else np.empty((0, 2), dtype=np.float64)
+        símismo._í_partes = np.array(í_partes, dtype=np.int32)
+        símismo._í_formas = np.array(í_formas, dtype=np.int32)
+
+    def __getstate__(símismo):
+        símismo._cargar()
+        estado = símismo.__dict__.copy()
+        estado['_vértices'] = None
+        return estado
+
+
+def _í_colores(vértices, orden=None):
+    """
+    Calcula, para cada polígono, el índice de su color en la lista de colores de las formas.
+
+    :param vértices: Los polígonos de la forma, tal como devueltos por :meth:`AlmacénFormas.vértices`.
+    :type vértices: (list[np.ndarray], np.ndarray, int)
+    :param orden: El orden de las formas, relativo al orden de las colores.
+    :type orden: np.ndarray | list
+    :return: El índice del color de cada polígono.
+    :rtype: np.ndarray
+    """
+
+    í_formas = vértices[1]
+    if orden is None:
+        return í_formas
+
+    # El color ``i`` corresponde a la forma con el ``i``-ésimo valor de ``orden``.
+    í_color_forma = np.empty(len(orden), dtype=int)
+    í_color_forma[np.argsort(orden, kind='stable')] = np.arange(len(orden))
+
+    return í_color_forma[í_formas]
+
+
+def _dibujar_shp(ejes, vértices, colores, orden=None, alpha=1.0, llenar=True):
+    """
+    Dibujar una forma geográfica. Todos los polígonos de la forma se dibujan en una sola colección de Matplotlib,
+    de manera que se puedan cambiar sus colores después sin tener que redibujarlos.
 
     :param ejes: Los ejes de Matplotlib.
     :type ejes: matplotlib.axes._subplots.Axes
 
-    :param frm: La forma.
-    :type frm: sf.Reader
+    :param vértices: Los polígonos de la forma, tal como devueltos por :meth:`AlmacénFormas.vértices`.
+    :type vértices: (list[np.ndarray], np.ndarray, int)
 
     :param colores: Los colores para dibujar.
     :type colores: str | list[str] | np.ndarray
@@ -574,55 +1085,27 @@ def _dibujar_shp(ejes, frm, colores, orden=None, alpha=1.0, llenar=True):
 
     :param llenar: Si hay que llenar la forma, o simplemente dibujar los contornos.
     :type llenar: bool
-    """
 
-    n_formas = len(frm.shapes())
+    :return: La colección de polígonos o de líneas.
+    :rtype: PolyCollection | LineCollection
+    """
 
-    if orden is not None:
-        regiones = [x for _, x in sorted(zip(orden, frm.shapes()))]
-    else:
-        regiones = frm.shapes()
+    polígonos, í_formas, n_formas = vértices
 
-    if isinstance(colores, str) or isinstance(colores, tuple):
-        colores = [colores] * n_formas
-    else:
+    if not (isinstance(colores, str) or isinstance(colores, tuple)):
         if len(colores) != n_formas:
             raise ValueError
+        colores = np.asarray(colores)[_í_colores(vértices, orden=orden)]
 
-    for forma, col in zip(regiones, colores):
-        n_puntos = len(forma.points)
-        n_partes = len(forma.parts)
-
-        if n_partes == 1:
-            x_lon = np.zeros((len(forma.points), 1))
-            y_lat = np.zeros((len(forma.points), 1))
-            for ip in range(len(forma.points)):
-                x_lon[ip] = forma.points[ip][0]
-                y_lat[ip] = forma.points[ip][1]
-            if llenar:
-                ejes.fill(x_lon, y_lat, color=col, alpha=alpha)
-            else:
-                ejes.plot(x_lon, y_lat, color=col, alpha=alpha)
-
-        else:
-            for ip in range(n_partes):  # Para cada parte del imagen
-                i0 = forma.parts[ip]
-                if ip < n_partes - 1:
-                    i1 = forma.parts[ip + 1] - 1
-                else:
-                    i1 = n_puntos
+    if llenar:
+        colección = PolyCollection(polígonos, closed=True, alpha=alpha)
+    else:
+        colección = LineCollection(polígonos, alpha=alpha)
+    colección.set_color(colores)
 
-                seg = forma.points[i0:i1 + 1]
-                x_lon = np.zeros((len(seg), 1))
-                y_lat = np.zeros((len(seg), 1))
-                for i in range(len(seg)):
-                    x_lon[i] = seg[i][0]
-                    y_lat[i] = seg[i][1]
+    ejes.add_collection(colección)
 
-                if llenar:
-                    ejes.fill(x_lon, y_lat, color=col, alpha=alpha)
-                else:
-                    ejes.plot(x_lon, y_lat, color=col, alpha=alpha)
+    return colección
 
 
 def _hex_a_rva(hx):
@@ -1,9 +1,11 @@
+from multiprocessing import Pool as Reserva
 from warnings import warn as avisar
 
 import numpy as np
 import pandas as pd
 
-from tinamit.Incertidumbre.Estadísticas import calib_bayes, optimizar, regresión
+from tinamit.Incertidumbre.Estadísticas import calib_bayes, calib_bayes_jer, optimizar, optimizar_global, \
+    regresión
 from tinamit import _
 from tinamit.EnvolturaMDS.sintaxis import Ecuación
 from tinamit.Incertidumbre.Datos import SuperBD
@@ -130,7 +132,25 @@ class ConexDatos(object):
 
     def calib_var(símismo, var, ec=None, paráms=None, líms_paráms=None, método=None, ops_método=None,
                   en=None, escala=None, por=None, fechas=None, bds=None, aprioris=True, aprioris_por=None,
-                  binario=False, regional=False):
+                  binario=False, regional=False, paralelo=False, progreso=False):
+        """
+        Calibra la ecuación de un variable para cada lugar.
+
+        :param aprioris: Con inferencia bayesiana, si hay que calibrar todas las regiones juntas con un modelo
+          jerárquico, donde cada región toma sus a prioris de las regiones que la contienen.
+        :type aprioris: bool
+        :param aprioris_por: Los niveles de la jerarquía (escalas o grupos de la geografía) entre el nivel global y
+          las regiones.
+        :type aprioris_por: str | list[str]
+        :param paralelo: Si hay que calibrar las regiones en paralelo, una región por tarea. Puede ser el número de
+          procesos que emplear.
+        :type paralelo: bool | int
+        :param progreso: Si hay que informar del progreso de la calibración. Puede ser una función
+          ``f(lugar, n_hechas, n_total)``.
+        :type progreso: bool | callable
+        :return: Las calibraciones de cada lugar.
+        :rtype: dict
+        """
 
         geog = símismo.bd.geog
 
@@ -203,70 +223,51 @@ class ConexDatos(object):
         obs_y = [l[var].values for l in obs]
         obs_x = [{x: l[x].values for x in vars_x} for l in obs]
 
-        # Calcular a prioris
         if aprioris and método == 'inf bayes':
+            # Un solo modelo jerárquico para todas las regiones, donde los a prioris de cada región vienen de las
+            # regiones que la contienen.
             if aprioris_por is None:
                 aprioris_por = []
             if not isinstance(aprioris_por, list):
                 aprioris_por = [aprioris_por]
 
-            def calib_bayes_en(o_ec, en_=None, escl=None, apr=None, binario=False, **ops):
-                lgs = geog.obt_lugares_en(en=en_, escala=escl)
-                if regional:
-                    obs_ap = símismo.bd.obt_datos_reg(l_vars=l_vars, lugar=lgs, datos=bds, fechas=fechas)
-                else:
-                    obs_ap = símismo.bd.obt_datos_ind(l_vars=l_vars, lugar=lgs, datos=bds, fechas=fechas,
-                                                  excl_faltan=True)
-
-                obs_y_ap = obs_ap[var].values
-                obs_x_ap = {x: obs_ap[x].values for x in vars_x}
-                return calib_bayes(o_ec, paráms, líms_paráms, obs_x_ap, obs_y_ap, apr, binario=binario, **ops)
-
-            # Ordenar aprioris_por
+            # Ordenar aprioris_por, de grande a pequeño (los grupos después de las escalas)
             if not all(x in geog.orden_jer or x in geog.grupos for x in aprioris_por):
-                raise ValueError('')
-            aprioris_por.sort(key=lambda x: geog.orden_jer.index(x))  # Grande a pequeño
-
-            if len(aprioris_por):
-                avisar('¡Código experimental!')  # Para hacer: terminar
-                dic_lg_pariente = {en: {x: geog.árbol_geog_inv[x][aprioris_por[-1]] for x in lugares}}
-                nivel_inf = en
-                for n, e in enumerate(reversed(aprioris_por)):
-                    try:
-                        nivel_sup = list(reversed(aprioris_por))[n+1]
-                    except IndexError:
-                        nivel_sup = None
-                    dic_lg_pariente[e] = {x: geog.árbol_geog_inv[x][nivel_sup] if nivel_sup is not None else None
-                                          for x in dic_lg_pariente[nivel_inf].values()}
-                    nivel_inf = e
-
-            # Para hacer: terminar para casos con aprioris_por
-            dic_aprioris = {None: calib_bayes_en(o_ec=obj_ec, binario=binario, **ops_método)}
-            dists_aprioris = [dic_aprioris[None] for _ in lugares]
-
-        else:
-            dists_aprioris = [None]*len(lugares)
-
-        d_calib = {}
-        for lg, x, y, ap in zip(lugares, obs_x, obs_y, dists_aprioris):
-
-            try:
-                if método == 'inf bayes':
-                    resultados = calib_bayes(obj_ec, paráms, líms_paráms, x, y, dists_aprioris=ap, binario=binario,
-                                             **ops_método)
+                raise ValueError(_('Los niveles de a prioris "{}" no existen en la geografía.').format(aprioris_por))
+            aprioris_por = sorted(
+                aprioris_por, key=lambda x: geog.orden_jer.index(x) if x in geog.orden_jer else len(geog.orden_jer)
+            )
 
-                elif método == 'optimizar':
-                    resultados = optimizar(obj_ec, paráms, líms_paráms, x, y, **ops_método)
+            caminos = [_camino_jer(geog, lgs, niveles=aprioris_por) for lgs in l_lugs]
+            calibs = calib_bayes_jer(obj_ec, paráms, líms_paráms, obs_x, obs_y, caminos=caminos, binario=binario,
+                                     **ops_método)
+            d_calib = dict(zip(lugares, calibs))
 
-                elif método == 'regresión':
-                    resultados = regresión(obj_ec, paráms, líms_paráms, x, y, **ops_método)
-                else:
-                    raise ValueError('')
-
-                d_calib[lg] = resultados
-            except:
-                avisar('Error de calibración para región {}. Tomaremos los a prioris como estimo final.'.format(lg))
-                d_calib[lg] = ap
+        else:
+            args_calib = {
+                'obj_ec': obj_ec, 'método': método, 'paráms': paráms, 'líms_paráms': líms_paráms, 'binario': binario,
+                'ops_método': ops_método
+            }
+            tareas = list(zip(lugares, obs_x, obs_y, [None] * len(lugares)))
+
+            if paralelo and len(tareas) > 1:
+                if ops_método.get('paralelo'):
+                    # Los procesos de la reserva no pueden abrir su propia reserva.
+                    avisar(_('Las regiones ya se calibran en paralelo, así que cada región se calibrará en un solo '
+                             'proceso.'))
+                    args_calib['ops_método'] = dict(ops_método, paralelo=False)
+
+                n_procs = None if paralelo is True else paralelo
+                with Reserva(n_procs, initializer=_inic_calibrador, initargs=(args_calib,)) as r:
+                    # imap() devuelve los resultados en el orden de las tareas.
+                    d_calib = _juntar_calibs(
+                        r.imap(_calibrar_región, tareas), n_total=len(tareas), var=var, progreso=progreso
+                    )
+            else:
+                calibrador = _CalibradorRegión(**args_calib)
+                d_calib = _juntar_calibs(
+                    (calibrador(t) for t in tareas), n_total=len(tareas), var=var, progreso=progreso
+                )
 
         for v in paráms:
             símismo.dic_calibs[v] = {lg: clb[v] for lg, clb in d_calib.items()}
@@ -386,3 +387,143 @@ class ConexDatos(object):
 
     def no_calibrados(símismo):
         return [var for var in símismo.modelo.variables if var not in símismo.dic_info_calib]
+
+
+def _camino_jer(geog, lugares, niveles):
+    """
+    Devuelve los nombres de las regiones que contienen una región, a cada nivel de una jerarquía.
+
+    :param geog: La geografía.
+    :type geog: Geografía
+    :param lugares: La región, o la lista de lugares que la componen.
+    :type lugares: str | list[str]
+    :param niveles: Los niveles de la jerarquía, de grande a pequeño.
+    :type niveles: list[str]
+    :return: El nombre de la región pariente a cada nivel.
+    :rtype: tuple
+    :raises ValueError: Si los lugares de la región no comparten una sola región pariente a algún nivel.
+    """
+
+    if isinstance(lugares, str):
+        lugares = [lugares]
+
+    camino = []
+    for nv in niveles:
+        nombres = {geog.árbol_geog_inv[lg][nv] for lg in lugares}
+        if len(nombres) != 1:
+            raise ValueError(
+                _('La región compuesta de los lugares {} no cabe en una sola región del nivel "{}" ({}).')
+                .format(', '.join(lugares), nv, ', '.join(sorted(str(x) for x in nombres)))
+            )
+        camino.append(nombres.pop())
+
+    return tuple(camino)
+
+
+class _CalibradorRegión(object):
+    """
+    Calibra una ecuación con los datos de una región a la vez.
+    """
+
+    def __init__(símismo, obj_ec, método, paráms, líms_paráms, binario, ops_método):
+        símismo.obj_ec = obj_ec
+        símismo.método = método
+        símismo.paráms = paráms
+        símismo.líms_paráms = líms_paráms
+        símismo.binario = binario
+        símismo.ops_método = ops_método
+
+        # Generar las funciones de la ecuación una sola vez para todas las regiones
+        if método in ['optimizar', 'optimizar global']:
+            obj_ec.gen_func_python(paráms)
+            obj_ec.gen_func_grad(paráms)
+
+    def __call__(símismo, tarea):
+        """
+        Calibra la ecuación para una región.
+
+        :param tarea: El lugar, los datos ``x`` y ``y``, y los a prioris.
+        :type tarea: tuple
+        :return: El lugar, la calibración y el error, si hubo uno. En caso de error, la calibración son los a
+          prioris.
+        :rtype: tuple
+        """
+
+        lg, x, y, ap = tarea
+        paráms, líms_paráms, ops_método = símismo.paráms, símismo.líms_paráms, símismo.ops_método
+
+        try:
+            if símismo.método == 'inf bayes':
+                resultados = calib_bayes(símismo.obj_ec, paráms, líms_paráms, x, y, dists_aprioris=ap,
+                                         binario=símismo.binario, **ops_método)
+
+            elif símismo.método == 'optimizar':
+                resultados = optimizar(símismo.obj_ec, paráms, líms_paráms, x, y, **ops_método)
+
+            elif símismo.método == 'optimizar global':
+                resultados = optimizar_global(símismo.obj_ec, paráms, líms_paráms, x, y, **ops_método)
+
+            elif símismo.método == 'regresión':
+                resultados = regresión(símismo.obj_ec, paráms, líms_paráms, x, y, **ops_método)
+            else:
+                raise ValueError(_('Método de calibración "{}" no reconocido.').format(símismo.método))
+
+            return lg, resultados, None
+        except Exception as e:
+            return lg, ap, '{}: {}'.format(type(e).__name__, e)
+
+
+_calibrador = None  # type: _CalibradorRegión
+
+
+def _inic_calibrador(args_calib):
+    # Cada proceso prepara su propia ecuación una sola vez.
+    global _calibrador
+    _calibrador = _CalibradorRegión(**args_calib)
+
+
+def _calibrar_región(tarea):
+    return _calibrador(tarea)
+
+
+def _juntar_calibs(resultados, n_total, var, progreso=False):
+    """
+    Junta las calibraciones de cada región, en el orden de las regiones.
+
+    :param resultados: Los resultados de :class:`_CalibradorRegión` para cada región.
+    :type resultados: collections.Iterable[tuple]
+    :param n_total: El número de regiones.
+    :type n_total: int
+    :param var: El variable calibrado.
+    :type var: str
+    :param progreso: Si hay que informar del progreso, o una función ``f(lugar, n_hechas, n_total)``.
+    :type progreso: bool | callable
+    :return: Las calibraciones de cada lugar. Las regiones cuya calibración falló y que no tenían a prioris no se
+      incluyen.
+    :rtype: dict
+    """
+
+    d_calib = {}
+    fallidas = []
+    for n, (lg, resultado, error) in enumerate(resultados):
+        if error is not None:
+            if resultado is None:
+                fallidas.append(lg)
+                avisar(_('Error de calibración para región {} ({}). No hay a prioris, así que se omitirá la región.')
+                       .format(lg, error))
+            else:
+                avisar(_('Error de calibración para región {} ({}). Tomaremos los a prioris como estimo final.')
+                       .format(lg, error))
+        if resultado is not None:
+            d_calib[lg] = resultado
+
+        if callable(progreso):
+            progreso(lg, n + 1, n_total)
+        elif progreso:
+            print(_('Calibración de "{}": región {} lista ({}/{}).').format(var, lg, n + 1, n_total))
+
+    if fallidas:
+        avisar(_('La calibración de "{}" falló para {} de {} regiones: {}.')
+               .format(var, len(fallidas), n_total, ', '.join(str(lg) for lg in fallidas)))
+
+    return d_calib
@@ -1,11 +1,14 @@
 import io
 import json
 import re
+from functools import lru_cache
 
 import numpy as np
 from scipy.optimize import minimize
 
+from tinamit.EnvolturaMDS.sintaxis import Ecuación
 from tinamit.Incertidumbre.Datos import SuperBD
+from tinamit.Incertidumbre.Estadísticas import _x0
 
 
 class Control(object):
@@ -72,6 +75,7 @@ class Control(object):
         dic = símismo.receta['ecs'][var] = {}
         dic['ec_desparám'] = ec_mod
         dic['ec_nativa'] = ec_nat
+        dic['ec_tinamït'] = ec_desparám
         dic['paráms'] = None
         dic['líms_paráms'] = None
 
@@ -80,11 +84,11 @@ class Control(object):
         parientes = símismo.modelo.parientes(var)
 
         if relación == 'linear':
-            ec = ' '.join(['%s*p[%i]' % (x, n) for n, x in enumerate(parientes)])
+            ec = ' + '.join(['%s*p[%i]' % (x, n) for n, x in enumerate(parientes)])
             líms = [(-np.inf, np.inf)] * len(parientes)
 
         elif relación == 'exponencial':
-            ec = ' '.join(['%s**p[%i]' % (x, n) for n, x in enumerate(parientes)])
+            ec = ' + '.join(['%s**p[%i]' % (x, n) for n, x in enumerate(parientes)])
             líms = [(-np.inf, np.inf)] * len(parientes)
 
         elif relación == 'logística':
@@ -124,13 +128,12 @@ class Control(object):
 
         if ec_desparám is None:
             try:
-                ec_nativa = símismo.receta['ecs'][var]['ec_nativa']
+                ec_desparám = símismo.receta['ecs'][var]['ec_tinamït']
             except KeyError:
                 raise ValueError('Hay que especificar una ecuación desparametrizada la primera vez que se calibra'
                                  'la ecuación de un variable.')
         else:
             símismo.importar_ec(var, ec_desparám)
-            ec_nativa = símismo.receta['ecs'][var]['ec_nativa']
 
         if líms is None:
             líms = símismo.receta['ecs'][var]['líms_paráms']
@@ -143,34 +146,26 @@ class Control(object):
         dic_datos = símismo.bd.pedir_datos(l_vars=l_vars, escala=escala, años=años,
                                            cód_lugar=cód_lugar, lugar=lugar, datos=datos)
 
-        parientes = símismo.modelo.vars[var]['parientes']
-        parientes.sort(key=len, reverse=True)
+        # La ecuación se analiza y se compila una sola vez; cada evaluación es un cálculo NumPy.
+        obj_ec, paráms = _compilar_ec(ec_desparám)
+        f = obj_ec.gen_func_python(paráms)
+        grad = obj_ec.gen_func_grad(paráms)
 
-        n_paráms = len(set(re.findall(r'd\[\d\]', ec_desparám)))  # No funacionará si un variable contiene "d[0]"
+        var_dep = np.asarray(dic_datos[var], dtype=float)
 
-        ec_con_vars = ec_nativa
-        for v in parientes:
-            ec_con_vars.replace(v, 'dic_datos[%s]' % v)
-
-        var_dep = dic_datos[var]
-
-        def función(paráms):
-
-            ec = ec_con_vars.format(p=paráms)
-
-            pred = eval(ec)
-
-            return resid_cuad(pred=pred, obs=var_dep)
+        def función(p):
+            resid = f(p, dic_datos) - var_dep
+            return np.sum(np.square(resid)), np.array([2 * np.sum(resid * d) for d in grad(p, dic_datos)])
 
         if líms:
-            iniciales = np.array([(x[0] + x[1]) / 2 for x in líms])
+            líms = [tuple(x if x is not None and np.isfinite(x) else None for x in lp) for lp in líms]
         else:
-            iniciales = np.zeros(len(n_paráms))
+            líms = [(None, None)] * len(paráms)
 
-        calibrados = minimize(fun=función, x0=iniciales, bounds=líms)
+        calibrados = minimize(fun=función, x0=_x0(líms), jac=True, bounds=líms).x
 
         dic_ec = símismo.receta['ecs'][var]
-        dic_ec['párams'] = calibrados
+        dic_ec['párams'] = calibrados.tolist()
         dic_ec['escala'] = escala
         dic_ec['años'] = años
         dic_ec['lugares'] = lugar
@@ -256,3 +251,24 @@ class Control(object):
 
 def resid_cuad(pred, obs):
     return np.sum(np.square(np.subtract(pred, obs)))
+
+
+@lru_cache(maxsize=None)
+def _compilar_ec(ec_desparám):
+    """
+    Analiza una ecuación desparametrizada (por ejemplo, ``"x = y * p[0] + p[1]"``) con el analizador de ecuaciones
+    de Tinamït.
+
+    :param ec_desparám: La ecuación, con los parámetros escritos ``p[i]`` o ``{p[i]}``.
+    :type ec_desparám: str
+    :return: La ecuación y los nombres de sus parámetros, en el orden de ``p``.
+    :rtype: (Ecuación, list[str])
+    """
+
+    ec = ec_desparám.split('=', 1)[-1].replace('**', '^')
+
+    í_paráms = sorted({int(x) for x in re.findall(r'\bp\[(\d+)\]', ec)})
+    paráms = ['pTinamït{}'.format(í) for í in range(max(í_paráms, default=-1) + 1)]
+    ec = re.sub(r'{?\bp\[(\d+)\]}?', lambda m: paráms[int(m.group(1))], ec)
+
+    return Ecuación(ec, dialecto='tinamït'), paráms
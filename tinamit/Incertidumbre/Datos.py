@@ -2,6 +2,8 @@ import csv
 import datetime as ft
 import json
 import os
+import sqlite3
+from itertools import zip_longest
 from warnings import warn as avisar
 
 import numpy as np
@@ -11,11 +13,11 @@ from matplotlib.figure import Figure as Figura
 
 from tinamit import _
 from tinamit.Geog.Geog import Geografía
-from tinamit.Incertidumbre.Números import tx_a_núm
+from tinamit.Incertidumbre.Números import detectar_lengua, tx_a_núm_vec
 
 
 class Datos(object):
-    def __init__(símismo, nombre, archivo, fecha=None, lugar=None, cód_vacío=None):
+    def __init__(símismo, nombre, archivo, fecha=None, lugar=None, cód_vacío=None, indexar=False):
         """
 
         :param nombre:
@@ -36,6 +38,10 @@ class Datos(object):
         :param cód_vacío:
         :type cód_vacío: list[int | float | str] | int | float | str
 
+        :param indexar: Si hay que crear índices en las columnas de lugar y de fecha de una base de datos
+          :attr:`filtrable` (ver :meth:`indexar`). Esto modifica el archivo de la base de datos.
+        :type indexar: bool
+
         """
 
         símismo.nombre = nombre
@@ -45,10 +51,19 @@ class Datos(object):
 
         símismo.cols = símismo.bd.obt_nombres_cols()
 
+        # Las columnas de fecha y de lugar, si hay
+        símismo.col_fecha = fecha if isinstance(fecha, str) and fecha in símismo.cols else None
+        símismo.col_lugar = lugar if isinstance(lugar, str) and lugar in símismo.cols else None
+
         if fecha is None:
             símismo.fechas = fecha
-        elif fecha in símismo.cols:
-            símismo.fechas = símismo.bd.obt_fechas(fecha)
+        elif símismo.col_fecha is not None:
+            if símismo.filtrable:
+                # Las fechas se leerán con los datos de cada consulta.
+                símismo.bd.obt_formato_fecha(fecha)
+                símismo.fechas = None
+            else:
+                símismo.fechas = símismo.bd.obt_fechas(fecha)
         elif isinstance(fecha, ft.date) or isinstance(fecha, ft.datetime):
             símismo.fechas = fecha
         elif isinstance(fecha, int):
@@ -59,9 +74,13 @@ class Datos(object):
 
         if lugar is None:
             símismo.lugares = lugar
-        elif lugar in símismo.cols:
-            # Quitar 0's inútiles en frente del código.
-            símismo.lugares = [x.strip().lstrip('0') for x in símismo.bd.obt_datos_tx(cols=lugar)]
+        elif símismo.col_lugar is not None:
+            if símismo.filtrable:
+                símismo.bd.estab_col_código(lugar)
+                símismo.lugares = None
+            else:
+                # Quitar 0's inútiles en frente del código.
+                símismo.lugares = [x.strip().lstrip('0') for x in símismo.bd.obt_datos_tx(cols=lugar)]
         else:
             símismo.lugares = str(lugar).strip().lstrip('0')
 
@@ -79,6 +98,9 @@ class Datos(object):
 
         símismo.n_obs = símismo.bd.n_obs
 
+        if indexar:
+            símismo.indexar()
+
     def obt_datos(símismo, l_vars, cód_vacío=None):
         """
 
@@ -104,6 +126,84 @@ class Datos(object):
 
         return datos
 
+    def indexar(símismo):
+        """
+        Crea índices en las columnas de lugar y de fecha de una base de datos :attr:`filtrable`, para que sus
+        consultas sean más rápidas. Los índices se guardan en el archivo de la base de datos misma.
+        """
+
+        if símismo.col_fecha is not None:
+            símismo.bd.indexar(símismo.col_fecha)
+        if símismo.col_lugar is not None:
+            símismo.bd.indexar(símismo.col_lugar, código=True)
+
+    @property
+    def filtrable(símismo):
+        """
+        Si la base de datos puede filtrar sus observaciones ella misma. En este caso, :class:`SuperBD` no guarda sus
+        datos en memoria sino que los pide con :meth:`obt_marco` para cada consulta.
+
+        :rtype: bool
+        """
+        return símismo.bd.filtrable
+
+    def obt_marco(símismo, l_vars, cód_vacío=None, lugares=None, fechas=None):
+        """
+        Obtiene los datos de las observaciones que corresponden a los lugares y a las fechas especificados,
+        filtrándolos en la base de datos misma. Únicamente para bases de datos :attr:`filtrable`.
+
+        :param l_vars: Las columnas de interés.
+        :type l_vars: list[str]
+        :param cód_vacío: Códigos adicionales de valores que faltan.
+        :type cód_vacío: list | set
+        :param lugares: Los lugares de interés, o ``None`` para todos.
+        :type lugares: list[str]
+        :param fechas: Las fechas de interés, o ``None`` para todas.
+        :type fechas: list[ft.date]
+        :return: Los datos, con una columna por variable y columnas de ``lugar`` y ``fecha``.
+        :rtype: pd.DataFrame
+        """
+
+        códs_vacío_final = símismo.cód_vacío.copy()
+        if cód_vacío is not None:
+            códs_vacío_final.update(cód_vacío)
+
+        filtros = {}
+        cols_tx = []
+        if símismo.col_lugar is not None:
+            cols_tx.append(símismo.col_lugar)
+            if lugares is not None:
+                filtros[símismo.col_lugar] = [str(x).strip().lstrip('0') for x in lugares]
+        if símismo.col_fecha is not None:
+            cols_tx.append(símismo.col_fecha)
+            if fechas is not None:
+                fechas_tx = símismo.bd.fechas_a_tx(símismo.col_fecha, fechas)
+                if fechas_tx is not None:
+                    filtros[símismo.col_fecha] = fechas_tx
+
+        m_datos, d_tx = símismo.bd.obt_datos_filtrados(
+            cols=l_vars, cols_tx=cols_tx, cód_vacío=códs_vacío_final, filtros=filtros
+        )
+
+        marco = pd.DataFrame({c: m_datos[í] for í, c in enumerate(l_vars)})
+
+        if símismo.col_lugar is not None:
+            marco['lugar'] = [x.strip().lstrip('0') for x in d_tx[símismo.col_lugar]]
+        else:
+            marco['lugar'] = símismo.lugares
+
+        if símismo.col_fecha is not None:
+            fechas_tx = d_tx[símismo.col_fecha]
+            if len(fechas_tx):
+                formato = símismo.bd.obt_formato_fecha(símismo.col_fecha)
+                marco['fecha'] = _fechas_a_pd(símismo.bd._leer_fechas(fechas_tx, formato=formato))
+            else:
+                marco['fecha'] = pd.to_datetime([])
+        else:
+            marco['fecha'] = _fechas_a_pd(símismo.fechas)
+
+        return marco
+
     def __str__(símismo):
         return símismo.nombre
 
@@ -113,15 +213,17 @@ class DatosIndividuales(Datos):
     No tiene funcionalidad específica, pero esta clase queda muy útil para identificar el tipo de datos.
     """
 
-    def __init__(símismo, nombre, archivo, fecha, lugar, cód_vacío=None):
-        super().__init__(nombre=nombre, archivo=archivo, fecha=fecha, lugar=lugar, cód_vacío=cód_vacío)
+    def __init__(símismo, nombre, archivo, fecha, lugar, cód_vacío=None, indexar=False):
+        super().__init__(nombre=nombre, archivo=archivo, fecha=fecha, lugar=lugar, cód_vacío=cód_vacío,
+                         indexar=indexar)
 
 
 class DatosRegión(Datos):
 
-    def __init__(símismo, nombre, archivo, fecha=None, lugar=None, cód_vacío=None, tmñ_muestra=None):
+    def __init__(símismo, nombre, archivo, fecha=None, lugar=None, cód_vacío=None, tmñ_muestra=None, indexar=False):
 
-        super().__init__(nombre=nombre, archivo=archivo, fecha=fecha, lugar=lugar, cód_vacío=cód_vacío)
+        super().__init__(nombre=nombre, archivo=archivo, fecha=fecha, lugar=lugar, cód_vacío=cód_vacío,
+                         indexar=indexar)
 
         símismo.tmñ_muestra = tmñ_muestra
         if tmñ_muestra is not None:
@@ -130,20 +232,37 @@ class DatosRegión(Datos):
 
     def obt_error(símismo, var, col_error=None):
 
-        errores = None
         if col_error is not None:
-            errores = símismo.bd.obt_datos(col_error)
+            return símismo.bd.obt_datos(col_error)
+
+        datos = símismo.bd.obt_datos(var, cód_vacío=símismo.cód_vacío)
+        if símismo.tmñ_muestra is not None:
+            tmñ_muestra = símismo.bd.obt_datos(símismo.tmñ_muestra, cód_vacío=símismo.cód_vacío)
         else:
-            datos = símismo.bd.obt_datos(var, cód_vacío=símismo.cód_vacío)
-            if símismo.tmñ_muestra is not None:
-                if np.nanmin(datos) >= 0 and np.nanmax(datos) <= 1:
-                    tmñ_muestra = símismo.bd.obt_datos(símismo.tmñ_muestra, cód_vacío=símismo.cód_vacío)
-                    errores = np.sqrt(np.divide(np.multiply(datos, np.subtract(1, datos)), tmñ_muestra))
-            else:
-                errores = np.empty_like(datos)
-                errores[:] = np.nan
+            tmñ_muestra = None
+
+        return símismo.calc_error(datos, tmñ_muestra)
+
+    @staticmethod
+    def calc_error(datos, tmñ_muestra=None):
+        """
+        Calcula el error de proporciones a base del tamaño de las muestras.
+
+        :param datos: Los datos.
+        :type datos: np.ndarray
+        :param tmñ_muestra: El tamaño de muestra de cada dato, o ``None`` si no se conoce.
+        :type tmñ_muestra: np.ndarray
+        :return: El error de cada dato, o ``None`` si los datos no son proporciones.
+        :rtype: np.ndarray | None
+        """
+
+        if tmñ_muestra is None:
+            return np.full(np.shape(datos), np.nan)
+
+        if np.nanmin(datos) >= 0 and np.nanmax(datos) <= 1:
+            return np.sqrt(np.divide(np.multiply(datos, np.subtract(1, datos)), tmñ_muestra))
 
-        return errores
+        return None
 
 
 class SuperBD(object):
@@ -180,6 +299,10 @@ class SuperBD(object):
         símismo.datos_ind = None  # type: pd.DataFrame
         símismo.bd_lista = False
 
+        # Columnas ya leídas de cada base de datos, para no tener que volver a leerlas cuando cambian los variables.
+        símismo._caché_cols = {}  # type: dict[str, dict[str, dict]]
+        símismo._caché_base = {}  # type: dict[str, pd.DataFrame]
+
     def agregar_datos(símismo, bd, bd_plantilla=None, auto_llenar=True):
         """
 
@@ -192,8 +315,9 @@ class SuperBD(object):
 
         """
 
-        if bd in símismo.bds:
+        if bd.nombre in símismo.bds:
             avisar(_('Ya existía la base de datos "{}". Borramos la que estaba antes.').format(bd))
+            símismo._borrar_caché(bd.nombre)
 
         símismo.bds[bd.nombre] = bd
         #  símismo.receta['bds'].append(bd.archivo_datos)
@@ -214,11 +338,13 @@ class SuperBD(object):
                 if b in bd_plantilla:
                     if isinstance(b, Datos):
                         b = b.nombre
-                    var_bd = d_var['fuente'][b]['var_bd']
+                    var_bd = d_var['fuente'][b]['var']
                     cód_vacío = d_var['fuente'][b]['cód_vacío']
                     if var_bd in bd.cols:
-                        d_var['fuente'][bd.nombre] = {'var_bd': var_bd, 'cód_vacío': cód_vacío}
-                        continue
+                        d_var['fuente'][bd.nombre] = {'var': var_bd, 'cód_vacío': cód_vacío}
+                        if isinstance(bd, DatosRegión):
+                            d_var['fuente'][bd.nombre]['col_error'] = None
+                        break
 
                     else:
                         avisar(_('El variable existente "{}" no existe en la nueva base de datos "{}". No'
@@ -235,6 +361,7 @@ class SuperBD(object):
             raise ValueError('')
 
         símismo.bds.pop(bd)
+        símismo._borrar_caché(bd)
         for var, d_var in símismo.vars.items():
             try:
                 d_var['fuente'].pop(bd)
@@ -309,6 +436,11 @@ class SuperBD(object):
 
         símismo.vars[nuevo_nombre] = símismo.vars.pop(var)
 
+        # Las columnas ya leídas siguen válidas bajo el nuevo nombre.
+        for caché in símismo._caché_cols.values():
+            if var in caché:
+                caché[nuevo_nombre] = caché.pop(var)
+
         símismo.bd_lista = False
 
     def _limp_vars(símismo):
@@ -319,83 +451,104 @@ class SuperBD(object):
             if len(d_v['fuente']) == 0:
                 símismo.vars.pop(v)
 
-        datos_ind = símismo.datos_ind
-        datos_reg = símismo.datos_reg
+    def _borrar_caché(símismo, nb):
+        símismo._caché_cols.pop(nb, None)
+        símismo._caché_base.pop(nb, None)
 
-        # Asegurarse que no queden variables (columas) en las bases de datos que no estén en símismo.vars
-        for bd_pd in [datos_ind, datos_reg]:
-            if bd_pd is not None:
-                cols = list(bd_pd)
-                for c in cols:
-                    if c not in list(símismo.vars) + ['bd', 'lugar', 'fecha']:
-                        bd_pd.drop(c, axis=1, inplace=True)
+    def _act_caché(símismo, nb, bd):
+        """
+        Actualiza las columnas guardadas de una base de datos: lee únicamente los variables que todavía no se han
+        leído (o cuya especificación cambió) y olvida los que ya no le corresponden.
 
-        # Quitar observaciones en bases de datos que ya no están vinculadas
-        if símismo.datos_ind is not None:
-            símismo.datos_ind = datos_ind[datos_ind['bd'].isin(símismo.bds)]
-        if símismo.datos_reg is not None:
-            símismo.datos_reg = datos_reg[datos_reg['bd'].isin(símismo.bds)]
+        :param nb: El nombre de la base de datos.
+        :type nb: str
+        :param bd: La base de datos.
+        :type bd: Datos
+        :return: Las columnas de la base de datos, por nombre de variable.
+        :rtype: dict[str, dict]
+        """
+
+        caché = símismo._caché_cols.setdefault(nb, {})
+        fuentes = {v: d_v['fuente'][nb] for v, d_v in símismo.vars.items() if nb in d_v['fuente']}
+
+        for v in list(caché):
+            if v not in fuentes or caché[v]['fuente'] != fuentes[v]:
+                caché.pop(v)
+
+        for v, fuente in fuentes.items():
+            if v in caché:
+                continue
+
+            var_bd = fuente['var']
+            cód_vacío = fuente['cód_vacío']
+
+            d_col = {'fuente': fuente.copy(), 'val': bd.obt_datos(l_vars=[var_bd], cód_vacío=[cód_vacío])}
+            if isinstance(bd, DatosRegión):
+                error = bd.obt_error(var_bd, col_error=fuente.get('col_error'))
+                d_col['error'] = np.full(bd.n_obs, np.nan) if error is None else error
+
+            caché[v] = d_col
+
+        return caché
+
+    def _base_bd(símismo, nb, bd):
+        """
+        Devuelve las columnas de base de una base de datos (nombre, lugar y fecha de cada observación).
+
+        :param nb: El nombre de la base de datos.
+        :type nb: str
+        :param bd: La base de datos.
+        :type bd: Datos
+        :return: Las columnas de base.
+        :rtype: pd.DataFrame
+        """
+
+        if nb not in símismo._caché_base:
+            base = pd.DataFrame({'bd': [nb] * bd.n_obs})
+            base['lugar'] = bd.lugares
+            base['fecha'] = _fechas_a_pd(bd.fechas)
+
+            símismo._caché_base[nb] = base
+
+        return símismo._caché_base[nb]
 
     def _gen_bd_intern(símismo):
 
         símismo._limp_vars()
-        símismo.datos_ind = símismo.datos_reg = None
+
+        marcos = {'ind': [], 'reg': [], 'err': []}
 
         # Agregar datos
         for nb, bd in símismo.bds.items():
 
-            vars_interés = [it for it in símismo.vars.items() if nb in it[1]['fuente']]
-            l_vars = [it[0] for it in vars_interés]
-
-            if len(vars_interés):
-                l_vars_bd = [d_v['fuente'][nb]['var'] for _, d_v in vars_interés]
-                l_códs_vac = [d_v['fuente'][nb]['cód_vacío'] for _, d_v in vars_interés]
+            # Las bases de datos filtrables se consultan directamente en cada llamada a obt_datos().
+            if bd.filtrable:
+                continue
 
-                datos_bd = np.array(bd.obt_datos(l_vars=l_vars_bd, cód_vacío=l_códs_vac)).T
+            caché = símismo._act_caché(nb, bd)
+            if not len(caché):
+                continue
 
-                bd_pds_temp = pd.DataFrame(datos_bd, columns=l_vars)
+            base = símismo._base_bd(nb, bd)
 
-                bd_pds_temp['bd'] = nb
-                bd_pds_temp['lugar'] = bd.lugares
-
-                if isinstance(bd.fechas, tuple):
-                    if bd.fechas[0] is not None:
-                        bd_pds_temp['fecha'] = pd.to_datetime(bd.fechas[0]) + pd.to_timedelta(bd.fechas[1], unit='d')
-                    else:
-                        bd_pds_temp['fecha'] = pd.to_datetime(['{}-1-1'.format(str(x)) for x in bd.fechas[1]])
-                elif bd.fechas is None:
-                    bd_pds_temp['fecha'] = None
-                else:
-                    bd_pds_temp['fecha'] = pd.to_datetime(bd.fechas)
+            bd_pds_temp = pd.DataFrame({v: d_col['val'] for v, d_col in caché.items()})
+            bd_pds_temp = pd.concat([bd_pds_temp, base], axis=1)
 
+            if isinstance(bd, DatosIndividuales):
                 # Datos individuales
-                if isinstance(bd, DatosIndividuales):
+                marcos['ind'].append(bd_pds_temp)
 
-                    if símismo.datos_ind is None:
-                        símismo.datos_ind = bd_pds_temp
-                    else:
-                        símismo.datos_ind = pd.concat([bd_pds_temp, símismo.datos_ind], ignore_index=True)
+            else:
+                # Datos regionales, con sus errores
+                marcos['reg'].append(bd_pds_temp)
 
-                # Datos regionales
-                else:
+                bd_pds_err_temp = pd.DataFrame({v: d_col['error'] for v, d_col in caché.items()})
+                marcos['err'].append(pd.concat([bd_pds_err_temp, base], axis=1))
 
-                    if símismo.datos_reg is None:
-                        símismo.datos_reg = bd_pds_temp
-                    else:
-                        símismo.datos_reg = pd.concat([bd_pds_temp, símismo.datos_reg], ignore_index=True)
-
-                    # Calcular errores
-                    datos_err = np.array(
-                        [bd.obt_error(d_v['fuente'][nb]['var'], col_error=d_v['fuente'][nb]['col_error'])
-                         for v, d_v in vars_interés]
-                    ).T
-                    bd_pds_err_temp = bd_pds_temp.copy()
-                    bd_pds_err_temp[l_vars] = datos_err
-
-                    if símismo.datos_reg_err is None:
-                        símismo.datos_reg_err = bd_pds_temp
-                    else:
-                        símismo.datos_reg_err.append(bd_pds_temp, ignore_index=True)
+        símismo.datos_ind, símismo.datos_reg, símismo.datos_reg_err = [
+            pd.concat(marcos[m], ignore_index=True, sort=False) if len(marcos[m]) else None
+            for m in ['ind', 'reg', 'err']
+        ]
 
         símismo.bd_lista = True
 
@@ -427,12 +580,11 @@ class SuperBD(object):
                 elif isinstance(f, int):
                     fechas[í] = ft.date(year=f, month=1, day=1)
 
-        # Actualizar las bases de datos, si necesario
-        if not símismo.bd_lista:
-            símismo._gen_bd_intern()
+        # Agregar los datos de bases de datos filtrables, ya filtrados por lugar y por fecha
+        marcos = símismo._juntar_filtrables(l_vars, lugar=lugar, datos=datos, fechas=fechas)
 
         egr = [None, None, None]
-        for í, bd in enumerate([símismo.datos_reg, símismo.datos_ind, símismo.datos_reg_err]):
+        for í, bd in enumerate([marcos['reg'], marcos['ind'], marcos['err']]):
 
             if bd is not None:
                 l_vars_disp = [v for v in l_vars if v in bd]
@@ -442,7 +594,7 @@ class SuperBD(object):
                     bd_sel = bd_sel[bd_sel['bd'].isin(datos)]
 
                 if fechas is not None:
-                    bd_sel = bd_sel[bd_sel['fecha'].isin(fechas)]  # Arreglarme
+                    bd_sel = bd_sel[bd_sel['fecha'].isin(pd.to_datetime(fechas))]
 
                 if lugar is not None:
                     bd_sel = bd_sel[bd_sel['lugar'].isin(lugar)]
@@ -456,56 +608,107 @@ class SuperBD(object):
 
         return {'regional': egr[0], 'error_regional': egr[2], 'individual': egr[1]}
 
+    def _juntar_filtrables(símismo, l_vars, lugar=None, datos=None, fechas=None):
+        """
+        Junta los datos en memoria con los de las bases de datos filtrables, que se leen para cada consulta.
+
+        :param l_vars: Los variables de interés.
+        :type l_vars: list[str]
+        :param lugar: Los lugares de interés, o ``None`` para todos.
+        :type lugar: list[str]
+        :param datos: Las bases de datos de interés, o ``None`` para todas.
+        :type datos: list[str]
+        :param fechas: Las fechas de interés, o ``None`` para todas.
+        :type fechas: list[ft.date]
+        :return: Los marcos de datos ``'reg'``, ``'ind'`` y ``'err'`` (``None`` si no hay datos).
+        :rtype: dict[str, pd.DataFrame]
+        """
+
+        # Actualizar las bases de datos, si necesario
+        if not símismo.bd_lista:
+            símismo._gen_bd_intern()
+
+        marcos = {'reg': [símismo.datos_reg], 'ind': [símismo.datos_ind], 'err': [símismo.datos_reg_err]}
+        for nb, bd in símismo.bds.items():
+            if bd.filtrable and (datos is None or nb in datos):
+                for m, marco in símismo._obt_filtrados(nb, bd, l_vars=l_vars, lugar=lugar, fechas=fechas).items():
+                    marcos[m].append(marco)
+
+        return {
+            m: pd.concat([x for x in l if x is not None], ignore_index=True, sort=False)
+            if any(x is not None for x in l) else None
+            for m, l in marcos.items()
+        }
+
+    def _obt_filtrados(símismo, nb, bd, l_vars, lugar=None, fechas=None):
+        """
+        Obtiene los datos de una base de datos filtrable, filtrados en la base de datos misma.
+
+        :param nb: El nombre de la base de datos.
+        :type nb: str
+        :param bd: La base de datos.
+        :type bd: Datos
+        :param l_vars: Los variables de interés.
+        :type l_vars: list[str]
+        :param lugar: Los lugares de interés.
+        :type lugar: list[str]
+        :param fechas: Las fechas de interés.
+        :type fechas: list[ft.date]
+        :return: Los marcos de datos (``'ind'``, o ``'reg'`` y ``'err'``).
+        :rtype: dict[str, pd.DataFrame]
+        """
+
+        fuentes = {v: símismo.vars[v]['fuente'][nb] for v in l_vars if nb in símismo.vars[v]['fuente']}
+        if not len(fuentes):
+            return {}
+
+        región = isinstance(bd, DatosRegión)
+
+        cols = [f['var'] for f in fuentes.values()]
+        if región:
+            cols += [f['col_error'] for f in fuentes.values() if f.get('col_error') is not None]
+            if bd.tmñ_muestra is not None:
+                cols.append(bd.tmñ_muestra)
+        cols = list(dict.fromkeys(cols))
+
+        marco_bd = bd.obt_marco(cols, cód_vacío=[f['cód_vacío'] for f in fuentes.values()], lugares=lugar,
+                                fechas=fechas)
+
+        base = marco_bd[['lugar', 'fecha']].copy()
+        base.insert(0, 'bd', nb)
+
+        marco = pd.DataFrame({v: marco_bd[f['var']].values for v, f in fuentes.items()})
+        marco = pd.concat([marco, base], axis=1)
+        if not región:
+            return {'ind': marco}
+
+        errores = {}
+        for v, f in fuentes.items():
+            if f.get('col_error') is not None:
+                error = marco_bd[f['col_error']].values
+            else:
+                tmñ = marco_bd[bd.tmñ_muestra].values if bd.tmñ_muestra is not None else None
+                error = bd.calc_error(marco_bd[f['var']].values, tmñ) if len(marco_bd) else None
+            errores[v] = np.full(len(marco_bd), np.nan) if error is None else error
+
+        marco_err = pd.concat([pd.DataFrame(errores), base], axis=1)
+
+        return {'reg': marco, 'err': marco_err}
+
     def obt_datos_ind(símismo, l_vars, lugar=None, datos=None, fechas=None, excl_faltan=False):
         res = símismo.obt_datos(l_vars=l_vars, lugar=lugar, datos=datos, fechas=fechas, excl_faltan=excl_faltan)
         return res['individual']
 
     def obt_datos_reg(símismo, l_vars, lugar=None, datos=None, fechas=None, interpolar=True):
+        if not isinstance(l_vars, list):
+            l_vars = [l_vars]
+        if lugar is not None and not isinstance(lugar, list):
+            lugar = [lugar]
+
         res = símismo.obt_datos(l_vars=l_vars, lugar=lugar, datos=datos, fechas=fechas, excl_faltan=False)['regional']
 
         if interpolar:
-            finalizados = None
-            for l in lugar:
-                proms_fecha = res.loc[res['lugar'] == l].groupby(['fecha']).mean()
-                if proms_fecha.shape[0] > 0:
-
-                    # Aplicar valores sin fechas asociadas
-                    sin_fecha = res[res.fecha.isnull()]
-                    if sin_fecha.shape[0] > 0:
-                        proms_sin_fecha = sin_fecha.loc[sin_fecha['lugar'] == l].mean().to_frame().T
-                        proms_fecha.fillna(value={ll: v[0] for ll, v in proms_sin_fecha.to_dict(orient='list').items()},
-                                           inplace=True)
-
-                    mín = proms_fecha.index.min()
-                    máx = proms_fecha.index.max()
-
-                    for v in l_vars:
-                        compl_v = proms_fecha.dropna(subset=[v])[v]
-                        mín_v = compl_v.index.min()
-                        máx_v = compl_v.index.max()
-                        mín = max(mín, mín_v)
-                        máx = min(máx, máx_v)
-
-                    l_fechas_fin = [í for í in proms_fecha.index if mín <= í <= máx]
-
-                    if len(l_fechas_fin):
-                        nuevas_filas = pd.DataFrame(columns=l_vars,
-                                                    index=pd.to_datetime([x for x in l_fechas_fin if x not in proms_fecha.index]))
-                        proms_fecha = proms_fecha.append(nuevas_filas)
-                        proms_fecha = proms_fecha.sort_index()
-                        proms_fecha = proms_fecha.interpolate(method='time')
-                        proms_fecha['lugar'] = l
-                        proms_fecha = proms_fecha.loc[l_fechas_fin]
-                    else:
-                        avisar('No se pudo interpolar entre datos "{}". Nos basaremos simplemente en los datos '
-                               'observados sin tener cuenta de la fecha de observación.'.format(l_vars))
-                        proms_fecha = proms_fecha.sort_index()
-                        proms_fecha.interpolate(limit_direction='both', inplace=True)
-                    if finalizados is None:
-                        finalizados = proms_fecha.dropna(how='any')
-                    else:
-                        finalizados = finalizados.append(proms_fecha.dropna(how='any'))
-            return finalizados
+            return _interpolar_reg(res, l_vars=l_vars)
         else:
             return res
 
@@ -587,14 +790,11 @@ class SuperBD(object):
         if archivo is None:
             raise NotImplementedError  # para hacer
 
-        # Actualizar las bases de datos, si necesario
-        if not símismo.bd_lista:
-            símismo._gen_bd_intern()
-
-        dic = {'ind': símismo.datos_ind.to_json(), 'reg': símismo.datos_reg.to_json(),
-               'err': símismo.datos_reg_err.to_json()}
+        # Incluir los datos de bases de datos filtrables, que no se guardan en memoria
+        marcos = símismo._juntar_filtrables(list(símismo.vars))
+        dic = {m: None if marco is None else marco.to_json() for m, marco in marcos.items()}
 
-        with open(archivo, encoding='UTF-8') as d:
+        with open(archivo, 'w', encoding='UTF-8') as d:
             json.dump(dic, d, ensure_ascii=False)
 
     def cargar_datos(símismo, archivo=None):
@@ -612,13 +812,12 @@ class SuperBD(object):
         if directorio is None:
             raise NotImplementedError  # para hacer
 
-        # Actualizar las bases de datos, si necesario
-        if not símismo.bd_lista:
-            símismo._gen_bd_intern()
+        # Incluir los datos de bases de datos filtrables, que no se guardan en memoria
+        marcos = símismo._juntar_filtrables(list(símismo.vars))
 
-        for nmb, bd_pd in {'ind': símismo.datos_ind, 'reg': símismo.datos_reg, 'error_reg': símismo.datos_reg_err}:
-            archivo = os.path.join(directorio, nmb + '.csv')
-            bd_pd.to_csv(archivo)
+        for nmb, m in {'ind': 'ind', 'reg': 'reg', 'error_reg': 'err'}.items():
+            if marcos[m] is not None:
+                marcos[m].to_csv(os.path.join(directorio, nmb + '.csv'))
 
     def guardar(símismo, archivo=None):
         if archivo is None:
@@ -655,6 +854,109 @@ class SuperBD(object):
         return superbd
 
 
+def _interpolar_reg(res, l_vars):
+    """
+    Calcula los promedios de datos regionales por lugar y por fecha, y los interpola en el tiempo, para todos los
+    lugares a la vez.
+
+    Para cada lugar, los valores sin fecha llenan los valores que faltan, y se guardan únicamente las fechas entre
+    la primera y la última fecha con datos para todos los variables. Los valores que faltan en este rango se
+    interpolan según la fecha. Si no hay fecha con datos para todos los variables, se interpolan según el orden de
+    las observaciones sin tener en cuenta la fecha.
+
+    :param res: Los datos regionales, con columnas de variables, de lugar y de fecha.
+    :type res: pd.DataFrame
+    :param l_vars: Los variables de interés.
+    :type l_vars: list[str]
+    :return: Los datos interpolados, con las fechas en el índice.
+    :rtype: pd.DataFrame
+    """
+
+    if res is None:
+        return None
+
+    # Promedios por lugar y fecha
+    con_fecha = res[res['fecha'].notnull()]
+    proms = con_fecha.groupby(['lugar', 'fecha'])[l_vars].mean()
+    if not len(proms):
+        return None
+
+    í_lugar = proms.index.get_level_values('lugar')
+    fechas = proms.index.get_level_values('fecha')
+
+    # Aplicar valores sin fechas asociadas
+    sin_fecha = res[res['fecha'].isnull()]
+    if len(sin_fecha):
+        relleno = sin_fecha.groupby('lugar')[l_vars].mean().reindex(í_lugar)
+        relleno.index = proms.index
+        proms = proms.fillna(relleno)
+
+    # El rango de fechas con datos para todos los variables, para cada lugar
+    fechas_válidas = pd.DataFrame({v: fechas.where(proms[v].notnull()) for v in l_vars}, index=proms.index)
+    por_lugar = fechas_válidas.groupby(level='lugar')
+    mín = por_lugar.min().max(axis=1, skipna=False).reindex(í_lugar).values
+    máx = por_lugar.max().min(axis=1, skipna=False).reindex(í_lugar).values
+
+    en_rango = pd.Series((fechas.values >= mín) & (fechas.values <= máx), index=proms.index)
+    con_rango = en_rango.groupby(level='lugar').transform('any').values
+
+    if not con_rango.all():
+        avisar('No se pudo interpolar entre datos "{}" para los lugares {}. Nos basaremos simplemente en los datos '
+               'observados sin tener cuenta de la fecha de observación.'
+               .format(l_vars, ', '.join(str(x) for x in í_lugar[~con_rango].unique())))
+
+    # Interpolar, con el tiempo donde hay rango común y con el orden de las observaciones donde no hay.
+    códs_lugar = pd.factorize(í_lugar)[0]
+    x = np.where(con_rango, fechas.values.astype('datetime64[ns]').astype(np.int64), np.arange(len(proms)))
+    for v in l_vars:
+        proms[v] = _interpolar_grupos(proms[v].values, x=x.astype(float), grupos=códs_lugar)
+
+    finalizados = proms[en_rango.values | ~con_rango].reset_index(level='lugar')
+    finalizados = finalizados[l_vars + ['lugar']].dropna(how='any')
+
+    return finalizados
+
+
+def _interpolar_grupos(y, x, grupos):
+    """
+    Interpola linealmente los valores que faltan en ``y`` según ``x``, dentro de cada grupo. Los valores que faltan
+    antes del primer valor o después del último valor de un grupo toman el valor más cercano.
+
+    :param y: Los valores, ordenados por grupo y después por ``x``.
+    :type y: np.ndarray
+    :param x: Las coordenadas de los valores.
+    :type x: np.ndarray
+    :param grupos: El código del grupo de cada valor.
+    :type grupos: np.ndarray
+    :return: Los valores interpolados.
+    :rtype: np.ndarray
+    """
+
+    y = y.astype(float)
+    faltan = np.isnan(y)
+    if not faltan.any():
+        return y
+
+    # La posición del valor válido anterior y siguiente en el mismo grupo
+    pos = pd.Series(np.where(faltan, np.nan, np.arange(len(y))))
+    ant = pos.groupby(grupos).ffill().values
+    sig = pos.groupby(grupos).bfill().values
+
+    i_ant = np.where(np.isnan(ant), sig, ant)
+    i_sig = np.where(np.isnan(sig), ant, sig)
+    válidos = ~np.isnan(i_ant)
+    i_ant = i_ant[válidos].astype(int)
+    i_sig = i_sig[válidos].astype(int)
+
+    dx = x[i_sig] - x[i_ant]
+    frac = np.divide(x[válidos] - x[i_ant], dx, out=np.zeros_like(dx), where=dx != 0)
+
+    interpol = np.full_like(y, np.nan)
+    interpol[válidos] = y[i_ant] + (y[i_sig] - y[i_ant]) * frac
+
+    return np.where(faltan, interpol, y)
+
+
 def _gen_bd(archivo):
     """
 
@@ -666,19 +968,44 @@ def _gen_bd(archivo):
     ext = os.path.splitext(archivo)[1]
     if ext == '.txt' or ext == '.csv':
         return BDtexto(archivo)
-    elif ext == '.sql':
+    elif ext in ['.sql', '.sqlite', '.db']:
         return BDsql(archivo)
     else:
         raise ValueError
 
 
+def _fechas_a_pd(fechas):
+    """
+    Convierte las fechas de una base de datos al formato de Pandas.
+
+    :param fechas: Las fechas, tal como devueltas por :meth:`BD.obt_fechas`, una fecha única, o ``None``.
+    :type fechas: (ft.date, np.ndarray) | ft.date | None
+    :return: Las fechas.
+    :rtype: pd.DatetimeIndex | pd.Timestamp | None
+    """
+
+    if isinstance(fechas, tuple):
+        if fechas[0] is not None:
+            return pd.to_datetime(fechas[0]) + pd.to_timedelta(fechas[1], unit='D')
+        else:
+            return pd.to_datetime(['{}-1-1'.format(str(x)) for x in fechas[1]])
+    elif fechas is None:
+        return None
+    else:
+        return pd.to_datetime(fechas)
+
+
 class BD(object):
     """
     Una superclase para lectores de bases de datos.
     """
 
+    # Si la base de datos puede filtrar sus observaciones ella misma (ver :meth:`obt_datos_filtrados`).
+    filtrable = False
+
     def __init__(símismo, archivo):
         símismo.archivo = archivo
+        símismo._formatos_fecha = {}
 
         if not os.path.isfile(archivo):
             raise FileNotFoundError
@@ -727,8 +1054,12 @@ class BD(object):
         # Sacar la lista de fechas en formato texto
         fechas_tx = símismo.obt_datos_tx(cols=cols)
 
+        # Detectar el formato de las fechas, si no lo conocemos ya para esta columna
+        if cols not in símismo._formatos_fecha:
+            símismo._formatos_fecha[cols] = símismo._detectar_formato_fecha(fechas_tx)
+
         # Procesar la lista de fechas
-        fch_inic_datos, v_núm = símismo._leer_fechas(lista_fechas=fechas_tx)
+        fch_inic_datos, v_núm = símismo._leer_fechas(lista_fechas=fechas_tx, formato=símismo._formatos_fecha[cols])
 
         # Devolver información importante
         return fch_inic_datos, v_núm
@@ -741,99 +1072,192 @@ class BD(object):
         """
         raise NotImplementedError
 
-    @staticmethod
-    def _leer_fechas(lista_fechas):
+    def obt_formato_fecha(símismo, col):
         """
-        Esta función toma una lista de datos de fecha en formato de texto y detecta 1) la primera fecha de la lista,
-        y 2) la posición relativa de cada fecha a esta.
+        Devuelve el formato de las fechas de una columna, detectándolo con sus valores distintos si no se conoce ya.
 
-        :param lista_fechas: Una lista con las fechas en formato de texto
-        :type lista_fechas: list
+        :param col: La columna de fechas.
+        :type col: str
+        :return: El formato, o ``None`` si las fechas son simplemente numéricas.
+        :rtype: str | None
+        """
 
-        :return: Un tuple de la primera fecha y del vector numpy de la posición de cada fecha relativa a la primera.
-        :rtype: (ft.date, np.ndarray)
+        if col not in símismo._formatos_fecha:
+            símismo._formatos_fecha[col] = símismo._detectar_formato_fecha(símismo._valores_únicos_tx(col))
+
+        return símismo._formatos_fecha[col]
+
+    def _valores_únicos_tx(símismo, col):
+        return list(dict.fromkeys(símismo.obt_datos_tx(cols=col)))
+
+    def obt_datos_filtrados(símismo, cols, cols_tx, cód_vacío=None, filtros=None):
+        """
+        Obtiene los datos de las observaciones que corresponden a los filtros, en una sola consulta. Únicamente
+        para bases de datos :attr:`filtrable`.
+
+        :param cols: Las columnas que hay que convertir en números.
+        :type cols: list[str]
+        :param cols_tx: Las columnas que hay que devolver en formato de texto.
+        :type cols_tx: list[str]
+        :param cód_vacío: Los códigos de valores que faltan.
+        :type cód_vacío: set
+        :param filtros: Los valores permitidos para ciertas columnas.
+        :type filtros: dict[str, list]
+        :return: La matriz de datos numéricos, con una fila por columna, y las columnas de texto.
+        :rtype: (np.ndarray, dict[str, list[str]])
+        """
+        raise NotImplementedError
 
+    def indexar(símismo, col, código=False):
         """
+        Prepara una columna para filtros rápidos. No hace nada para bases de datos que no son :attr:`filtrable`.
 
-        # Una lista de lso formatos de fecha posibles. Esta función intentará de leer los datos de fechas con cada
-        # formato en esta lista y, si encuentra un que funciona, parará allí.
-        separadores = ['-', '/', ' ', '.']
+        :param col: La columna.
+        :type col: str
+        :param código: Si la columna contiene códigos de lugares, que se comparan sin espacios ni 0's en frente.
+        :type código: bool
+        """
+        pass
 
-        f = ['%d{0}%m{0}%y', '%m{0}%d{0}%y', '%d{0}%m{0}%Y', '%m{0}%d{0}%Y',
-             '%d{0}%b{0}%y', '%m{0}%b{0}%y', '%d{0}%b{0}%Y', '%b{0}%d{0}%Y',
-             '%d{0}%B{0}%y', '%m{0}%B{0}%y', '%d{0}%B{0}%Y', '%m{0}%B{0}%Y',
-             '%y{0}%m{0}%d', '%y{0}%d{0}%m', '%Y{0}%m{0}%d', '%Y{0}%d{0}%m',
-             '%y{0}%b{0}%d', '%y{0}%d{0}%b', '%Y{0}%b{0}%d', '%Y{0}%d{0}%b',
-             '%y{0}%B{0}%d', '%y{0}%d{0}%B', '%Y{0}%B{0}%d', '%Y{0}%d{0}%B']
+    def estab_col_código(símismo, col):
+        """
+        Indica que una columna contiene códigos de lugares, que se filtran sin espacios ni 0's en frente.
 
-        formatos_posibles = [x.format(s) for s in separadores for x in f]
+        :param col: La columna.
+        :type col: str
+        """
+        pass
+
+    def fechas_a_tx(símismo, col, fechas):
+        """
+        Convierte fechas al formato de texto de una columna de la base de datos, para poder filtrarla.
+
+        :param col: La columna de fechas.
+        :type col: str
+        :param fechas: Las fechas.
+        :type fechas: list[ft.date]
+        :return: Las fechas en formato de texto, o ``None`` si no se pueden convertir de manera segura.
+        :rtype: list[str] | None
+        """
+        return None
+
+    @staticmethod
+    def _detectar_formato_fecha(lista_fechas, n_muestra=50):
+        """
+        Detecta el formato de una lista de fechas en formato de texto. Cada formato posible se prueba primero con
+        una muestra de las fechas; únicamente los formatos que funcionan con la muestra se verifican con la lista
+        entera.
+
+        :param lista_fechas: Una lista con las fechas en formato de texto
+        :type lista_fechas: list
+        :param n_muestra: El tamaño de la muestra.
+        :type n_muestra: int
+        :return: El formato de las fechas, o ``None`` si las fechas son simplemente numéricas.
+        :rtype: str | None
+        """
 
         # Primero, si los datos de fechas están en formato simplemente numérico...
         if all([x.isdigit() for x in lista_fechas]):
+            return None
 
-            # Entonces, no conocemos la fecha inicial
-            fecha_inic_datos = None
+        # Una muestra distribuida por toda la lista
+        muestra = lista_fechas[::max(1, len(lista_fechas) // n_muestra)]
+        únicas = pd.unique(pd.Series(lista_fechas, dtype=object))
 
-            # Convertir a vector Numpy
-            vec_fch_núm = np.array(lista_fechas, dtype=int)
+        for formato in formatos_fecha:
+            try:
+                for x in muestra:
+                    ft.datetime.strptime(x, formato)
+            except ValueError:
+                continue
 
-        else:
-            # Sino, intentar de leer el formato de fecha
-            fechas = None
+            # Verificar con todas las fechas, a la vez.
+            if not pd.to_datetime(pd.Series(únicas), format=formato, errors='coerce').isnull().any():
+                return formato
 
-            # Intentar con cada formato en la lista de formatos posibles
-            for formato in formatos_posibles:
+        # Si todavía no lo hemos logrado, tenemos un problema.
+        raise ValueError('No puedo leer los datos de fechas. ¿Mejor le eches un vistazo a tu base de datos?')
 
-                try:
-                    # Intentar de convertir todas las fechas a objetos ft.datetime
-                    fechas = [ft.datetime.strptime(x, formato).date() for x in lista_fechas]
+    @staticmethod
+    def _leer_fechas(lista_fechas, formato=None):
+        """
+        Esta función toma una lista de datos de fecha en formato de texto y detecta 1) la primera fecha de la lista,
+        y 2) la posición relativa de cada fecha a esta.
 
-                    # Si funcionó, parar aquí
-                    break
+        :param lista_fechas: Una lista con las fechas en formato de texto
+        :type lista_fechas: list
 
-                except ValueError:
-                    # Si no funcionó, intentar el próximo formato
-                    continue
+        :param formato: El formato de las fechas. Si ``None``, se detectará automáticamente.
+        :type formato: str
 
-            # Si todavía no lo hemos logrado, tenemos un problema.
-            if fechas is None:
-                raise ValueError(
-                    'No puedo leer los datos de fechas. ¿Mejor le eches un vistazo a tu base de datos?')
+        :return: Un tuple de la primera fecha y del vector numpy de la posición de cada fecha relativa a la primera.
+        :rtype: (ft.date, np.ndarray)
 
-            else:
-                # Pero si está bien, ya tenemos que encontrar la primera fecha y calcular la posición relativa de las
-                # otras con referencia en esta.
+        """
 
-                # La primera fecha de la base de datos. Este paso se queda un poco lento, así que para largas bases de
-                # datos podría ser útil suponer que la primera fila también contiene la primera fecha.
-                fecha_inic_datos = min(fechas)
+        if formato is None:
+            formato = BD._detectar_formato_fecha(lista_fechas)
 
-                # Si tenemos prisa, mejor lo hagamos así:
-                # fecha_inic_datos = min(fechas[0], fechas[-1])
+        if formato is None:
+            # Si los datos de fechas están en formato simplemente numérico, no conocemos la fecha inicial
+            fecha_inic_datos = None
 
-                # La posición relativa de todas las fechas a esta
-                lista_fechas = [(x - fecha_inic_datos).days for x in fechas]
+            # Convertir a vector Numpy
+            vec_fch_núm = np.array(lista_fechas, dtype=int)
+
+        else:
+            # Convertir todas las fechas a la vez. Las bases de datos suelen tener muchas observaciones por fecha, así
+            # que convertimos cada fecha distinta una sola vez.
+            códs, únicas = pd.factorize(pd.Series(lista_fechas, dtype=object))
+            fechas = pd.to_datetime(pd.Series(únicas), format=formato).dt.normalize()
 
-                # Convertir a vector Numpy
-                vec_fch_núm = np.array(lista_fechas, dtype=int)
+            # Encontrar la primera fecha y calcular la posición relativa de las otras con referencia en esta.
+            primera = fechas.min()
+            fecha_inic_datos = primera.date()
+            vec_fch_núm = (fechas - primera).dt.days.values.astype(int)[códs]
 
         return fecha_inic_datos, vec_fch_núm
 
 
+# Una lista de los formatos de fecha posibles, en orden de preferencia.
+formatos_fecha = [
+    x.format(sep) for sep in ['-', '/', ' ', '.'] for x in [
+        '%d{0}%m{0}%y', '%m{0}%d{0}%y', '%d{0}%m{0}%Y', '%m{0}%d{0}%Y',
+        '%d{0}%b{0}%y', '%m{0}%b{0}%y', '%d{0}%b{0}%Y', '%b{0}%d{0}%Y',
+        '%d{0}%B{0}%y', '%m{0}%B{0}%y', '%d{0}%B{0}%Y', '%m{0}%B{0}%Y',
+        '%y{0}%m{0}%d', '%y{0}%d{0}%m', '%Y{0}%m{0}%d', '%Y{0}%d{0}%m',
+        '%y{0}%b{0}%d', '%y{0}%d{0}%b', '%Y{0}%b{0}%d', '%Y{0}%d{0}%b',
+        '%y{0}%B{0}%d', '%y{0}%d{0}%B', '%Y{0}%B{0}%d', '%Y{0}%d{0}%B'
+    ]
+]
+
+
 class BDtexto(BD):
     """
     Una clase para leer bases de datos en formato texto delimitado por comas (.csv).
+
+    El archivo se lee una sola vez, en columnas de texto que se guardan en memoria; las columnas convertidas en
+    números también se guardan, así que varias llamadas a :meth:`obt_datos` no vuelven a leer el archivo. Si el
+    archivo cambia, se leerá de nuevo.
     """
 
+    def __init__(símismo, archivo):
+        símismo._llave_caché = None
+        símismo._nombres_cols = None  # type: list[str]
+        símismo._cols_tx = None  # type: dict[str, np.ndarray]
+        símismo._cols_núm = {}
+        símismo._lenguas = {}
+
+        super().__init__(archivo)
+
     def calc_n_obs(símismo):
         """
 
         :rtype: int
         """
-        with open(símismo.archivo) as d:
-            n_filas = sum(1 for f in d if len(f)) - 1  # Sustrayemos la primera fila
 
-        return n_filas
+        símismo._leer()
+        return len(next(iter(símismo._cols_tx.values()))) if len(símismo._cols_tx) else 0
 
     def obt_datos(símismo, cols, prec_dec=None, cód_vacío=None):
         """
@@ -849,16 +1273,15 @@ class BDtexto(BD):
             cols = [cols]
 
         if cód_vacío is None:
-            cód_vacío = ['']
+            cód_vacío = {''}
         elif not isinstance(cód_vacío, set):
             cód_vacío = set(cód_vacío)
 
-        m_datos = np.empty((len(cols), símismo.n_obs))
+        símismo._leer()
 
-        with open(símismo.archivo) as d:
-            lector = csv.DictReader(d)
-            for n_f, f in enumerate(lector):
-                m_datos[:, n_f] = [tx_a_núm(f[c]) if f[c] not in cód_vacío else np.nan for c in cols]
+        m_datos = np.empty((len(cols), símismo.n_obs))
+        for í, c in enumerate(cols):
+            m_datos[í] = símismo._obt_col_núm(c, cód_vacío=cód_vacío)
 
         if len(cols) == 1:
             m_datos = m_datos[0]
@@ -882,13 +1305,9 @@ class BDtexto(BD):
         if not isinstance(cols, list):
             cols = [cols]
 
-        l_datos = [[''] * símismo.n_obs] * len(cols)
+        símismo._leer()
 
-        with open(símismo.archivo) as d:
-            lector = csv.DictReader(d)
-            for n_f, f in enumerate(lector):
-                for i_c, c in enumerate(cols):
-                    l_datos[i_c][n_f] = f[c]
+        l_datos = [símismo._cols_tx[c].tolist() for c in cols]
 
         if len(cols) == 1:
             l_datos = l_datos[0]
@@ -902,53 +1321,359 @@ class BDtexto(BD):
         :rtype: list[str]
         """
 
-        with open(símismo.archivo) as d:
-            lector = csv.reader(d)
+        símismo._leer()
 
+        return list(símismo._nombres_cols)
+
+    def _leer(símismo):
+        """
+        Lee el archivo entero en columnas de texto, si no se ha leído ya desde su última modificación.
+        """
+
+        estado = os.stat(símismo.archivo)
+        llave = (estado.st_mtime_ns, estado.st_size)
+        if llave == símismo._llave_caché:
+            return
+
+        with open(símismo.archivo, newline='') as d:
+            lector = csv.reader(d)
             nombres_cols = next(lector)
+            filas = [f for f in lector if len(f)]
 
-        return nombres_cols
+        n_cols = len(nombres_cols)
+        cols = zip_longest(*filas, fillvalue='') if filas else [()] * n_cols
+
+        símismo._nombres_cols = nombres_cols
+        símismo._cols_tx = {c: np.array(v, dtype=object) for c, v in zip(nombres_cols, cols)}
+        símismo._cols_núm.clear()
+        símismo._lenguas.clear()
+        símismo._formatos_fecha.clear()
+        símismo._llave_caché = llave
+        símismo.n_obs = len(filas)
+
+    def _obt_col_núm(símismo, col, cód_vacío):
+        """
+        Convierte una columna en números. Los números ASCII se convierten todos a la vez; únicamente las celdas que
+        no se pudieron convertir así pasan por :func:`~tinamit.Incertidumbre.Números.tx_a_núm_vec`, con la lengua
+        detectada para la columna.
+
+        :param col: El nombre de la columna.
+        :type col: str
+        :param cód_vacío: Los códigos de valores que faltan.
+        :type cód_vacío: set
+        :return: Los valores de la columna.
+        :rtype: np.ndarray
+        """
+
+        llave = (col, frozenset(cód_vacío))
+        if llave in símismo._cols_núm:
+            return símismo._cols_núm[llave]
+
+        tx = símismo._cols_tx[col]
+        vacíos = np.isin(tx, list(cód_vacío))
+
+        núms = pd.to_numeric(tx, errors='coerce').astype(float)
+        núms[vacíos] = np.nan
+
+        fallidos = np.flatnonzero(np.isnan(núms) & ~vacíos)
+        if len(fallidos):
+            if símismo._lenguas.get(col) is None:
+                símismo._lenguas[col] = detectar_lengua(tx[fallidos])
+            núms[fallidos] = tx_a_núm_vec(tx[fallidos], lengua=símismo._lenguas[col])
+
+        símismo._cols_núm[llave] = núms
+        return núms
 
 
 class BDsql(BD):
     """
-    Una clase para leer bases de datos en formato SQL.
+    Una clase para leer bases de datos SQLite. Las observaciones se filtran en la base de datos misma (con índices
+    en las columnas de lugar y de fecha, si se piden con :meth:`Datos.indexar`), y se leen por lotes, así que nunca
+    hay que guardar la base de datos entera en la memoria.
+
+    Si el archivo es un script SQL (texto) en vez de una base de datos SQLite, el script se ejecuta una vez en una
+    base de datos SQLite al lado del archivo, que se vuelve a generar si el script cambia.
     """
 
+    filtrable = True
+
+    def __init__(símismo, archivo, tabla=None, tmñ_lote=10000):
+        """
+
+        :param archivo: El archivo de la base de datos.
+        :type archivo: str
+        :param tabla: La tabla de la base de datos. Si ``None``, se usará la primera.
+        :type tabla: str
+        :param tmñ_lote: El número de filas que leer a la vez.
+        :type tmñ_lote: int
+        """
+
+        símismo._tabla = tabla
+        símismo.tmñ_lote = tmñ_lote
+        símismo._con = None  # type: sqlite3.Connection
+        símismo._cols_código = set()
+
+        super().__init__(archivo)
+
+    @property
+    def archivo_sqlite(símismo):
+        with open(símismo.archivo, 'rb') as d:
+            if d.read(16) == b'SQLite format 3\x00':
+                return símismo.archivo
+
+        return os.path.splitext(símismo.archivo)[0] + '.tinamit.sqlite'
+
+    @property
+    def tabla(símismo):
+        if símismo._tabla is None:
+            tablas = [
+                t for t, in símismo._conectar().execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+                )
+            ]
+            if not len(tablas):
+                raise ValueError(_('La base de datos "{}" no contiene tablas.').format(símismo.archivo))
+            símismo._tabla = tablas[0]
+
+        return símismo._tabla
+
     def calc_n_obs(símismo):
         """
 
         :return:
-        :rtype:
+        :rtype: int
         """
-        raise NotImplementedError
 
-    def obt_datos(símismo, cols, prec_dec=None):
+        return símismo._conectar().execute('SELECT COUNT(*) FROM {}'.format(_nmb_sql(símismo.tabla))).fetchone()[0]
+
+    def obt_datos(símismo, cols, prec_dec=None, cód_vacío=None):
         """
 
         :param cols:
-        :type cols:
+        :type cols: str | list[str]
         :param prec_dec:
-        :type prec_dec:
+        :type prec_dec: int
         :return:
-        :rtype:
+        :rtype: np.ndarray
         """
-        raise NotImplementedError
+
+        if not isinstance(cols, list):
+            cols = [cols]
+
+        m_datos = símismo.obt_datos_filtrados(cols=cols, cols_tx=[], cód_vacío=cód_vacío)[0]
+
+        if len(cols) == 1:
+            m_datos = m_datos[0]
+
+        if prec_dec is not None:
+            if prec_dec == 0:
+                m_datos = m_datos.astype(int)
+            else:
+                m_datos.round(prec_dec, out=m_datos)
+
+        return m_datos
 
     def obt_datos_tx(símismo, cols):
         """
 
         :param cols:
-        :type cols:
+        :type cols: list[str] | str
         :return:
-        :rtype:
+        :rtype: list
         """
-        raise NotImplementedError
+
+        if not isinstance(cols, list):
+            cols = [cols]
+
+        d_tx = símismo.obt_datos_filtrados(cols=[], cols_tx=cols)[1]
+        l_datos = [d_tx[c] for c in cols]
+
+        if len(cols) == 1:
+            l_datos = l_datos[0]
+
+        return l_datos
 
     def obt_nombres_cols(símismo):
         """
 
         :return:
-        :rtype:
+        :rtype: list[str]
         """
-        raise NotImplementedError
+
+        return [c[1] for c in símismo._conectar().execute('PRAGMA table_info({})'.format(_nmb_sql(símismo.tabla)))]
+
+    def obt_datos_filtrados(símismo, cols, cols_tx, cód_vacío=None, filtros=None):
+        if cód_vacío is None:
+            cód_vacío = {''}
+
+        todas = list(dict.fromkeys(cols + cols_tx))
+        con = símismo._conectar()
+        condición, params = símismo._filtro_sql(con, filtros)
+
+        cursor = con.execute(
+            'SELECT {} FROM {}{}'.format(', '.join(_nmb_sql(c) for c in todas), _nmb_sql(símismo.tabla), condición),
+            params
+        )
+
+        # Leer por lotes, convirtiendo cada lote en matrices NumPy
+        lotes_núm = {c: [] for c in cols}
+        lotes_tx = {c: [] for c in cols_tx}
+        while True:
+            filas = cursor.fetchmany(símismo.tmñ_lote)
+            if not filas:
+                break
+            lote = np.empty((len(filas), len(todas)), dtype=object)
+            lote[:] = filas
+
+            for c in cols:
+                lotes_núm[c].append(_a_núm(lote[:, todas.index(c)], cód_vacío=cód_vacío))
+            for c in cols_tx:
+                lotes_tx[c].extend('' if x is None else str(x) for x in lote[:, todas.index(c)])
+
+        m_datos = np.array([np.concatenate(lotes_núm[c]) if lotes_núm[c] else np.array([]) for c in cols])
+        if not len(cols):
+            m_datos = np.empty((0, 0))
+
+        return m_datos, lotes_tx
+
+    def indexar(símismo, col, código=False):
+        if código:
+            símismo.estab_col_código(col)
+
+        nombre = 'tinamit_{}_{}{}'.format(símismo.tabla, col, '_código' if código else '')
+        try:
+            con = símismo._conectar()
+            con.execute('CREATE INDEX IF NOT EXISTS {} ON {}({})'.format(
+                _nmb_sql(nombre), _nmb_sql(símismo.tabla), símismo._expr_col(col, código=código)
+            ))
+            con.commit()
+        except sqlite3.OperationalError as e:
+            avisar(_('No se pudo crear un índice para la columna "{}" de la base de datos "{}": {}')
+                   .format(col, símismo.archivo, e))
+
+    def estab_col_código(símismo, col):
+        símismo._cols_código.add(col)
+
+    def fechas_a_tx(símismo, col, fechas):
+        formato = símismo.obt_formato_fecha(col)
+        fechas = pd.to_datetime(fechas)
+
+        if formato is None:
+            # Fechas numéricas (años)
+            return [str(f.year) for f in fechas if f.month == 1 and f.day == 1]
+
+        # Únicamente podemos filtrar si la base de datos escribe cada fecha de una sola manera.
+        muestra = símismo._conectar().execute(
+            'SELECT DISTINCT {} FROM {} LIMIT 50'.format(_nmb_sql(col), _nmb_sql(símismo.tabla))
+        )
+        if any(ft.datetime.strptime(str(x), formato).strftime(formato) != str(x) for x, in muestra):
+            return None
+
+        return [f.strftime(formato) for f in fechas]
+
+    def _valores_únicos_tx(símismo, col):
+        return [
+            '' if x is None else str(x) for x, in símismo._conectar().execute(
+                'SELECT DISTINCT {} FROM {}'.format(_nmb_sql(col), _nmb_sql(símismo.tabla))
+            )
+        ]
+
+    def _expr_col(símismo, col, código=None):
+        if código is None:
+            código = col in símismo._cols_código
+        return "LTRIM(TRIM({}), '0')".format(_nmb_sql(col)) if código else _nmb_sql(col)
+
+    def _filtro_sql(símismo, con, filtros):
+        """
+        Genera la condición ``WHERE`` de SQL para unos filtros.
+
+        :param con: La conexión a la base de datos.
+        :type con: sqlite3.Connection
+        :param filtros: Los valores permitidos para ciertas columnas.
+        :type filtros: dict[str, list]
+        :return: La condición y sus parámetros.
+        :rtype: (str, list)
+        """
+
+        if not filtros:
+            return '', []
+
+        condiciones = []
+        params = []
+        for í, (col, vals) in enumerate(filtros.items()):
+            vals = list(dict.fromkeys(vals))
+            expr = símismo._expr_col(col)
+
+            if len(vals) <= 500:
+                condiciones.append('{} IN ({})'.format(expr, ', '.join('?' * len(vals))) if vals else '0')
+                params.extend(vals)
+            else:
+                # SQLite limita el número de parámetros; para listas largas usamos una tabla temporaria.
+                tabla_tmp = '_tinamit_filtro_{}'.format(í)
+                con.execute('CREATE TEMP TABLE IF NOT EXISTS {} (v)'.format(tabla_tmp))
+                con.execute('DELETE FROM {}'.format(tabla_tmp))
+                con.executemany('INSERT INTO {} VALUES (?)'.format(tabla_tmp), [(v,) for v in vals])
+                condiciones.append('{} IN (SELECT v FROM {})'.format(expr, tabla_tmp))
+
+        return ' WHERE ' + ' AND '.join(condiciones), params
+
+    def _conectar(símismo):
+        if símismo._con is None:
+            archivo = símismo.archivo_sqlite
+
+            if archivo != símismo.archivo and (
+                    not os.path.isfile(archivo) or os.path.getmtime(archivo) < os.path.getmtime(símismo.archivo)
+            ):
+                símismo._importar_script(archivo)
+
+            símismo._con = sqlite3.connect(archivo)
+
+        return símismo._con
+
+    def _importar_script(símismo, archivo):
+        if os.path.isfile(archivo):
+            os.remove(archivo)
+
+        with open(símismo.archivo, encoding='UTF-8') as d:
+            script = d.read()
+
+        con = sqlite3.connect(archivo)
+        try:
+            con.executescript(script)
+            con.commit()
+        finally:
+            con.close()
+
+    def __getstate__(símismo):
+        estado = símismo.__dict__.copy()
+        estado['_con'] = None
+        return estado
+
+
+def _nmb_sql(nombre):
+    return '"{}"'.format(str(nombre).replace('"', '""'))
+
+
+def _a_núm(vals, cód_vacío):
+    """
+    Convierte valores de una base de datos SQL (números, textos o ``None``) en números.
+
+    :param vals: Los valores.
+    :type vals: np.ndarray
+    :param cód_vacío: Los códigos de valores que faltan.
+    :type cód_vacío: set
+    :return: Los números.
+    :rtype: np.ndarray
+    """
+
+    serie = pd.Series(vals, dtype=object)
+    vacíos = (serie.isnull() | serie.isin(cód_vacío)).values
+
+    núms = pd.to_numeric(serie, errors='coerce').values.astype(float)
+    núms[vacíos] = np.nan
+
+    fallidos = np.flatnonzero(np.isnan(núms) & ~vacíos)
+    if len(fallidos):
+        núms[fallidos] = tx_a_núm_vec([str(x) for x in vals[fallidos]])
+
+    return núms
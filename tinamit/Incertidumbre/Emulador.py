@@ -0,0 +1,336 @@
+from copy import deepcopy as copiar_profundo
+from itertools import combinations_with_replacement
+
+import numpy as np
+
+from tinamit import _
+from tinamit.BF import ModeloBF
+
+try:
+    from sklearn.gaussian_process import GaussianProcessRegressor
+    from sklearn.gaussian_process.kernels import ConstantKernel, RBF, WhiteKernel
+except ImportError:
+    GaussianProcessRegressor = ConstantKernel = RBF = WhiteKernel = None
+
+
+class Emulador(ModeloBF):
+    """
+    Un modelo biofísico sustituto (emulador), entrenado con los resultados de corridas del modelo lento. El emulador
+    aprende la transición de un paso del modelo: los egresos al próximo paso en función de los egresos y de los
+    ingresos al paso actual. Así puede reemplazar el modelo lento en :meth:`~tinamit.Conectado.Conectado.estab_bf`,
+    donde los ingresos cambian a cada paso según el otro modelo.
+    """
+
+    def __init__(símismo, variables, unidad_tiempo, vars_ingr=None, vars_egr=None, entrenamiento=None):
+        """
+
+        :param variables: El diccionario de variables del modelo emulado (por ejemplo, ``modelo.variables``).
+        :type variables: dict
+        :param unidad_tiempo: La unidad de tiempo del modelo emulado.
+        :type unidad_tiempo: str
+        :param vars_ingr: Los variables de ingreso del emulador. Si ``None``, se toman los ingresos del modelo.
+        :type vars_ingr: list[str]
+        :param vars_egr: Los variables de egreso del emulador. Si ``None``, se toman los egresos del modelo.
+        :type vars_egr: list[str]
+        :param entrenamiento: El resultado de un entrenamiento anterior (:attr:`Emulador.entrenamiento`).
+        :type entrenamiento: dict
+        """
+
+        símismo._info_vars = {
+            v: {ll: x for ll, x in d.items() if ll != 'val'} for v, d in variables.items()
+        }
+        símismo._unidad_tiempo = unidad_tiempo
+
+        símismo.vars_ingr = [v for v in variables if variables[v]['ingreso']] if vars_ingr is None else vars_ingr
+        símismo.vars_egr = [v for v in variables if variables[v]['egreso']] if vars_egr is None else vars_egr
+
+        # El vector de estado: los egresos, seguidos de los ingresos que no son también egresos.
+        símismo.vars_estado = símismo.vars_egr + [v for v in símismo.vars_ingr if v not in símismo.vars_egr]
+
+        símismo.entrenamiento = entrenamiento
+
+        super().__init__()
+
+    @property
+    def validación(símismo):
+        """
+        Los errores de validación del último entrenamiento (ver :meth:`entrenar`).
+
+        :rtype: dict[str, dict[str, float]]
+        """
+
+        return None if símismo.entrenamiento is None else símismo.entrenamiento['validación']
+
+    def inic_vars(símismo):
+        for v, d in símismo._info_vars.items():
+            símismo.variables[v] = copiar_profundo(d)
+            símismo.variables[v]['val'] = np.zeros(d['dims']) if d.get('dims', (1,)) != (1,) else 0
+
+    def obt_unidad_tiempo(símismo):
+        return símismo._unidad_tiempo
+
+    def entrenar(símismo, datos, método='polinomio', paso=1, fracción_valid=0.2, semilla=None, **ops):
+        """
+        Entrena el emulador con los resultados de corridas del modelo emulado, tales como los devuelve
+        :meth:`~tinamit.Conectado.SuperConectado.simular_paralelo` con ``devolver``, o :func:`datos_de_corridas`.
+
+        :param datos: Las trayectorias de cada variable de estado, con la forma ``{var: [trayectoria de cada
+          corrida]}``. El primer eje de cada trayectoria corresponde al tiempo.
+        :type datos: dict[str, list[np.ndarray] | dict[str, np.ndarray] | np.ndarray]
+        :param método: ``'polinomio'`` (caos polinomial de Legendre) o ``'gp'`` (proceso gaussiano; necesita
+          ``scikit-learn``).
+        :type método: str
+        :param paso: El intervalo de tiempo (en unidades del modelo emulado) entre dos valores de las trayectorias.
+        :type paso: int
+        :param fracción_valid: La fracción de las corridas que se reservan para la validación.
+        :type fracción_valid: float
+        :param semilla: La semilla aleatoria para separar las corridas de entrenamiento y de validación.
+        :type semilla: int
+        :param ops: Opciones para el regresor (``grado`` y ``regul`` para ``'polinomio'``; ``máx_muestras`` para
+          ``'gp'``).
+        :return: Los errores de validación de cada egreso: la raíz del error cuadrático medio de un paso
+          (``'rmse_paso'``) y de trayectorias enteras simuladas con el emulador (``'rmse_trayectoria'``), y esta
+          última normalizada por la desviación estándar del egreso (``'nrmse_trayectoria'``).
+        :rtype: dict[str, dict[str, float]]
+        """
+
+        faltan = [v for v in símismo.vars_estado if v not in datos]
+        if faltan:
+            raise ValueError(_('Faltan datos para los variables {}.').format(', '.join(faltan)))
+
+        trayectorias = _matriz_estado(datos, símismo.vars_estado, símismo._info_vars)
+        n_corridas = len(trayectorias)
+
+        aleat = np.random.RandomState(semilla)
+        orden = aleat.permutation(n_corridas)
+        n_valid = int(round(fracción_valid * n_corridas)) if n_corridas > 1 else 0
+        í_valid, í_entren = orden[:n_valid], orden[n_valid:]
+
+        n_egr = _tmñ_vars(símismo.vars_egr, símismo._info_vars)
+        x = np.concatenate([trayectorias[í][:-1] for í in í_entren])
+        y = np.concatenate([trayectorias[í][1:, :n_egr] - trayectorias[í][:-1, :n_egr] for í in í_entren])
+
+        if método == 'polinomio':
+            regresor = _RegresorPolinomial(**ops)
+        elif método == 'gp':
+            regresor = _RegresorGP(semilla=semilla, **ops)
+        else:
+            raise ValueError(_('Método de emulación "{}" no reconocido.').format(método))
+        regresor.ajustar(x, y)
+
+        símismo.entrenamiento = {
+            'regresor': regresor, 'paso': paso, 'estado_inic': np.mean([t[0] for t in trayectorias], axis=0),
+            'validación': None
+        }
+
+        if n_valid:
+            símismo.entrenamiento['validación'] = símismo._validar([trayectorias[í] for í in í_valid], n_egr)
+
+        return símismo.validación
+
+    def _validar(símismo, trayectorias, n_egr):
+        """
+        Calcula los errores de validación del emulador con trayectorias que no sirvieron para el entrenamiento.
+        """
+
+        regresor = símismo.entrenamiento['regresor']
+
+        err_paso = []
+        err_tray = []
+        for t in trayectorias:
+            err_paso.append(t[1:, :n_egr] - (t[:-1, :n_egr] + regresor.predecir(t[:-1])))
+
+            # Simular la trayectoria entera, con los ingresos observados.
+            estado = t[0].copy()
+            simul = [estado[:n_egr].copy()]
+            for ingr in t[1:, n_egr:]:
+                estado[:n_egr] += regresor.predecir(estado[np.newaxis])[0]
+                estado[n_egr:] = ingr
+                simul.append(estado[:n_egr].copy())
+            err_tray.append(t[:, :n_egr] - np.array(simul))
+
+        err_paso = np.concatenate(err_paso)
+        err_tray = np.concatenate(err_tray)
+        desv = np.std(np.concatenate([t[:, :n_egr] for t in trayectorias]), axis=0)
+
+        validación = {}
+        í = 0
+        for v in símismo.vars_egr:
+            tmñ = _tmñ_vars([v], símismo._info_vars)
+            rmse_tray = float(np.sqrt(np.mean(np.square(err_tray[:, í:í + tmñ]))))
+            d_desv = float(np.mean(desv[í:í + tmñ]))
+            validación[v] = {
+                'rmse_paso': float(np.sqrt(np.mean(np.square(err_paso[:, í:í + tmñ])))),
+                'rmse_trayectoria': rmse_tray,
+                'nrmse_trayectoria': rmse_tray / d_desv if d_desv else np.nan
+            }
+            í += tmñ
+
+        return validación
+
+    def cambiar_vals_modelo_interno(símismo, valores):
+        # Los valores se guardan directamente en el diccionario de variables.
+        pass
+
+    def incrementar(símismo, paso):
+        if símismo.entrenamiento is None:
+            raise ValueError(_('Hay que entrenar el emulador con .entrenar() antes de simularlo.'))
+
+        regresor = símismo.entrenamiento['regresor']
+        n_egr = _tmñ_vars(símismo.vars_egr, símismo._info_vars)
+
+        estado = símismo._leer_estado()
+        for i in range(max(1, int(round(paso / símismo.entrenamiento['paso'])))):
+            estado[:n_egr] += regresor.predecir(estado[np.newaxis])[0]
+
+        símismo._escribir_estado(estado[:n_egr], símismo.vars_egr)
+
+    def leer_vals(símismo):
+        pass
+
+    def iniciar_modelo(símismo, tiempo_final, nombre_corrida):
+        if símismo.entrenamiento is not None:
+            símismo._escribir_estado(símismo.entrenamiento['estado_inic'], símismo.vars_estado)
+
+    def leer_vals_inic(símismo):
+        pass
+
+    def cerrar_modelo(símismo):
+        pass
+
+    def paralelizable(símismo):
+        return True
+
+    def _leer_estado(símismo):
+        return np.concatenate(
+            [np.ravel(símismo.variables[v]['val']).astype(float) for v in símismo.vars_estado]
+        )
+
+    def _escribir_estado(símismo, estado, l_vars):
+        í = 0
+        for v in l_vars:
+            d_var = símismo.variables[v]
+            tmñ = _tmñ_vars([v], símismo._info_vars)
+            val = estado[í:í + tmñ]
+            if isinstance(d_var['val'], np.ndarray):
+                d_var['val'][:] = val.reshape(d_var['val'].shape)
+            else:
+                d_var['val'] = float(val[0])
+            í += tmñ
+
+    def __getinitargs__(símismo):
+        return símismo._info_vars, símismo._unidad_tiempo, símismo.vars_ingr, símismo.vars_egr, símismo.entrenamiento
+
+
+def datos_de_corridas(modelo, corridas, l_vars):
+    """
+    Lee los resultados de corridas archivadas de un modelo, en el formato de :meth:`Emulador.entrenar`.
+
+    :param modelo: El modelo que generó las corridas.
+    :type modelo: tinamit.Modelo.Modelo
+    :param corridas: Los nombres de las corridas.
+    :type corridas: list[str]
+    :param l_vars: Los variables para leer. Si es un diccionario, las llaves son los nombres de los variables en el
+      emulador y los valores sus nombres en ``modelo``.
+    :type l_vars: list[str] | dict[str, str]
+    :return: Las trayectorias de cada variable.
+    :rtype: dict[str, list[np.ndarray]]
+    """
+
+    if not isinstance(l_vars, dict):
+        l_vars = {v: v for v in l_vars}
+
+    return {
+        v: [np.array(modelo.leer_resultados(var=v_mod, corrida=c)) for c in corridas] for v, v_mod in l_vars.items()
+    }
+
+
+class _RegresorPolinomial(object):
+    """
+    Un regresor de caos polinomial: una expansión en polinomios de Legendre de grado total ``grado`` sobre los
+    ingresos normalizados a [-1, 1], ajustada por mínimos cuadrados regularizados.
+    """
+
+    def __init__(símismo, grado=2, regul=1e-8):
+        símismo.grado = grado
+        símismo.regul = regul
+        símismo.mín = símismo.máx = símismo.índices = símismo.coefs = None
+
+    def ajustar(símismo, x, y):
+        símismo.mín, símismo.máx = np.min(x, axis=0), np.max(x, axis=0)
+        símismo.índices = [
+            c for g in range(símismo.grado + 1) for c in combinations_with_replacement(range(x.shape[1]), g)
+        ]
+
+        base = símismo._base(x)
+        n_base = base.shape[1]
+        a = np.concatenate([base, np.sqrt(símismo.regul) * np.identity(n_base)])
+        b = np.concatenate([y, np.zeros((n_base, y.shape[1]))])
+        símismo.coefs = np.linalg.lstsq(a, b, rcond=None)[0]
+
+    def predecir(símismo, x):
+        return símismo._base(x) @ símismo.coefs
+
+    def _base(símismo, x):
+        rango = símismo.máx - símismo.mín
+        x = np.divide(2 * (x - símismo.mín), rango, out=np.zeros_like(x, dtype=float), where=rango > 0) - 1
+
+        # Polinomios de Legendre de cada grado, por recurrencia de Bonnet
+        legendre = [np.ones_like(x), x]
+        for k in range(1, símismo.grado):
+            legendre.append(((2 * k + 1) * x * legendre[k] - k * legendre[k - 1]) / (k + 1))
+
+        base = np.ones((x.shape[0], len(símismo.índices)))
+        for j, c in enumerate(símismo.índices):
+            for í in set(c):
+                base[:, j] *= legendre[c.count(í)][:, í]
+        return base
+
+
+class _RegresorGP(object):
+    """
+    Un regresor de proceso gaussiano (con ``scikit-learn``) sobre los ingresos normalizados.
+    """
+
+    def __init__(símismo, máx_muestras=2000, semilla=None):
+        if GaussianProcessRegressor is None:
+            raise ImportError(_('Hay que instalar scikit-learn para emular con procesos gaussianos.'))
+
+        símismo.máx_muestras = máx_muestras
+        símismo.semilla = semilla
+        símismo.media = símismo.desv = símismo.gp = None
+
+    def ajustar(símismo, x, y):
+        if len(x) > símismo.máx_muestras:
+            í = np.random.RandomState(símismo.semilla).choice(len(x), símismo.máx_muestras, replace=False)
+            x, y = x[í], y[í]
+
+        símismo.media, símismo.desv = np.mean(x, axis=0), np.std(x, axis=0)
+        símismo.desv[símismo.desv == 0] = 1
+
+        núcleo = ConstantKernel() * RBF(length_scale=np.ones(x.shape[1])) + WhiteKernel()
+        símismo.gp = GaussianProcessRegressor(kernel=núcleo, normalize_y=True, random_state=símismo.semilla)
+        símismo.gp.fit((x - símismo.media) / símismo.desv, y)
+
+    def predecir(símismo, x):
+        return np.reshape(símismo.gp.predict((x - símismo.media) / símismo.desv), (len(x), -1))
+
+
+def _tmñ_vars(l_vars, info_vars):
+    return int(sum(np.prod(info_vars[v].get('dims', (1,))) for v in l_vars))
+
+
+def _matriz_estado(datos, vars_estado, info_vars):
+    """
+    Junta las trayectorias de cada variable de estado en una matriz ``(n_pasos + 1, tmñ_estado)`` por corrida.
+    """
+
+    por_var = []
+    for v in vars_estado:
+        trays = datos[v]
+        if isinstance(trays, dict):
+            trays = [trays[c] for c in sorted(trays)]
+        tmñ = _tmñ_vars([v], info_vars)
+        por_var.append([np.reshape(np.asarray(t, dtype=float), (len(t), tmñ)) for t in trays])
+
+    return [np.concatenate(t, axis=1) for t in zip(*por_var)]
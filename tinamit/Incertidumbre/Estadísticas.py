@@ -1,3 +1,5 @@
+import time
+from multiprocessing import Pool as Reserva
 from warnings import warn as avisar
 
 import numpy as np
@@ -6,6 +8,10 @@ try:
 except ImportError:
     pm = None
 from scipy.optimize import minimize
+try:
+    from scipy.stats import qmc
+except ImportError:
+    qmc = None
 import scipy.stats as estad
 from scipy.stats import gaussian_kde
 
@@ -43,7 +49,7 @@ if pm is not None:
 
 def calib_bayes(obj_ec, paráms, líms_paráms, obs_x, obs_y, dists_aprioris=None, binario=False, **ops):
     if pm is None:
-        raise ImportError('')
+        raise ImportError(_('Hay que instalar PyMC3 para poder utilizar modelos bayesianos.'))
     if dists_aprioris is not None:
 
         aprioris = []
@@ -68,41 +74,281 @@ def calib_bayes(obj_ec, paráms, líms_paráms, obs_x, obs_y, dists_aprioris=Non
         ops_auto.update(ops)
         t = pm.sample(**ops_auto)
 
-    d_máx = {}
-    for p in paráms:
-        escl = np.max(t[p])
-        rango = escl - np.min(t[p])
-        if escl < 10e10:
-            escl = 1
-        try:
-            fdp = gaussian_kde(t[p]/escl)
-            x = np.linspace(t[p].min()/escl-1*rango, t[p].max()/escl + 1*rango, 1000)
-            máx = x[np.argmax(fdp.evaluate(x))] * escl
-            d_máx[p] = máx
-        except:
-            d_máx[p] = None
+    return {p: {'val': _máx_densidad(t[p]), 'dist': t[p]} for p in paráms}
 
-    return {p: {'val': d_máx[p], 'dist': t[p]} for p in paráms}
 
+def calib_bayes_jer(obj_ec, paráms, líms_paráms, obs_x, obs_y, caminos, binario=False, **ops):
+    """
+    Calibra una ecuación para todas las regiones a la vez con un solo modelo bayesiano jerárquico, en vez de un
+    modelo por región.
 
-def optimizar(obj_ec, paráms, líms_paráms, obs_x, obs_y, **ops):
+    :param obj_ec: La ecuación.
+    :type obj_ec: Ecuación
+    :param paráms: Los parámetros que calibrar.
+    :type paráms: list[str]
+    :param líms_paráms: Los límites de los parámetros.
+    :type líms_paráms: list[tuple]
+    :param obs_x: Las observaciones de los variables independientes de cada región.
+    :type obs_x: list[dict[str, np.ndarray]]
+    :param obs_y: Las observaciones del variable dependiente de cada región.
+    :type obs_y: list[np.ndarray]
+    :param caminos: Para cada región, los nombres de sus regiones parientes, de la más grande a la más pequeña.
+    :type caminos: list[tuple]
+    :param binario: Si el variable dependiente es binario.
+    :type binario: bool
+    :return: La calibración de cada región, en el mismo orden que ``obs_y``.
+    :rtype: list[dict]
+    """
+
+    if pm is None:
+        raise ImportError(_('Hay que instalar PyMC3 para poder utilizar modelos bayesianos.'))
+
+    í_obs = np.repeat(np.arange(len(obs_y)), [len(y) for y in obs_y])
+    obs_y_tot = np.concatenate(obs_y)
+    obs_x_tot = {x: np.concatenate([d_x[x] for d_x in obs_x]) for x in (obs_x[0] if len(obs_x) else {})}
+
+    mod_bayes = obj_ec.gen_mod_bayes_jer(
+        paráms, líms_paráms, obs_x_tot, obs_y_tot, í_obs=í_obs, padres=índices_jerarquía(caminos), binario=binario
+    )
+    with mod_bayes:
+        ops_auto = {
+            'tune': 1000,
+            'chains': 1
+        }
+        ops_auto.update(ops)
+        t = pm.sample(**ops_auto)
+
+    return [
+        {p: {'val': _máx_densidad(t[p][:, í]), 'dist': t[p][:, í]} for p in paráms} for í in range(len(obs_y))
+    ]
+
+
+def índices_jerarquía(caminos):
+    """
+    Calcula la estructura de una jerarquía de regiones.
+
+    :param caminos: Para cada región, los nombres de sus regiones parientes, de la más grande a la más pequeña.
+      Todos los caminos deben tener el mismo tamaño.
+    :type caminos: list[tuple]
+    :return: Para cada nivel debajo del nivel global, el índice del pariente de cada nodo en el nivel anterior. El
+      último nivel es el de las regiones mismas, en el orden de ``caminos``.
+    :rtype: list[np.ndarray]
+    """
+
+    n_niveles = len(caminos[0]) if len(caminos) else 0
+
+    padres = []
+    í_anterior = {(): 0}
+    for n in range(1, n_niveles + 1):
+        nodos = list(dict.fromkeys(c[:n] for c in caminos))
+        padres.append(np.array([í_anterior[x[:-1]] for x in nodos], dtype=int))
+        í_anterior = {x: í for í, x in enumerate(nodos)}
+
+    padres.append(np.array([í_anterior[tuple(c)] for c in caminos], dtype=int))
+
+    return padres
+
+
+def _máx_densidad(trazas):
+    """
+    Estima el valor más probable de una traza.
+
+    :param trazas: La traza.
+    :type trazas: np.ndarray
+    :return: El valor con la densidad más alta, o ``None`` si no se pudo estimar.
+    :rtype: float
+    """
+
+    escl = np.max(trazas)
+    rango = escl - np.min(trazas)
+    if escl < 10e10:
+        escl = 1
     try:
-        med_ajuste = ops['med_ajuste']
-    except KeyError:
-        med_ajuste = 'rmec'
+        fdp = gaussian_kde(trazas/escl)
+        x = np.linspace(trazas.min()/escl-1*rango, trazas.max()/escl + 1*rango, 1000)
+        return x[np.argmax(fdp.evaluate(x))] * escl
+    except:
+        return None
+
+
+def optimizar(obj_ec, paráms, líms_paráms, obs_x, obs_y, **ops):
+    """
+    Calibra una ecuación por optimización. El gradiente de la medida de ajuste se calcula con las derivadas
+    simbólicas de la ecuación (:meth:`Ecuación.gen_func_grad`), al mismo tiempo que los residuos.
+
+    :param obj_ec: La ecuación.
+    :type obj_ec: Ecuación
+    :param paráms: Los parámetros que calibrar.
+    :type paráms: list[str]
+    :param líms_paráms: Los límites de los parámetros.
+    :type líms_paráms: list[tuple]
+    :param obs_x: Las observaciones de los variables independientes.
+    :type obs_x: dict[str, np.ndarray]
+    :param obs_y: Las observaciones del variable dependiente.
+    :type obs_y: np.ndarray
+    :param ops: Opciones para :func:`scipy.optimize.minimize`, y ``med_ajuste``, la medida de ajuste.
+    :return: La calibración.
+    :rtype: dict
+    """
+
+    med_ajuste = ops.pop('med_ajuste', 'rmec')
+    if med_ajuste.lower() != 'rmec':
+        raise ValueError(_('Medida de ajuste "{}" no reconocida.').format(med_ajuste))
+
+    opt = _minimizar(obj_ec, paráms, líms_paráms, obs_x, obs_y, x0=_x0(líms_paráms), **ops)
+
+    if not opt.success:
+        avisar(_('Error de optimización par aecuación "{}".').format(str(obj_ec)))
+
+    return {p: {'val': opt.x[i]} for i, p in enumerate(paráms)}
+
 
-    ec = obj_ec.gen_func_python()
+def optimizar_global(obj_ec, paráms, líms_paráms, obs_x, obs_y, n_cand=1000, n_refinar=5, muestreo='lhs',
+                     líms_búsqueda=None, paralelo=False, semilla=None, reportar=False, **ops):
+    """
+    Calibra una ecuación con una búsqueda global. Primero se evalúan ``n_cand`` conjuntos de parámetros, generados
+    por hipercubo latino o por secuencia de Sobol, todos juntos en la ecuación vectorizada. Después se refinan los
+    ``n_refinar`` mejores con :func:`optimizar`, posiblemente en paralelo, y se guarda el mejor resultado.
+
+    :param obj_ec: La ecuación.
+    :type obj_ec: Ecuación
+    :param paráms: Los parámetros que calibrar.
+    :type paráms: list[str]
+    :param líms_paráms: Los límites de los parámetros.
+    :type líms_paráms: list[tuple]
+    :param obs_x: Las observaciones de los variables independientes.
+    :type obs_x: dict[str, np.ndarray]
+    :param obs_y: Las observaciones del variable dependiente.
+    :type obs_y: np.ndarray
+    :param n_cand: El número de conjuntos de parámetros candidatos. Con Sobol, se redondea a una potencia de 2.
+    :type n_cand: int
+    :param n_refinar: El número de candidatos que refinar por optimización.
+    :type n_refinar: int
+    :param muestreo: ``'lhs'`` (hipercubo latino) o ``'sobol'``.
+    :type muestreo: str
+    :param líms_búsqueda: Los límites de la búsqueda para cada parámetro. Si ``None``, se toman de ``líms_paráms``;
+      los lados sin límite se extienden a 10 unidades (o 10 veces el otro límite) del otro lado o de 0.
+    :type líms_búsqueda: list[tuple]
+    :param paralelo: Si hay que refinar los candidatos en paralelo. Puede ser el número de procesos que emplear.
+    :type paralelo: bool | int
+    :param semilla: La semilla para generar los candidatos.
+    :type semilla: int
+    :param reportar: Si hay que informar del número de evaluaciones por segundo de cada etapa.
+    :type reportar: bool
+    :param ops: Opciones para :func:`optimizar`.
+    :return: La calibración.
+    :rtype: dict
+    """
+
+    med_ajuste = ops.pop('med_ajuste', 'rmec')
+    if med_ajuste.lower() != 'rmec':
+        raise ValueError(_('Medida de ajuste "{}" no reconocida.').format(med_ajuste))
+
+    if líms_búsqueda is None:
+        líms_búsqueda = [_lím_búsqueda(lp) for lp in líms_paráms]
+    líms_búsqueda = np.array(líms_búsqueda, dtype=float)
+
+    # Evaluar todos los candidatos en la ecuación vectorizada
+    inic = time.time()
+    cands = líms_búsqueda[:, 0] + _muestrear(len(paráms), n_cand, muestreo, semilla) * np.diff(líms_búsqueda)[:, 0]
+    ajustes = evaluar_cands(obj_ec, paráms, cands, obs_x, obs_y)
+    t_cands = time.time() - inic
+
+    # Refinar los mejores
+    inic = time.time()
+    mejores = cands[np.argsort(ajustes, kind='stable')[:n_refinar]]
+    args_opt = {
+        'obj_ec': obj_ec, 'paráms': paráms, 'líms_paráms': líms_paráms, 'obs_x': obs_x, 'obs_y': obs_y, 'ops': ops
+    }
+    if paralelo and len(mejores) > 1:
+        n_procs = None if paralelo is True else paralelo
+        with Reserva(n_procs, initializer=_inic_optimizador, initargs=(args_opt,)) as r:
+            opts = r.map(_refinar, mejores)
+    else:
+        opts = [_minimizar(x0=x0, **{k: v for k, v in args_opt.items() if k != 'ops'}, **ops) for x0 in mejores]
+    t_refinar = time.time() - inic
+
+    opt = min(opts, key=lambda o: o.fun if np.isfinite(o.fun) else np.inf)
+    if not opt.success:
+        avisar(_('Error de optimización par aecuación "{}".').format(str(obj_ec)))
+
+    if reportar:
+        n_evals = sum(o.nfev for o in opts)
+        print(_('Búsqueda global: {} candidatos evaluados ({:.0f} evaluaciones/s); {} refinados con {} evaluaciones '
+                '({:.0f} evaluaciones/s).').format(len(cands), len(cands) / max(t_cands, 1e-9), len(opts), n_evals,
+                                                  n_evals / max(t_refinar, 1e-9)))
+
+    return {p: {'val': opt.x[i]} for i, p in enumerate(paráms)}
+
+
+def evaluar_cands(obj_ec, paráms, cands, obs_x, obs_y, tmñ_lote=1e7):
+    """
+    Calcula la raíz del error cuadrado medio de muchos conjuntos de parámetros a la vez, pasando una matriz
+    ``(n_cand, n_paráms)`` por la ecuación vectorizada.
+
+    :param obj_ec: La ecuación.
+    :type obj_ec: Ecuación
+    :param paráms: Los parámetros.
+    :type paráms: list[str]
+    :param cands: Los valores de los parámetros, con una fila por candidato.
+    :type cands: np.ndarray
+    :param obs_x: Las observaciones de los variables independientes.
+    :type obs_x: dict[str, np.ndarray]
+    :param obs_y: Las observaciones del variable dependiente.
+    :type obs_y: np.ndarray
+    :param tmñ_lote: El número máximo de valores (candidatos x observaciones) que calcular a la vez.
+    :type tmñ_lote: int
+    :return: El error de cada candidato; ``np.inf`` si no se pudo calcular.
+    :rtype: np.ndarray
+    """
+
+    ec = obj_ec.gen_func_python(paráms)
+    obs_y = np.asarray(obs_y, dtype=float)
+    n_obs = obs_y.size
+
+    n_lote = max(1, int(tmñ_lote // max(n_obs, 1)))
+    ajustes = np.empty(len(cands))
+    with np.errstate(all='ignore'):
+        for í in range(0, len(cands), n_lote):
+            lote = cands[í:í + n_lote]
+            # Cada parámetro tiene la forma (n_cand, 1), que se difunde con las observaciones (n_obs,)
+            resid = np.broadcast_to(ec(lote.T[..., np.newaxis], obs_x), (len(lote), n_obs)) - obs_y
+            ajustes[í:í + n_lote] = np.sqrt(np.sum(np.square(resid), axis=1) / n_obs)
+
+    ajustes[~np.isfinite(ajustes)] = np.inf
+    return ajustes
+
+
+def _func_objetivo(obj_ec, paráms, obs_x, obs_y):
+    """
+    Genera la función objetiva de la optimización, que devuelve la raíz del error cuadrado medio y su gradiente,
+    calculado con las derivadas simbólicas de la ecuación.
+    """
+
+    ec = obj_ec.gen_func_python(paráms)
+    grad = obj_ec.gen_func_grad(paráms)
+
+    obs_y = np.asarray(obs_y, dtype=float)
+    n_obs = obs_y.size
 
     def f(p):
+        resid = ec(p, obs_x) - obs_y
+        rmec = np.sqrt(np.sum(np.square(resid)) / n_obs)
+        if rmec == 0:
+            return rmec, np.zeros(len(paráms))
 
-        if med_ajuste.lower() == 'rmec':
-            def f_ajuste(y, y_o):
-                return np.sqrt(np.sum(np.square(y - y_o)) / len(y))
-        else:
-            raise ValueError('')
+        jac = np.array([np.sum(resid * d) for d in grad(p, obs_x)]) / (n_obs * rmec)
+        return rmec, jac
+
+    return f
+
+
+def _minimizar(obj_ec, paráms, líms_paráms, obs_x, obs_y, x0, **ops):
+    f = _func_objetivo(obj_ec, paráms, obs_x, obs_y)
+    return minimize(f, x0=np.array(x0, dtype=float), jac=True, bounds=líms_paráms, **ops)
 
-        return f_ajuste(ec(p, obs_x), obs_y)
 
+def _x0(líms_paráms):
     x0 = []
     for lp in líms_paráms:
         if lp[0] is None:
@@ -116,13 +362,65 @@ def optimizar(obj_ec, paráms, líms_paráms, obs_x, obs_y, **ops):
             else:
                 x0.append((lp[0] + lp[1]) / 2)
 
-    x0 = np.array(x0)
-    opt = minimize(f, x0=x0, bounds=líms_paráms, **ops)
+    return np.array(x0)
 
-    if not opt.success:
-        avisar(_('Error de optimización par aecuación "{}".').format(str(ec)))
 
-    return {p: {'val': opt.x[i]} for i, p in enumerate(paráms)}
+def _lím_búsqueda(lp):
+    mín, máx = lp
+    if mín is None and máx is None:
+        return -10, 10
+    elif mín is None:
+        return máx - 10 * max(1, abs(máx)), máx
+    elif máx is None:
+        return mín, mín + 10 * max(1, abs(mín))
+    return mín, máx
+
+
+def _muestrear(n_dims, n, muestreo, semilla=None):
+    """
+    Genera puntos en el hipercubo unitario.
+
+    :param n_dims: El número de dimensiones.
+    :type n_dims: int
+    :param n: El número de puntos.
+    :type n: int
+    :param muestreo: ``'lhs'`` (hipercubo latino) o ``'sobol'``.
+    :type muestreo: str
+    :param semilla: La semilla aleatoria.
+    :type semilla: int
+    :return: Los puntos, con la forma ``(n, n_dims)``.
+    :rtype: np.ndarray
+    """
+
+    muestreo = muestreo.lower()
+    if muestreo == 'lhs':
+        aleat = np.random.RandomState(semilla)
+        estratos = np.array([aleat.permutation(n) for _d in range(n_dims)]).T
+        return (estratos + aleat.random_sample((n, n_dims))) / n
+
+    elif muestreo == 'sobol':
+        if qmc is None:
+            raise ImportError(_('Hay que instalar una versión más reciente de SciPy para poder utilizar secuencias '
+                                'de Sobol.'))
+        return qmc.Sobol(n_dims, seed=semilla).random_base2(int(np.ceil(np.log2(max(n, 1)))))
+
+    raise ValueError(_('Método de muestreo "{}" no reconocido.').format(muestreo))
+
+
+_optimizador = None  # type: dict
+
+
+def _inic_optimizador(args_opt):
+    # Cada proceso genera las funciones de la ecuación una sola vez.
+    global _optimizador
+    _optimizador = args_opt
+    args_opt['obj_ec'].gen_func_python(args_opt['paráms'])
+    args_opt['obj_ec'].gen_func_grad(args_opt['paráms'])
+
+
+def _refinar(x0):
+    args = {k: v for k, v in _optimizador.items() if k != 'ops'}
+    return _minimizar(x0=x0, **args, **_optimizador['ops'])
 
 
 def regresión(obj_ec, paráms, líms_paráms, obs_x, obs_y, **ops):
@@ -1,4 +1,11 @@
 import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Un número en formato latino que Python puede leer directamente
+_regex_ascii = re.compile(r'[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?')
 
 
 def tx_a_núm(texto):
@@ -12,6 +19,11 @@ def tx_a_núm(texto):
     :rtype: float
 
     """
+
+    # El caso más común: un número en formato latino.
+    if _regex_ascii.fullmatch(texto):
+        return float(texto) if any(x in texto for x in '.eE') else int(texto)
+
     if texto[0] == '-':
         neg = -1
         texto = texto[1:]
@@ -135,15 +147,13 @@ def _trad_texto(texto, núms, sep_dec, txt=False):
     :rtype: float | txt
     """
 
-    if all([x in núms + [sep_dec] for x in texto]):
-        # Si todos los carácteres en el texto están reconocidos...
+    tabla, carácteres = _tabla_trad(tuple(núms))
 
-        # Cambiar el separador de decimal a un punto.
-        texto = texto.replace(sep_dec, '.')
+    if all(x in carácteres or x == sep_dec for x in texto):
+        # Si todos los carácteres en el texto están reconocidos...
 
-        for n, d in enumerate(núms):
-            # Reemplazar todos los números también.
-            texto = texto.replace(d, str(n))
+        # Cambiar el separador de decimal a un punto, y los números a números latinos.
+        texto = texto.replace(sep_dec, '.').translate(tabla)
 
         # Devolver el resultado, o en texto, o en formato numeral.
         if txt:
@@ -156,6 +166,76 @@ def _trad_texto(texto, núms, sep_dec, txt=False):
         raise ValueError('Texto "{}" no reconocido.'.format(texto))
 
 
+@lru_cache(maxsize=None)
+def _tabla_trad(núms):
+    """
+    Genera la tabla de traducción de números a números latinos para :meth:`str.translate`.
+
+    :param núms: Los carácteres que corresponden a los números 0, 1, 2, ... 9.
+    :type núms: tuple[str]
+    :return: La tabla y el conjunto de los carácteres de números.
+    :rtype: (dict, frozenset)
+    """
+    return str.maketrans({d: str(n) for n, d in enumerate(núms)}), frozenset(núms)
+
+
+def detectar_lengua(textos, n_muestra=10):
+    """
+    Detecta la lengua de una lista de números en formato de texto, a base de una muestra de los primeros.
+
+    :param textos: Los textos.
+    :type textos: list[str] | np.ndarray
+    :param n_muestra: El número máximo de textos que examinar.
+    :type n_muestra: int
+    :return: El nombre de la lengua, o ``None`` si no se pudo detectar.
+    :rtype: str | None
+    """
+
+    for texto in list(textos)[:n_muestra]:
+        for lengua, d_l in dic_trads.items():
+            if _regex_ascii.fullmatch(str(texto).translate(_tabla_trad(d_l['núms'])[0])):
+                return lengua
+
+    return None
+
+
+def tx_a_núm_vec(textos, lengua=None):
+    """
+    Convierte una lista entera de textos en números a la vez. Los números en formato latino se convierten
+    directamente; los otros se traducen con la tabla de la lengua detectada (o especificada), y, si todavía no
+    se pueden leer, con :func:`tx_a_núm`.
+
+    :param textos: Los textos a convertir.
+    :type textos: list[str] | np.ndarray
+    :param lengua: La lengua de los números, si se conoce ya.
+    :type lengua: str
+    :return: Los números.
+    :rtype: np.ndarray
+    """
+
+    textos = np.asarray(textos, dtype=object)
+    forma = textos.shape
+    textos = textos.ravel()
+
+    núms = pd.to_numeric(textos, errors='coerce').astype(float)
+
+    fallidos = np.flatnonzero(np.isnan(núms))
+    if len(fallidos):
+        tx_fallidos = textos[fallidos]
+        if lengua is None:
+            lengua = detectar_lengua(tx_fallidos)
+
+        if lengua is not None:
+            tabla = _tabla_trad(dic_trads[lengua]['núms'])[0]
+            trad = np.array([str(t).translate(tabla) for t in tx_fallidos], dtype=object)
+            núms[fallidos] = pd.to_numeric(trad, errors='coerce')
+
+        for í in fallidos[np.isnan(núms[fallidos])]:
+            núms[í] = tx_a_núm(textos[í])
+
+    return núms.reshape(forma)
+
+
 dic_trads = {'Latino': {'núms': ('0', '1', '2', '3', '4', '5', '6', '7', '8', '9'),
                         'sep_dec': ['.', ',']},
              'हिंदी': {'núms': ('०', '१', '२', '३', '४', '५', '६', '७', '८', '९'),
@@ -0,0 +1,350 @@
+import os
+
+import numpy as np
+
+from tinamit import _
+from tinamit.Conectado import SuperConectado
+from tinamit.Incertidumbre.Estadísticas import _muestrear
+
+
+class AnálisisSensib(object):
+    """
+    Un análisis de sensibilidad global (Sobol o Morris) de un modelo. Las corridas del diseño se ejecutan por
+    bloques (con :meth:`~tinamit.Conectado.SuperConectado.simular_paralelo` para modelos conectados), y los
+    resultados se guardan en un archivo después de cada bloque para poder retomar el análisis si se interrumpe.
+    """
+
+    def __init__(símismo, modelo, paráms, vars_egr, líms=None, método='sobol', n=1000, n_niveles=4, archivo=None,
+                 semilla=None):
+        """
+
+        :param modelo: El modelo.
+        :type modelo: tinamit.Modelo.Modelo
+        :param paráms: Los variables del modelo cuya sensibilidad se analiza.
+        :type paráms: list[str]
+        :param vars_egr: Los variables de egreso del modelo.
+        :type vars_egr: str | list[str]
+        :param líms: Los límites de cada parámetro. Si ``None``, se toman de los límites (``'líms'``) de los
+          variables del modelo.
+        :type líms: list[tuple] | dict[str, tuple]
+        :param método: ``'sobol'`` (diseño de Saltelli) o ``'morris'``.
+        :type método: str
+        :param n: El número de muestras de base (Sobol) o de trayectorias (Morris).
+        :type n: int
+        :param n_niveles: El número de niveles de la cuadrícula de Morris.
+        :type n_niveles: int
+        :param archivo: El archivo ``.npz`` donde guardar el progreso del análisis. Si ya existe para el mismo
+          diseño, el análisis retoma donde se quedó.
+        :type archivo: str
+        :param semilla: La semilla para generar el diseño.
+        :type semilla: int
+        """
+
+        if isinstance(vars_egr, str):
+            vars_egr = [vars_egr]
+
+        símismo.modelo = modelo
+        símismo.paráms = paráms
+        símismo.vars_egr = vars_egr
+        símismo.método = método.lower()
+        símismo.n = n
+        símismo.archivo = archivo
+
+        if líms is None:
+            líms = [_obt_líms(modelo, p) for p in paráms]
+        elif isinstance(líms, dict):
+            líms = [líms[p] if p in líms else _obt_líms(modelo, p) for p in paráms]
+        símismo.líms = np.array(líms, dtype=float)
+        if símismo.líms.shape != (len(paráms), 2) or not np.all(np.isfinite(símismo.líms)):
+            raise ValueError(_('Hay que especificar límites finitos para todos los parámetros.'))
+
+        d = len(paráms)
+        if símismo.método == 'sobol':
+            unitario = gen_diseño_saltelli(n, d, semilla=semilla)
+        elif símismo.método == 'morris':
+            unitario = gen_diseño_morris(n, d, n_niveles=n_niveles, semilla=semilla)
+        else:
+            raise ValueError(_('Método de análisis de sensibilidad "{}" no reconocido.').format(método))
+
+        símismo.unitario = unitario
+        símismo.diseño = símismo.líms[:, 0] + unitario * np.diff(símismo.líms)[:, 0]
+
+        símismo.n_hechas = 0
+        símismo.egresos = {}  # type: dict[str, np.ndarray]
+
+        if archivo is not None and os.path.isfile(archivo):
+            símismo._cargar()
+
+    @property
+    def n_corridas(símismo):
+        return len(símismo.diseño)
+
+    def correr(símismo, tiempo_final, paso=1, tmñ_bloque=100, paralelo=True, nombre_corrida='Sensib', **ops):
+        """
+        Corre las simulaciones del diseño que faltan, por bloques.
+
+        :param tiempo_final: El tiempo final de cada simulación.
+        :type tiempo_final: int
+        :param paso: El paso de las simulaciones.
+        :type paso: int
+        :param tmñ_bloque: El número de corridas por bloque. El progreso se guarda después de cada bloque.
+        :type tmñ_bloque: int
+        :param paralelo: Si hay que correr las simulaciones de cada bloque en paralelo. Puede ser el número de
+          procesos que emplear. Solamente los modelos conectados paralelizables se pueden correr en paralelo.
+        :type paralelo: bool | int
+        :param nombre_corrida: El prefijo de los nombres de corridas.
+        :type nombre_corrida: str
+        :param ops: Otras opciones de simulación.
+        """
+
+        while símismo.n_hechas < símismo.n_corridas:
+            í = símismo.n_hechas
+            bloque = símismo.diseño[í:í + tmñ_bloque]
+            nombres = ['{}{}'.format(nombre_corrida, í + j) for j in range(len(bloque))]
+
+            res = símismo._correr_bloque(
+                bloque, nombres, tiempo_final=tiempo_final, paso=paso, paralelo=paralelo, **ops
+            )
+
+            for v in símismo.vars_egr:
+                if v not in símismo.egresos:
+                    forma = np.shape(res[v][0])
+                    símismo.egresos[v] = np.full((símismo.n_corridas, *forma), np.nan)
+                símismo.egresos[v][í:í + len(bloque)] = res[v]
+
+            símismo.n_hechas += len(bloque)
+            if símismo.archivo is not None:
+                símismo._guardar()
+
+    def calc_índices(símismo):
+        """
+        Calcula los índices de sensibilidad de cada variable de egreso. El primer eje de cada índice corresponde a
+        los parámetros; los otros, a la forma del variable de egreso (por ejemplo, el tiempo).
+
+        :return: Para Sobol, los índices de primer orden (``'S1'``) y totales (``'ST'``). Para Morris, la media de
+          los efectos elementales (``'mu'``), de sus valores absolutos (``'mu_star'``) y su desviación estándar
+          (``'sigma'``).
+        :rtype: dict[str, dict[str, np.ndarray]]
+        """
+
+        if símismo.n_hechas < símismo.n_corridas:
+            raise ValueError(_('Faltan {} corridas; hay que terminar el análisis con .correr() primero.')
+                             .format(símismo.n_corridas - símismo.n_hechas))
+
+        if símismo.método == 'sobol':
+            return {v: índices_sobol(y, n=símismo.n, d=len(símismo.paráms)) for v, y in símismo.egresos.items()}
+        else:
+            return {v: índices_morris(y, símismo.unitario, d=len(símismo.paráms)) for v, y in símismo.egresos.items()}
+
+    def _correr_bloque(símismo, bloque, nombres, tiempo_final, paso, paralelo, **ops):
+        """
+        Corre un bloque de simulaciones.
+
+        :return: Los egresos de cada corrida, para cada variable de egreso.
+        :rtype: dict[str, list[np.ndarray]]
+        """
+
+        mod = símismo.modelo
+        vals_inic = [símismo._vals_inic(x) for x in bloque]
+
+        if isinstance(mod, SuperConectado):
+            return mod.simular_paralelo(
+                tiempo_final=tiempo_final, paso=paso, nombre_corrida=nombres, vals_inic=vals_inic, combinar=False,
+                paralelo=paralelo if len(bloque) > 1 else False, devolver=símismo.vars_egr, **ops
+            )
+
+        # Los modelos sin submodelos se corren uno tras otro, y sus resultados se leen de la memoria de cada corrida.
+        vars_interés = [mod.valid_var(v) for v in símismo.vars_egr]
+        egresos = {v: [] for v in símismo.vars_egr}
+        for vals, nmb in zip(vals_inic, nombres):
+            mod.inic_vals(vals[None])
+            memoria = mod.simular(tiempo_final=tiempo_final, paso=paso, nombre_corrida=nmb,
+                                  vars_interés=list(vars_interés), **ops)
+            for v, v_mod in zip(símismo.vars_egr, vars_interés):
+                egresos[v].append(np.copy(memoria[v_mod]))
+
+        return egresos
+
+    def _vals_inic(símismo, valores):
+        vals = {}
+        for p, val in zip(símismo.paráms, valores):
+            m, v = _ubicar_var(símismo.modelo, p)
+            vals.setdefault(m, {})[v] = val
+        return vals
+
+    def _guardar(símismo):
+        # Guardar en un archivo temporario primero, para no corromper el progreso si el proceso se interrumpe.
+        temp = símismo.archivo + '.temp.npz'
+        egresos = {
+            'egr_{}'.format(í): símismo.egresos[v] for í, v in enumerate(símismo.vars_egr) if v in símismo.egresos
+        }
+        np.savez(temp, diseño=símismo.diseño, n_hechas=símismo.n_hechas, **egresos)
+        os.replace(temp, símismo.archivo)
+
+    def _cargar(símismo):
+        with np.load(símismo.archivo) as d:
+            if d['diseño'].shape != símismo.diseño.shape or not np.allclose(d['diseño'], símismo.diseño):
+                raise ValueError(_('El archivo "{}" corresponde a otro diseño de análisis de sensibilidad.')
+                                 .format(símismo.archivo))
+            símismo.n_hechas = int(d['n_hechas'])
+            símismo.egresos = {
+                v: d['egr_{}'.format(í)] for í, v in enumerate(símismo.vars_egr) if 'egr_{}'.format(í) in d
+            }
+
+
+def gen_diseño_saltelli(n, d, semilla=None):
+    """
+    Genera un diseño de Saltelli en el hipercubo unitario: las matrices de base ``A`` y ``B``, seguidas por las ``d``
+    matrices ``AB_i`` (``A`` con la columna ``i`` de ``B``).
+
+    :param n: El número de muestras de base.
+    :type n: int
+    :param d: El número de parámetros.
+    :type d: int
+    :param semilla: La semilla aleatoria.
+    :type semilla: int
+    :return: El diseño, con la forma ``(n * (d + 2), d)``.
+    :rtype: np.ndarray
+    """
+
+    try:
+        base = _muestrear(2 * d, n, 'sobol', semilla=semilla)[:n]
+    except ImportError:
+        base = _muestrear(2 * d, n, 'lhs', semilla=semilla)
+
+    a, b = base[:, :d], base[:, d:]
+    ab = np.repeat(a[np.newaxis], d, axis=0)
+    ab[np.arange(d), :, np.arange(d)] = b.T
+
+    return np.concatenate([a, b, ab.reshape((d * n, d))])
+
+
+def índices_sobol(y, n, d):
+    """
+    Calcula los índices de Sobol de primer orden (estimador de Saltelli 2010) y totales (estimador de Jansen) a
+    partir de los resultados de un diseño de :func:`gen_diseño_saltelli`.
+
+    :param y: Los resultados de cada corrida. El primer eje corresponde a las corridas.
+    :type y: np.ndarray
+    :param n: El número de muestras de base.
+    :type n: int
+    :param d: El número de parámetros.
+    :type d: int
+    :return: Los índices ``'S1'`` y ``'ST'``, con un primer eje para los parámetros.
+    :rtype: dict[str, np.ndarray]
+    """
+
+    y = np.asarray(y, dtype=float)
+    f_a, f_b = y[:n], y[n:2 * n]
+    f_ab = y[2 * n:].reshape((d, n, *y.shape[1:]))
+
+    var = np.var(np.concatenate([f_a, f_b]), axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s1 = np.mean(f_b * (f_ab - f_a), axis=1) / var
+        st = 0.5 * np.mean(np.square(f_a - f_ab), axis=1) / var
+
+    return {'S1': s1, 'ST': st}
+
+
+def gen_diseño_morris(r, d, n_niveles=4, semilla=None):
+    """
+    Genera ``r`` trayectorias de Morris en el hipercubo unitario. Cada trayectoria tiene ``d + 1`` puntos, y cada
+    paso cambia un solo parámetro por ``Δ = n_niveles / (2 * (n_niveles - 1))``.
+
+    :param r: El número de trayectorias.
+    :type r: int
+    :param d: El número de parámetros.
+    :type d: int
+    :param n_niveles: El número de niveles de la cuadrícula.
+    :type n_niveles: int
+    :param semilla: La semilla aleatoria.
+    :type semilla: int
+    :return: El diseño, con la forma ``(r * (d + 1), d)``.
+    :rtype: np.ndarray
+    """
+
+    aleat = np.random.RandomState(semilla)
+    delta = n_niveles / (2 * (n_niveles - 1))
+
+    # Puntos de partida en la cuadrícula, y orden y dirección de los cambios de cada trayectoria
+    inic = aleat.randint(0, n_niveles, size=(r, d)) / (n_niveles - 1)
+    orden = np.argsort(aleat.random_sample((r, d)), axis=1)
+    arriba = inic + delta <= 1
+
+    cambios = np.zeros((r, d + 1, d))
+    cambios[np.arange(r)[:, np.newaxis], np.arange(1, d + 1), orden] = np.where(
+        np.take_along_axis(arriba, orden, axis=1), delta, -delta
+    )
+
+    return (inic[:, np.newaxis, :] + np.cumsum(cambios, axis=1)).reshape((r * (d + 1), d))
+
+
+def índices_morris(y, diseño, d):
+    """
+    Calcula los índices de Morris a partir de los resultados de un diseño de :func:`gen_diseño_morris`.
+
+    :param y: Los resultados de cada corrida. El primer eje corresponde a las corridas.
+    :type y: np.ndarray
+    :param diseño: El diseño, en el hipercubo unitario.
+    :type diseño: np.ndarray
+    :param d: El número de parámetros.
+    :type d: int
+    :return: Los índices ``'mu'``, ``'mu_star'`` y ``'sigma'``, con un primer eje para los parámetros.
+    :rtype: dict[str, np.ndarray]
+    """
+
+    y = np.asarray(y, dtype=float)
+    r = len(diseño) // (d + 1)
+    y = y.reshape((r, d + 1, *y.shape[1:]))
+    dx = np.diff(diseño.reshape((r, d + 1, d)), axis=1)
+
+    # El parámetro que cambia en cada paso de cada trayectoria, y su cambio
+    í_parám = np.argmax(np.abs(dx), axis=2)
+    delta = np.take_along_axis(dx, í_parám[..., np.newaxis], axis=2)[..., 0]
+
+    efectos = np.diff(y, axis=1) / delta.reshape((r, d, *[1] * (y.ndim - 2)))
+
+    # Reordenar los efectos por parámetro
+    orden = np.argsort(í_parám, axis=1)
+    efectos = np.take_along_axis(efectos, orden.reshape((r, d, *[1] * (y.ndim - 2))), axis=1)
+
+    return {
+        'mu': np.mean(efectos, axis=0),
+        'mu_star': np.mean(np.abs(efectos), axis=0),
+        'sigma': np.std(efectos, axis=0, ddof=1) if r > 1 else np.full(efectos.shape[1:], np.nan)
+    }
+
+
+def _ubicar_var(modelo, var):
+    """
+    Encuentra el submodelo donde se ubica un variable.
+
+    :return: El nombre del submodelo (``None`` si el modelo no tiene submodelos) y el nombre del variable en este.
+    :rtype: (str, str)
+    """
+
+    modelos = getattr(modelo, 'modelos', None)
+    if not modelos:
+        return None, var
+
+    if '_' in var:
+        m, v = var.split('_', 1)
+        if m in modelos and v in modelos[m].variables:
+            return m, v
+
+    for m, obj_m in modelos.items():
+        if var in obj_m.variables:
+            return m, var
+
+    raise ValueError(_('El variable "{}" no existe en el modelo "{}", ni siquiera en sus submodelos.')
+                     .format(var, modelo))
+
+
+def _obt_líms(modelo, var):
+    m, v = _ubicar_var(modelo, var)
+    d_var = (modelo if m is None else modelo.modelos[m]).variables[v]
+    líms = d_var.get('líms', (None, None))
+    if not líms or any(x is None for x in líms):
+        raise ValueError(_('El variable "{}" no tiene límites finitos; hay que especificarlos con "líms".')
+                         .format(var))
+    return líms
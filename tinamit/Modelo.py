@@ -372,6 +372,18 @@ class Modelo(object):
         """
         raise NotImplementedError
 
+    def estab_recibe_vals(símismo, recibe):
+        """
+        Indica al modelo si recibirá valores de otro modelo durante la próxima simulación (por ejemplo, si está
+        conectado de manera unidireccional). Modelos que pueden acelerar sus simulaciones cuando sus ingresos no
+        cambian pueden reimplementar esta función; por defecto no hace nada.
+
+        :param recibe: Si el modelo recibirá valores de otro modelo.
+        :type recibe: bool
+
+        """
+        pass
+
     def cerrar_modelo(símismo):
         """
         Esta función debe tomar las acciones necesarias para terminar la simulación y cerrar el modelo, si aplica.
@@ -458,7 +470,8 @@ class Modelo(object):
 
         símismo.unidad_tiempo_meses = conv
 
-    def dibujar_mapa(símismo, geog, var, directorio, corrida=None, i_paso=None, colores=None, escala=None):
+    def dibujar_mapa(símismo, geog, var, directorio, corrida=None, i_paso=None, colores=None, escala=None,
+                     formato='png', dpi=None, paralelo=False):
         """
         Dibuja mapas espaciales de los valores de un variable.
 
@@ -476,6 +489,13 @@ class Modelo(object):
         :type colores: tuple | list | int
         :param escala: La escala de valores para el dibujo. Si ``None``, será el rango del variable.
         :type escala: list | np.ndarray
+        :param formato: ``'png'`` para un archivo por paso, o ``'gif'``, ``'mp4'`` o ``'sprite'`` para un archivo
+          único con todos los pasos. Ver :meth:`~tinamit.Geog.Geog.Geografía.dibujar_serie`.
+        :type formato: str
+        :param dpi: La resolución de los mapas.
+        :type dpi: int
+        :param paralelo: Si hay que dibujar los mapas en paralelo, o el número de procesos que emplear.
+        :type paralelo: bool | int
         """
 
         # Validar el nombre del variable.
@@ -515,11 +535,14 @@ class Modelo(object):
                 if re.match(valid_nombre_arch(nombre_var), arch):
                     os.remove(os.path.join(directorio, arch))
 
-        for i in range(*i_paso):
-            valores = bd[..., i]
-            nombre_archivo = os.path.join(directorio, '{}, {}'.format(nombre_var, i))
-            geog.dibujar(archivo=nombre_archivo, valores=valores, título=var, unidades=unid,
-                         colores=colores, escala_num=escala)
+        formato = formato.lower()
+        if formato == 'png':
+            archivos = [os.path.join(directorio, '{}, {}'.format(nombre_var, i)) for i in range(*i_paso)]
+        else:
+            ext = 'png' if formato == 'sprite' else formato
+            archivos = os.path.join(directorio, '{}.{}'.format(nombre_var, ext))
+        geog.dibujar_serie(archivos=archivos, valores=bd[..., slice(*i_paso)], título=var, unidades=unid,
+                           colores=colores, escala_num=escala, formato=formato, dpi=dpi, paralelo=paralelo)
 
     def valid_var(símismo, var):
         if var in símismo.variables: